@@ -1,10 +1,11 @@
-from app.api.routes import ai, auth, clients, interactions, push, reminders, system
+from app.api.routes import ai, auth, clients, interactions, invoices, push, reminders, system
 
 __all__ = [
     "ai",
     "auth",
     "clients",
     "interactions",
+    "invoices",
     "push",
     "reminders",
     "system",
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.deps import get_current_user
 from app.core.localization import translate
-from app.core.security import get_password_hash
+from app.core.principal_cache import invalidate_user
+from app.core.security import get_password_hash, get_password_hash_async
 from app.db.session import get_db
 from app.models.api_key import ApiKey
 from app.models.user import User, UserRole
@@ -23,6 +25,7 @@ from app.schemas.auth import (
     UserUpdate,
 )
 from app.services.api_keys import decrypt_api_key, encrypt_api_key
+from app.services.audit import record_audit_event
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -44,27 +47,36 @@ def list_users(
     return UserListResponse(items=users, message=translate("users_list"))
 
 
-@router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(
-    user_in: UserCreate,
-    _: User = Depends(require_admin),
-    db: Session = Depends(get_db),
-) -> UserResponse:
-    if db.query(User).filter(User.email == user_in.email).first():
+def _ensure_email_available(db: Session, email: str) -> None:
+    if db.query(User).filter(User.email == email).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=translate("email_already_registered"),
         )
 
+
+def _save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def create_user(
+    user_in: UserCreate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+) -> UserResponse:
+    await run_in_threadpool(_ensure_email_available, db, user_in.email)
     user = User(
         name=user_in.name,
         email=user_in.email,
         role=user_in.role,
-        password_hash=get_password_hash(user_in.password),
+        password_hash=await get_password_hash_async(user_in.password),
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await run_in_threadpool(_save_user, db, user)
+    record_audit_event(current_user.id, "create", "user", user.id)
     return UserResponse(user=user, message=translate("user_created"))
 
 
@@ -72,7 +84,7 @@ def create_user(
 def update_user(
     user_id: int,
     user_in: UserUpdate,
-    _: User = Depends(require_admin),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> UserResponse:
     user = db.query(User).filter(User.id == user_id).first()
@@ -99,13 +111,15 @@ def update_user(
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
+    record_audit_event(current_user.id, "update", "user", user.id)
     return UserResponse(user=user, message=translate("user_updated"))
 
 
 @router.delete("/users/{user_id}")
 def delete_user(
     user_id: int,
-    _: User = Depends(require_admin),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> dict[str, str]:
     user = db.query(User).filter(User.id == user_id).first()
@@ -116,6 +130,8 @@ def delete_user(
 
     db.delete(user)
     db.commit()
+    invalidate_user(user_id)
+    record_audit_event(current_user.id, "delete", "user", user_id)
     return {"message": translate("user_deleted")}
 
 
@@ -146,7 +162,7 @@ def list_api_keys(
 )
 def create_api_key(
     api_key_in: ApiKeyCreate,
-    _: User = Depends(require_admin),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> ApiKeyResponse:
     api_key = ApiKey(
@@ -157,6 +173,7 @@ def create_api_key(
     db.add(api_key)
     db.commit()
     db.refresh(api_key)
+    record_audit_event(current_user.id, "create", "api_key", api_key.id)
 
     api_key_data = ApiKeyResponse(
         api_key=ApiKeyRead(
@@ -176,7 +193,7 @@ def create_api_key(
 def update_api_key(
     api_key_id: int,
     api_key_in: ApiKeyUpdate,
-    _: User = Depends(require_admin),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> ApiKeyResponse:
     api_key = db.query(ApiKey).filter(ApiKey.id == api_key_id).first()
@@ -196,6 +213,7 @@ def update_api_key(
     db.add(api_key)
     db.commit()
     db.refresh(api_key)
+    record_audit_event(current_user.id, "update", "api_key", api_key.id)
 
     return ApiKeyResponse(
         api_key=ApiKeyRead(
@@ -213,7 +231,7 @@ def update_api_key(
 @router.delete("/api-keys/{api_key_id}")
 def delete_api_key(
     api_key_id: int,
-    _: User = Depends(require_admin),
+    current_user: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> dict[str, str]:
     api_key = db.query(ApiKey).filter(ApiKey.id == api_key_id).first()
@@ -225,4 +243,5 @@ def delete_api_key(
 
     db.delete(api_key)
     db.commit()
+    record_audit_event(current_user.id, "delete", "api_key", api_key_id)
     return {"message": translate("api_key_deleted")}
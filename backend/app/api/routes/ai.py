@@ -1,8 +1,20 @@
-from fastapi import APIRouter, Depends
+import json
+import logging
 
-from app.core.deps import get_current_user
+from fastapi import APIRouter, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.deps import get_current_user, get_current_user_async
+from app.core.localization import translate
+from app.core.pagination import NDJSON_MEDIA_TYPE
+from app.db.session import get_db
 from app.models.user import User
 from app.schemas.ai import (
+    AIBatchRequest,
+    AIBatchResponse,
     IdlePromptRequest,
     IdlePromptResponse,
     InvoiceParseRequest,
@@ -12,14 +24,32 @@ from app.schemas.ai import (
     SuggestMessageRequest,
     SuggestMessageResponse,
 )
-from app.services.ai import get_ai_engine
+from app.services.ai import AIEngine, get_ai_engine, reminder_due_at, suggestion_result
+from app.services.ai_batch import run_batch
+from app.services.ai_cache import AIResponseCache, cache_key, get_ai_cache
+from app.services.idle_clients import find_idle_clients
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai", tags=["ai"])
+settings = get_settings()
+
+SSE_MEDIA_TYPE = "text/event-stream"
+CACHE_STATUS_HEADER = "X-AI-Cache"
+
+
+def _bypass_cache(cache_control: str | None) -> bool:
+    """``Cache-Control: no-cache`` forces the response to be regenerated."""
+
+    directives = {item.strip().lower() for item in (cache_control or "").split(",")}
+    return bool(directives & {"no-cache", "no-store"})
 
 
 @router.post("/recommend")
-async def recommend(payload: dict, current_user: User = Depends(get_current_user)):
-    engine = get_ai_engine()
+async def recommend(
+    payload: dict,
+    current_user: User = Depends(get_current_user_async),
+    engine: AIEngine = Depends(get_ai_engine),
+):
     recommendation = await engine.generate_next_step(payload)
     reminder = await engine.schedule_reminder(payload)
     return {"recommendation": recommendation, "reminder": reminder}
@@ -27,35 +57,154 @@ async def recommend(payload: dict, current_user: User = Depends(get_current_user
 
 @router.post("/suggest_message", response_model=SuggestMessageResponse)
 async def suggest_message(
-    request: SuggestMessageRequest, current_user: User = Depends(get_current_user)
+    request: SuggestMessageRequest,
+    response: Response,
+    cache_control: str | None = Header(None),
+    current_user: User = Depends(get_current_user_async),
+    engine: AIEngine = Depends(get_ai_engine),
+    cache: AIResponseCache = Depends(get_ai_cache),
 ):
-    engine = get_ai_engine()
-    result = await engine.suggest_message(request.model_dump())
+    payload = request.model_dump()
+
+    async def compute() -> dict:
+        result = await engine.suggest_message(payload)
+        return SuggestMessageResponse(**result).model_dump(mode="json")
+
+    result, cache_status = await cache.get_or_compute(
+        cache_key("suggest_message", payload, engine.model),
+        compute,
+        bypass=_bypass_cache(cache_control),
+    )
+    response.headers[CACHE_STATUS_HEADER] = cache_status
     return SuggestMessageResponse(**result)
 
 
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/suggest_message/stream")
+async def suggest_message_stream(
+    request: SuggestMessageRequest,
+    http_request: Request,
+    current_user: User = Depends(get_current_user_async),
+    engine: AIEngine = Depends(get_ai_engine),
+):
+    """Stream the suggestion as server-sent events.
+
+    ``chunk`` events carry partial text; a final ``done`` event carries the
+    full ``SuggestMessageResponse``. If generation fails once the response has
+    started, the stream ends with an ``error`` event instead of ``done``.
+    Generation stops as soon as the client disconnects.
+    """
+
+    payload = request.model_dump()
+
+    async def events():
+        chunks = engine.stream_suggestion(payload)
+        parts: list[str] = []
+        try:
+            async for chunk in chunks:
+                if await http_request.is_disconnected():
+                    return
+                parts.append(chunk)
+                yield _sse_event("chunk", {"text": chunk})
+            result = SuggestMessageResponse(**suggestion_result("".join(parts).strip()))
+            yield _sse_event("done", result.model_dump(mode="json"))
+        except Exception:
+            # The 200 status is already sent; tell the client in-band.
+            logger.exception("Streaming suggestion failed after %s chunk(s)", len(parts))
+            yield _sse_event("error", {"detail": translate("ai_generation_failed")})
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/reminder_text", response_model=ReminderTextResponse)
 async def reminder_text(
-    request: ReminderTextRequest, current_user: User = Depends(get_current_user)
+    request: ReminderTextRequest,
+    response: Response,
+    cache_control: str | None = Header(None),
+    current_user: User = Depends(get_current_user_async),
+    engine: AIEngine = Depends(get_ai_engine),
+    cache: AIResponseCache = Depends(get_ai_cache),
 ):
-    engine = get_ai_engine()
-    result = await engine.generate_reminder_text(request.model_dump())
-    return ReminderTextResponse(**result)
+    payload = request.model_dump()
+
+    # Only the text is cached; ``due_at`` is relative to the request time.
+    async def compute() -> dict:
+        result = await engine.generate_reminder_text(payload)
+        return {"text": result["text"]}
+
+    result, cache_status = await cache.get_or_compute(
+        cache_key("reminder_text", payload, engine.model),
+        compute,
+        bypass=_bypass_cache(cache_control),
+    )
+    response.headers[CACHE_STATUS_HEADER] = cache_status
+    return ReminderTextResponse(text=result["text"], due_at=reminder_due_at(payload))
 
 
 @router.post("/invoice/parse", response_model=InvoiceParseResponse)
 async def parse_invoice(
-    request: InvoiceParseRequest, current_user: User = Depends(get_current_user)
+    request: InvoiceParseRequest,
+    current_user: User = Depends(get_current_user_async),
+    engine: AIEngine = Depends(get_ai_engine),
 ):
-    engine = get_ai_engine()
     result = await engine.parse_invoice(request.content)
     return InvoiceParseResponse(**result)
 
 
 @router.post("/idle_prompt", response_model=IdlePromptResponse)
 async def idle_prompt(
-    request: IdlePromptRequest, current_user: User = Depends(get_current_user)
+    request: IdlePromptRequest,
+    current_user: User = Depends(get_current_user),
+    engine: AIEngine = Depends(get_ai_engine),
+    db: Session = Depends(get_db),
 ):
-    engine = get_ai_engine()
-    result = await engine.generate_idle_prompt(request.clients)
+    clients = request.clients
+    if not clients:
+        clients = await run_in_threadpool(
+            find_idle_clients, db, current_user.id, request.idle_days, request.limit
+        )
+    result = await engine.generate_idle_prompt(clients)
     return IdlePromptResponse(**result)
+
+
+@router.post("/batch", response_model=AIBatchResponse)
+async def batch(
+    request: AIBatchRequest,
+    current_user: User = Depends(get_current_user_async),
+    engine: AIEngine = Depends(get_ai_engine),
+    cache: AIResponseCache = Depends(get_ai_cache),
+):
+    results = run_batch(
+        engine,
+        cache,
+        request.jobs,
+        concurrency=settings.ai_batch_concurrency,
+        timeout=settings.ai_batch_job_timeout_seconds,
+    )
+    if request.stream:
+
+        async def lines():
+            async for result in results:
+                yield result.model_dump_json() + "\n"
+
+        return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+    collected = [result async for result in results]
+    return AIBatchResponse(results=sorted(collected, key=lambda result: result.index))
+
+
+@router.get("/cache/stats")
+def cache_stats(
+    current_user: User = Depends(get_current_user),
+    cache: AIResponseCache = Depends(get_ai_cache),
+) -> dict:
+    return cache.stats()
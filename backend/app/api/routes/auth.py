@@ -2,13 +2,18 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user_async
 from app.core.localization import translate
-from app.core.security import create_access_token, get_password_hash, verify_password
-from app.db.session import get_db
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+)
+from app.db.session import get_async_db
 from app.models.user import User, UserRole
 from app.schemas.auth import Token, UserCreate, UserResponse
 
@@ -16,37 +21,50 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 settings = get_settings()
 
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserResponse:
-    if db.query(User).filter(User.name == user_in.name).first():
+async def _find_user(db: AsyncSession, username: str) -> User | None:
+    user = await db.scalar(select(User).where(User.name == username))
+    if not user:
+        user = await db.scalar(select(User).where(User.email == username))
+    return user
+
+
+async def _check_available(db: AsyncSession, user_in: UserCreate) -> None:
+    if await db.scalar(select(User.id).where(User.name == user_in.name)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=translate("username_already_registered"),
         )
 
-    if db.query(User).filter(User.email == user_in.email).first():
+    if await db.scalar(select(User.id).where(User.email == user_in.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=translate("email_already_registered"),
         )
+
+
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)) -> UserResponse:
+    await _check_available(db, user_in)
+    # Hashing takes a while; give the connection back to the pool meanwhile.
+    await db.rollback()
+    password_hash = await get_password_hash_async(user_in.password)
     user = User(
         name=user_in.name,
         email=user_in.email,
         role=user_in.role or UserRole.MANAGER,
-        password_hash=get_password_hash(user_in.password),
+        password_hash=password_hash,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return UserResponse(user=user, message=translate("user_created"))
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)) -> Token:
-    user = db.query(User).filter(User.name == form_data.username).first()
-
-    if not user:
-        user = db.query(User).filter(User.email == form_data.username).first()
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)
+) -> Token:
+    user = await _find_user(db, form_data.username)
 
     if not user:
         raise HTTPException(
@@ -57,7 +75,10 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             },
         )
 
-    if not verify_password(form_data.password, user.password_hash):
+    user_id, password_hash = user.id, user.password_hash
+    # Verifying takes a while; give the connection back to the pool meanwhile.
+    await db.close()
+    if not await verify_password_async(form_data.password, password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={
@@ -67,12 +88,12 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         )
 
     access_token = create_access_token(
-        subject=str(user.id),
+        subject=str(user_id),
         expires_delta=timedelta(minutes=settings.jwt_access_token_expire_minutes),
     )
     return Token(access_token=access_token, message=translate("auth_success"))
 
 
 @router.get("/me", response_model=UserResponse)
-def read_me(current_user: User = Depends(get_current_user)) -> UserResponse:
+async def read_me(current_user: User = Depends(get_current_user_async)) -> UserResponse:
     return UserResponse(user=current_user, message=translate("profile_loaded"))
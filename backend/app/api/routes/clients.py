@@ -1,65 +1,173 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from collections.abc import AsyncIterator
 
-from app.core.deps import get_current_user
-from app.db.session import get_db
-from app.models.crm import Client
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_current_user_async
+from app.core.pagination import (
+    NDJSON_MEDIA_TYPE,
+    NEXT_CURSOR_HEADER,
+    aiter_ndjson,
+    decode_cursor,
+    decode_timeline_cursor,
+    encode_cursor,
+    encode_timeline_cursor,
+)
+from app.db.routing import READ_BIND_KEY
+from app.db.session import async_session, get_async_db
+from app.models.crm import Client, reverse_phone_digits
 from app.models.user import User
-from app.schemas.crm import ClientCreate, ClientRead, ClientUpdate
+from app.schemas.crm import ClientCreate, ClientRead, ClientUpdate, TimelineEvent
+from app.services.audit import record_audit_event
+from app.services.realtime import publish_dashboard_delta
+from app.services.timeline import timeline_query
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
+STREAM_BATCH_SIZE = 500
+
+
+async def _stream_clients(query, read_bind) -> AsyncIterator[bytes]:
+    # Rows are pulled from a server-side cursor in fixed-size batches, so
+    # memory stays flat regardless of how many clients the manager has. The
+    # stream outlives the request dependencies, so it owns its session.
+    async with async_session(read_bind) as db:
+        rows = await db.stream_scalars(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for chunk in aiter_ndjson(rows, ClientRead):
+            yield chunk
+
 
 @router.get("", response_model=list[ClientRead])
-def list_clients(
+async def list_clients(
+    response: Response,
     phone_ends: str | None = Query(None, min_length=1, max_length=16),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None),
+    stream: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    query = db.query(Client).filter(Client.manager_id == current_user.id)
+    query = select(Client).where(Client.manager_id == current_user.id)
     if phone_ends:
-        suffix = "".join(filter(str.isdigit, phone_ends))
-        if suffix:
-            query = query.filter(Client.phone.ilike(f"%{suffix}"))
-    return query.order_by(Client.created_at.desc()).all()
+        prefix = reverse_phone_digits(phone_ends)
+        if prefix:
+            query = query.where(Client.phone_reversed.like(f"{prefix}%"))
+    if cursor:
+        try:
+            created_at, client_id = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+        query = query.where(
+            or_(
+                Client.created_at < created_at,
+                and_(Client.created_at == created_at, Client.id < client_id),
+            )
+        )
+    query = query.order_by(Client.created_at.desc(), Client.id.desc())
+
+    if stream:
+        return StreamingResponse(
+            _stream_clients(query, db.info.get(READ_BIND_KEY)), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    clients = (await db.scalars(query.limit(limit + 1))).all()
+    if len(clients) > limit:
+        clients = clients[:limit]
+        last = clients[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return clients
 
 
 @router.post("", response_model=ClientRead, status_code=status.HTTP_201_CREATED)
-def create_client(
+async def create_client(
     client_in: ClientCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     payload = client_in.model_dump(exclude_unset=True)
     payload["manager_id"] = current_user.id
     client = Client(**payload)
     db.add(client)
-    db.commit()
-    db.refresh(client)
+    await db.commit()
+    await db.refresh(client)
+    record_audit_event(current_user.id, "create", "client", client.id)
+    background_tasks.add_task(
+        publish_dashboard_delta,
+        current_user.id,
+        counters={"clients": 1},
+        client=ClientRead.model_validate(client).model_dump(mode="json"),
+    )
     return client
 
 
 @router.get("/{client_id}", response_model=ClientRead)
-def get_client(client_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    client = db.query(Client).filter(Client.id == client_id, Client.manager_id == current_user.id).first()
+async def get_client(
+    client_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    client = await db.scalar(
+        select(Client).where(Client.id == client_id, Client.manager_id == current_user.id)
+    )
     if not client:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
     return client
 
 
 @router.patch("/{client_id}", response_model=ClientRead)
-def update_client(
+async def update_client(
     client_id: int,
     client_in: ClientUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    client = db.query(Client).filter(Client.id == client_id, Client.manager_id == current_user.id).first()
+    client = await db.scalar(
+        select(Client).where(Client.id == client_id, Client.manager_id == current_user.id)
+    )
     if not client:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
     for field, value in client_in.model_dump(exclude_unset=True).items():
         setattr(client, field, value)
     db.add(client)
-    db.commit()
-    db.refresh(client)
+    await db.commit()
+    await db.refresh(client)
+    record_audit_event(current_user.id, "update", "client", client.id)
+    background_tasks.add_task(
+        publish_dashboard_delta,
+        current_user.id,
+        client=ClientRead.model_validate(client).model_dump(mode="json"),
+    )
     return client
+
+
+@router.get("/{client_id}/timeline", response_model=list[TimelineEvent])
+async def get_client_timeline(
+    client_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    owned = await db.scalar(
+        select(Client.id).where(Client.id == client_id, Client.manager_id == current_user.id)
+    )
+    if owned is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
+    after = None
+    if cursor:
+        try:
+            after = decode_timeline_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+    events = (await db.execute(timeline_query(client_id, limit=limit + 1, after=after))).all()
+    if len(events) > limit:
+        events = events[:limit]
+        last = events[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_timeline_cursor(last.at, last.kind, last.id)
+    return events
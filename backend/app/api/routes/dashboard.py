@@ -1,47 +1,73 @@
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
-from app.core.deps import get_current_user
-from app.db.session import get_db
-from app.models.crm import Client, Interaction, Invoice, Reminder
+from app.core.deps import get_current_user_async
+from app.db.routing import mark_write
+from app.db.session import get_async_db
+from app.models.crm import Client, Interaction, Reminder
+from app.models.stats import ManagerDailyInteractions, ManagerStats
 from app.models.user import User
+from app.services.stats import seed_manager
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("/stats")
-def get_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> dict:
-    clients_query = db.query(Client).filter(Client.manager_id == current_user.id)
-    total_clients = clients_query.count()
+async def get_stats(
+    db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)
+) -> dict:
+    week_start = datetime.utcnow().date() - timedelta(days=7)
+    manager_filter = Client.manager_id == current_user.id
 
-    interactions_query = (
-        db.query(Interaction)
-        .join(Client)
-        .filter(Client.manager_id == current_user.id)
+    # Totals are read from the incrementally maintained rollup; the last-week
+    # figure sums the seven daily buckets up to and including today.
+    interactions_last_week = (
+        select(func.coalesce(func.sum(ManagerDailyInteractions.interactions), 0))
+        .where(
+            ManagerDailyInteractions.manager_id == current_user.id,
+            ManagerDailyInteractions.day > week_start,
+        )
+        .scalar_subquery()
     )
-    total_interactions = interactions_query.count()
-
-    reminders_query = (
-        db.query(Reminder)
-        .join(Client)
-        .filter(Client.manager_id == current_user.id, Reminder.status == "pending")
-    )
-    pending_reminders = reminders_query.count()
-
-    revenue = (
-        db.query(func.coalesce(func.sum(Invoice.total_sum), 0))
-        .join(Client)
-        .filter(Client.manager_id == current_user.id)
-        .scalar()
+    totals_query = select(ManagerStats, interactions_last_week).where(
+        ManagerStats.manager_id == current_user.id
     )
+    totals = (await db.execute(totals_query)).first()
+    if totals is None:
+        mark_write(db)
+        await db.run_sync(lambda session: seed_manager(session.connection(), current_user.id))
+        await db.commit()
+        totals = (await db.execute(totals_query)).one()
+    stats, interactions_last_week = totals
+    total_clients = stats.clients
+    total_interactions = stats.interactions
+    pending_reminders = stats.pending_reminders
+    revenue = stats.revenue
 
-    recent_reminders = reminders_query.order_by(Reminder.remind_at.asc()).limit(5).all()
+    recent_reminders = (
+        await db.scalars(
+            select(Reminder)
+            .join(Client)
+            .options(contains_eager(Reminder.client))
+            .where(manager_filter, Reminder.status == "pending")
+            .order_by(Reminder.remind_at.asc())
+            .limit(5)
+        )
+    ).all()
     recent_interactions = (
-        interactions_query.order_by(Interaction.created_at.desc()).limit(5).all()
-    )
+        await db.scalars(
+            select(Interaction)
+            .join(Client)
+            .options(contains_eager(Interaction.client))
+            .where(manager_filter)
+            .order_by(Interaction.created_at.desc())
+            .limit(5)
+        )
+    ).all()
 
     ai_recommendations = [
         {
@@ -53,9 +79,6 @@ def get_stats(db: Session = Depends(get_db), current_user: User = Depends(get_cu
         if reminder.client
     ]
 
-    last_week = datetime.utcnow() - timedelta(days=7)
-    interactions_last_week = interactions_query.filter(Interaction.created_at >= last_week).count()
-
     trends = {
         "clients": f"+{total_clients} всего",
         "interactions": f"{interactions_last_week} за 7 дней",
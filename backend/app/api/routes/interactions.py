@@ -1,34 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_current_user
-from app.db.session import get_db
+from app.core.deps import get_current_user_async
+from app.db.session import get_async_db
 from app.models.crm import Client, Interaction
 from app.models.user import User
 from app.schemas.crm import InteractionCreate, InteractionRead
+from app.services.audit import record_audit_event
+from app.services.realtime import publish_dashboard_delta
 
 router = APIRouter(prefix="/interactions", tags=["interactions"])
 
 
 @router.post("", response_model=InteractionRead, status_code=status.HTTP_201_CREATED)
-def create_interaction(
+async def create_interaction(
     interaction_in: InteractionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    client = db.query(Client).filter(Client.id == interaction_in.client_id, Client.manager_id == current_user.id).first()
+    client = await db.scalar(
+        select(Client).where(Client.id == interaction_in.client_id, Client.manager_id == current_user.id)
+    )
     if not client:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
     interaction = Interaction(**interaction_in.model_dump(exclude_unset=True))
     db.add(interaction)
-    db.commit()
-    db.refresh(interaction)
+    await db.commit()
+    await db.refresh(interaction)
+    record_audit_event(current_user.id, "create", "interaction", interaction.id)
+    background_tasks.add_task(
+        publish_dashboard_delta,
+        current_user.id,
+        counters={"interactions": 1},
+        # Same shape as the recentInteractions entries of /dashboard/stats.
+        interaction={
+            "id": interaction.id,
+            "client": client.name,
+            "type": interaction.type,
+            "result": interaction.result,
+            "created_at": interaction.created_at.isoformat(),
+        },
+    )
     return interaction
 
 
 @router.get("", response_model=list[InteractionRead])
-def list_interactions(client_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    client = db.query(Client).filter(Client.id == client_id, Client.manager_id == current_user.id).first()
+async def list_interactions(
+    client_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    client = await db.scalar(
+        select(Client.id).where(Client.id == client_id, Client.manager_id == current_user.id)
+    )
     if not client:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
-    return db.query(Interaction).filter(Interaction.client_id == client_id).all()
+    return (await db.scalars(select(Interaction).where(Interaction.client_id == client_id))).all()
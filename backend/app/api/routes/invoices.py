@@ -0,0 +1,132 @@
+import logging
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.deps import get_current_user
+from app.db.session import get_db
+from app.models.crm import Client, Invoice
+from app.models.user import User
+from app.schemas.crm import InvoiceRead, InvoiceUploadResponse
+from app.services.invoices import UploadTooLarge, store_upload
+from app.workers.celery_app import parse_invoice_task
+
+router = APIRouter(prefix="/invoices", tags=["invoices"])
+logger = logging.getLogger(__name__)
+
+
+def _get_client(db: Session, client_id: int, manager_id: int) -> Client:
+    client = db.query(Client).filter(Client.id == client_id, Client.manager_id == manager_id).first()
+    if not client:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
+    return client
+
+
+def _find_duplicate(db: Session, client_id: int, content_hash: str) -> Invoice | None:
+    return (
+        db.query(Invoice)
+        .filter(Invoice.client_id == client_id, Invoice.content_hash == content_hash)
+        .first()
+    )
+
+
+def _save_invoice(db: Session, invoice: Invoice) -> Invoice | None:
+    """Insert ``invoice``; returns ``None`` if a concurrent upload of the same file won."""
+
+    db.add(invoice)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    db.refresh(invoice)
+    return invoice
+
+
+def _enqueue_parsing(db: Session, invoice: Invoice) -> Invoice:
+    """Queue the parse task; if the broker is down, record the invoice as failed.
+
+    Uploading the same file again retries a failed invoice.
+    """
+
+    try:
+        parse_invoice_task.delay(invoice.id)
+    except Exception as exc:  # noqa: BLE001 - the failure is recorded on the invoice
+        logger.exception("Could not queue parsing of invoice %s", invoice.id)
+        invoice.status = "failed"
+        invoice.error = f"Could not queue parsing: {exc}"[:500]
+        db.commit()
+        db.refresh(invoice)
+    return invoice
+
+
+def _retry_parsing(db: Session, invoice: Invoice) -> Invoice:
+    invoice.status = "pending"
+    invoice.error = None
+    db.commit()
+    db.refresh(invoice)
+    return _enqueue_parsing(db, invoice)
+
+
+@router.post("", response_model=InvoiceUploadResponse, status_code=status.HTTP_201_CREATED)
+async def upload_invoice(
+    response: Response,
+    client_id: int = Form(...),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await run_in_threadpool(_get_client, db, client_id, current_user.id)
+    try:
+        stored = await store_upload(file)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)) from exc
+
+    duplicate = await run_in_threadpool(_find_duplicate, db, client_id, stored.content_hash)
+    if duplicate is None:
+        invoice = Invoice(
+            client_id=client_id,
+            file_path=str(stored.path),
+            file_name=file.filename,
+            content_hash=stored.content_hash,
+            status="pending",
+        )
+        saved = await run_in_threadpool(_save_invoice, db, invoice)
+        if saved is not None:
+            invoice = await run_in_threadpool(_enqueue_parsing, db, saved)
+            return InvoiceUploadResponse(invoice=invoice)
+        # A concurrent upload of the same file committed first.
+        duplicate = await run_in_threadpool(_find_duplicate, db, client_id, stored.content_hash)
+        if duplicate is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Invoice could not be saved")
+
+    if duplicate.status == "failed":
+        duplicate = await run_in_threadpool(_retry_parsing, db, duplicate)
+    response.status_code = status.HTTP_200_OK
+    return InvoiceUploadResponse(invoice=duplicate, duplicate=True)
+
+
+@router.get("/{invoice_id}", response_model=InvoiceRead)
+def get_invoice(invoice_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    invoice = (
+        db.query(Invoice)
+        .join(Client)
+        .filter(Invoice.id == invoice_id, Client.manager_id == current_user.id)
+        .first()
+    )
+    if not invoice:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
+    return invoice
+
+
+@router.get("", response_model=list[InvoiceRead])
+def list_invoices(client_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    _get_client(db, client_id, current_user.id)
+    return (
+        db.query(Invoice)
+        .filter(Invoice.client_id == client_id)
+        .order_by(Invoice.created_at.desc(), Invoice.id.desc())
+        .all()
+    )
@@ -1,25 +1,58 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_user
+from app.db.session import get_db
+from app.models.push import PushSubscription
 from app.models.user import User
-from app.workers.celery_app import send_push_task
+from app.schemas.push import PushSubscriptionCreate, PushSubscriptionRemove
+from app.services.push_subscriptions import (
+    endpoint_hash,
+    enqueue_push_messages,
+    get_user_subscriptions,
+    register_subscription,
+    remove_subscriptions,
+)
 
 router = APIRouter(prefix="/push", tags=["push"])
 
-subscriptions: dict[int, list[dict]] = {}
-
 
 @router.post("/register", status_code=status.HTTP_204_NO_CONTENT)
-def register(subscription: dict, current_user: User = Depends(get_current_user)) -> None:
-    user_subscriptions = subscriptions.setdefault(current_user.id, [])
-    user_subscriptions.append(subscription)
+def register(
+    subscription: PushSubscriptionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> None:
+    register_subscription(db, current_user.id, subscription)
+
+
+@router.post("/unregister", status_code=status.HTTP_204_NO_CONTENT)
+def unregister(
+    subscription: PushSubscriptionRemove,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> None:
+    digest = endpoint_hash(subscription.endpoint)
+    owned = (
+        db.query(PushSubscription.id)
+        .filter(PushSubscription.endpoint_hash == digest, PushSubscription.user_id == current_user.id)
+        .first()
+    )
+    if owned:
+        remove_subscriptions(db, [digest])
 
 
 @router.post("/send", status_code=status.HTTP_202_ACCEPTED)
-def send(payload: dict, current_user: User = Depends(get_current_user)) -> dict:
-    user_subscriptions = subscriptions.get(current_user.id)
+def send(
+    payload: dict,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    user_subscriptions = get_user_subscriptions(db, current_user.id)
     if not user_subscriptions:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No subscriptions found")
-    for subscription in user_subscriptions:
-        send_push_task.delay(subscription, payload.get("message", ""))
+    message = payload.get("message", "")
+    enqueue_push_messages(
+        [{"subscription": subscription, "payload": message} for subscription in user_subscriptions]
+    )
     return {"scheduled": len(user_subscriptions)}
@@ -1,42 +1,106 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_current_user
-from app.db.session import get_db
+from app.core.config import get_settings
+from app.core.deps import get_current_user_async
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.db.session import get_async_db
 from app.models.crm import Client, Reminder
 from app.models.user import User
 from app.schemas.crm import ReminderCreate, ReminderRead
+from app.services.audit import record_audit_event
+from app.services.realtime import publish_dashboard_delta
 
 router = APIRouter(prefix="/reminders", tags=["reminders"])
 
 
 @router.post("", response_model=ReminderRead, status_code=status.HTTP_201_CREATED)
-def create_reminder(
+async def create_reminder(
     reminder_in: ReminderCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    client = db.query(Client).filter(Client.id == reminder_in.client_id, Client.manager_id == current_user.id).first()
+    client = await db.scalar(
+        select(Client).where(Client.id == reminder_in.client_id, Client.manager_id == current_user.id)
+    )
     if not client:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
     reminder = Reminder(**reminder_in.model_dump(exclude_unset=True))
     db.add(reminder)
-    db.commit()
-    db.refresh(reminder)
+    await db.commit()
+    await db.refresh(reminder)
+    record_audit_event(current_user.id, "create", "reminder", reminder.id)
+    background_tasks.add_task(
+        publish_dashboard_delta,
+        current_user.id,
+        counters={"reminders": 1} if reminder.status == "pending" else {},
+        reminder={**ReminderRead.model_validate(reminder).model_dump(mode="json"), "client": client.name},
+    )
     return reminder
 
 
+def _as_utc(value: datetime) -> datetime:
+    # Reminder times are stored as naive UTC; naive input is taken as UTC too.
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _today_bounds(tz_name: str) -> tuple[datetime, datetime]:
+    try:
+        tz = ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid timezone") from exc
+    start = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    # Aware arithmetic is wall-clock, so this is the next local midnight even
+    # across a DST change.
+    return _as_utc(start), _as_utc(start + timedelta(days=1))
+
+
 @router.get("", response_model=list[ReminderRead])
-def list_reminders(
+async def list_reminders(
+    response: Response,
     due_today: bool | None = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    tz: str | None = Query(None, max_length=64, description="IANA timezone that defines 'today'"),
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = Query(None),
+    status_filter: str | None = Query(None, alias="status", max_length=32),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    query = db.query(Reminder).join(Client).filter(Client.manager_id == current_user.id)
+    query = select(Reminder).join(Reminder.client).where(Client.manager_id == current_user.id)
     if due_today:
-        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        end = start + timedelta(days=1)
-        query = query.filter(Reminder.remind_at >= start, Reminder.remind_at < end)
-    return query.order_by(Reminder.remind_at.asc()).all()
+        start, end = _today_bounds(tz or get_settings().default_timezone)
+        query = query.where(Reminder.remind_at >= start, Reminder.remind_at < end)
+    if from_:
+        query = query.where(Reminder.remind_at >= _as_utc(from_))
+    if to:
+        query = query.where(Reminder.remind_at < _as_utc(to))
+    if status_filter:
+        query = query.where(Reminder.status == status_filter)
+    if cursor:
+        try:
+            remind_at, reminder_id = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+        query = query.where(
+            or_(
+                Reminder.remind_at > remind_at,
+                and_(Reminder.remind_at == remind_at, Reminder.id > reminder_id),
+            )
+        )
+    query = query.order_by(Reminder.remind_at.asc(), Reminder.id.asc())
+
+    reminders = (await db.scalars(query.limit(limit + 1))).all()
+    if len(reminders) > limit:
+        reminders = reminders[:limit]
+        last = reminders[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.remind_at, last.id)
+    return reminders
@@ -1,4 +1,10 @@
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, Depends, status
+
+from app.api.routes.admin import require_admin
+from app.db.instrumentation import reset_metrics, snapshot_metrics
+from app.models.user import User
 
 router = APIRouter(tags=["system"])
 
@@ -6,3 +12,15 @@ router = APIRouter(tags=["system"])
 @router.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/metrics/db")
+def database_metrics(_: User = Depends(require_admin)) -> dict[str, Any]:
+    """Pool gauges, checkout waits and statement timings of each engine."""
+
+    return {"engines": snapshot_metrics()}
+
+
+@router.delete("/metrics/db", status_code=status.HTTP_204_NO_CONTENT)
+def reset_database_metrics(_: User = Depends(require_admin)) -> None:
+    reset_metrics()
@@ -14,25 +14,86 @@ class Settings(BaseSettings):
         "sqlite:///./salesupport.db",
         env="DATABASE_URL",
     )
+    db_pool_size: int = Field(5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(30.0, env="DB_POOL_TIMEOUT")
+    db_pool_recycle_seconds: int = Field(1800, env="DB_POOL_RECYCLE")
+    db_slow_statement_ms: float = Field(500.0, env="DB_SLOW_STATEMENT_MS")
+    database_replica_urls: str = Field("", env="DATABASE_REPLICA_URLS")
+    db_replica_check_interval_seconds: float = Field(10.0, env="DB_REPLICA_CHECK_INTERVAL_SECONDS")
+    db_replica_stickiness_seconds: float = Field(5.0, env="DB_REPLICA_STICKINESS_SECONDS")
+    db_replica_pin_redis: bool = Field(False, env="DB_REPLICA_PIN_REDIS")
+
     redis_url: str = Field("redis://redis:6379/0", env="REDIS_URL")
 
     jwt_secret_key: str = Field("super-secret", env="JWT_SECRET_KEY")
     jwt_algorithm: str = Field("HS256", env="JWT_ALGORITHM")
     jwt_access_token_expire_minutes: int = Field(60, env="JWT_ACCESS_EXPIRE")
 
+    password_hash_rounds: int = Field(29000, env="PASSWORD_HASH_ROUNDS")
+    password_hash_workers: int = Field(2, env="PASSWORD_HASH_WORKERS")
+
+    principal_cache_ttl_seconds: float = Field(30.0, env="PRINCIPAL_CACHE_TTL")
+    principal_cache_size: int = Field(10000, env="PRINCIPAL_CACHE_SIZE")
+    principal_cache_redis: bool = Field(False, env="PRINCIPAL_CACHE_REDIS")
+
     cors_origins: List[str] = Field(default_factory=lambda: ["*"], env="CORS_ORIGINS")
 
     openai_api_key: str = Field("", env="OPENAI_API_KEY")
     openai_model: str = Field("gpt-4o", env="OPENAI_MODEL")
     openai_temperature: float = Field(0.3, env="OPENAI_TEMPERATURE")
+    openai_base_url: str = Field("https://api.openai.com/v1", env="OPENAI_BASE_URL")
+    ai_max_connections: int = Field(20, env="AI_MAX_CONNECTIONS")
+    ai_max_keepalive_connections: int = Field(10, env="AI_MAX_KEEPALIVE_CONNECTIONS")
+    ai_keepalive_expiry_seconds: float = Field(30.0, env="AI_KEEPALIVE_EXPIRY")
+    ai_connect_timeout_seconds: float = Field(5.0, env="AI_CONNECT_TIMEOUT")
+    ai_request_timeout_seconds: float = Field(30.0, env="AI_REQUEST_TIMEOUT")
+    ai_batch_concurrency: int = Field(8, env="AI_BATCH_CONCURRENCY")
+    ai_batch_job_timeout_seconds: float = Field(20.0, env="AI_BATCH_JOB_TIMEOUT")
+    ai_cache_ttl_seconds: float = Field(300.0, env="AI_CACHE_TTL")
+    ai_cache_size: int = Field(1000, env="AI_CACHE_SIZE")
+    ai_cache_redis: bool = Field(False, env="AI_CACHE_REDIS")
+
+    socketio_redis: bool = Field(False, env="SOCKETIO_REDIS")
+    socketio_channel: str = Field("salesupport-socketio", env="SOCKETIO_CHANNEL")
+    socketio_max_queue_size: int = Field(100, env="SOCKETIO_MAX_QUEUE")
+    socketio_max_message_bytes: int = Field(64 * 1024, env="SOCKETIO_MAX_MESSAGE_BYTES")
 
     vapid_public_key: str = Field("", env="VAPID_PUBLIC_KEY")
     vapid_private_key: str = Field("", env="VAPID_PRIVATE_KEY")
     vapid_email: str = Field("mailto:admin@example.com", env="VAPID_EMAIL")
+    push_cache_redis: bool = Field(False, env="PUSH_CACHE_REDIS")
+    push_cache_ttl_seconds: int = Field(300, env="PUSH_CACHE_TTL")
+    push_batch_size: int = Field(100, env="PUSH_BATCH_SIZE")
+    push_pool_size: int = Field(10, env="PUSH_POOL_SIZE")
+    push_request_timeout_seconds: float = Field(10.0, env="PUSH_REQUEST_TIMEOUT")
+    push_max_retries: int = Field(5, env="PUSH_MAX_RETRIES")
+    push_retry_backoff_seconds: float = Field(2.0, env="PUSH_RETRY_BACKOFF")
+
+    reminder_dispatch_interval_seconds: float = Field(10.0, env="REMINDER_DISPATCH_INTERVAL")
+    reminder_dispatch_batch_size: int = Field(1000, env="REMINDER_DISPATCH_BATCH_SIZE")
 
     retention_days: int = Field(90, env="RETENTION_DAYS")
+    retention_batch_size: int = Field(500, env="RETENTION_BATCH_SIZE")
+    retention_batch_pause_seconds: float = Field(0.1, env="RETENTION_BATCH_PAUSE_SECONDS")
+    retention_interval_seconds: float = Field(3600.0, env="RETENTION_INTERVAL_SECONDS")
+
+    audit_flush_size: int = Field(200, env="AUDIT_FLUSH_SIZE")
+    audit_flush_interval_seconds: float = Field(1.0, env="AUDIT_FLUSH_INTERVAL_SECONDS")
+    audit_max_buffer: int = Field(100_000, env="AUDIT_MAX_BUFFER")
+    audit_spill_dir: str = Field(
+        default=str(Path(__file__).resolve().parent.parent.parent / "storage" / "audit-spill"),
+        env="AUDIT_SPILL_DIR",
+    )
+
+    invoice_storage_dir: str = Field(
+        default=str(Path(__file__).resolve().parent.parent.parent / "storage" / "invoices"),
+        env="INVOICE_STORAGE_DIR",
+    )
+    invoice_max_upload_mb: int = Field(25, env="INVOICE_MAX_UPLOAD_MB")
 
     default_locale: str = Field("ru", env="DEFAULT_LOCALE")
+    default_timezone: str = Field("UTC", env="DEFAULT_TIMEZONE")
     locale_directory: str = Field(
         default=str(Path(__file__).resolve().parent.parent / "locales"),
         env="LOCALE_DIR",
@@ -41,6 +102,7 @@ class Settings(BaseSettings):
     default_admin_credentials: str = Field(
         "admin:878707Server", env="DEFAULT_ADMIN_CREDENTIALS"
     )
+    admin_password_stamp_key: str = Field("", env="ADMIN_PASSWORD_STAMP_KEY")
 
     model_config = SettingsConfigDict(
         env_file=Path(__file__).resolve().parent.parent.parent / ".env",
@@ -61,6 +123,9 @@ class Settings(BaseSettings):
             raise ValueError("DEFAULT_ADMIN_CREDENTIALS must be in the format 'username:password'")
         return value
 
+    def get_replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.database_replica_urls.split(",") if url.strip()]
+
     def get_default_admin(self) -> Tuple[str, str]:
         username, password = self.default_admin_credentials.split(":", 1)
         return username.strip(), password.strip()
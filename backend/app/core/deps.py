@@ -1,16 +1,25 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.localization import translate
+from app.core.principal_cache import get_principal_cache
 from app.core.security import decode_token
-from app.db.session import get_db
+from app.db.routing import READ_BIND_KEY, read_from_primary
+from app.db.session import get_async_db, get_db
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Routes on the sync ``get_db`` session depend on ``get_current_user`` and
+# routes on ``get_async_db`` on ``get_current_user_async``. FastAPI caches
+# dependencies per request, so the lookup reuses the route's own session
+# instead of checking out a second connection.
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+
+def _user_id(token: str) -> int:
     try:
         payload = decode_token(token)
     except ValueError as exc:
@@ -18,11 +27,43 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=translate("invalid_token"),
         ) from exc
+    return int(payload.get("sub", 0))
+
 
-    user = db.query(User).filter(User.id == int(payload.get("sub", 0))).first()
+def _found(user: User | None, token: str) -> User:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=translate("user_not_found"),
         )
+    get_principal_cache().set(token, user)
     return user
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    user_id = _user_id(token)
+    user = get_principal_cache().get(user_id, token)
+    if user is not None:
+        return user
+
+    user = db.scalar(select(User).where(User.id == user_id))
+    if not user and db.info.get(READ_BIND_KEY) is not None:
+        # The account may be newer than the replica's copy of the data.
+        read_from_primary(db)
+        user = db.scalar(select(User).where(User.id == user_id))
+    return _found(user, token)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user_id = _user_id(token)
+    user = get_principal_cache().get(user_id, token)
+    if user is not None:
+        return user
+
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user and db.info.get(READ_BIND_KEY) is not None:
+        read_from_primary(db)
+        user = await db.scalar(select(User).where(User.id == user_id))
+    return _found(user, token)
@@ -0,0 +1,70 @@
+"""Helpers for keyset (cursor) pagination."""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Tuple
+
+from pydantic import BaseModel
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> Any:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the keyset position of the last row returned to the caller."""
+
+    return _encode([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises ``ValueError`` when the cursor is malformed.
+    """
+
+    try:
+        timestamp, row_id = _decode(cursor)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_timeline_cursor(at: datetime, kind: str, row_id: int) -> str:
+    """Like :func:`encode_cursor`, for rows merged from several tables."""
+
+    return _encode([at.isoformat(), kind, row_id])
+
+
+def decode_timeline_cursor(cursor: str) -> Tuple[datetime, str, int]:
+    try:
+        timestamp, kind, row_id = _decode(cursor)
+        return datetime.fromisoformat(timestamp), str(kind), int(row_id)
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def iter_ndjson(rows: Iterable[Any], schema: type[BaseModel]) -> Iterator[bytes]:
+    """Serialize ORM rows one by one as newline-delimited JSON."""
+
+    for row in rows:
+        yield schema.model_validate(row).model_dump_json().encode("utf-8") + b"\n"
+
+
+async def aiter_ndjson(rows: AsyncIterable[Any], schema: type[BaseModel]) -> AsyncIterator[bytes]:
+    """Async counterpart of :func:`iter_ndjson` for streamed async results."""
+
+    async for row in rows:
+        yield schema.model_validate(row).model_dump_json().encode("utf-8") + b"\n"
@@ -0,0 +1,137 @@
+"""Short-lived cache of authenticated principals.
+
+``get_current_user`` runs on every authenticated request. Resolved users are
+cached per (user id, token) for ``principal_cache_ttl_seconds`` in an
+in-process LRU and, when ``principal_cache_redis`` is enabled, in a Redis hash
+per user that all workers share. Admin changes call :func:`invalidate_user`,
+which drops the local entries and the Redis hash; other workers' local
+entries expire within the TTL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "principal:"
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _serialize(user: User) -> Dict[str, Any]:
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "role": UserRole(user.role).value,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
+
+
+def _deserialize(data: Dict[str, Any]) -> User:
+    created_at = data.get("created_at")
+    return User(
+        id=data["id"],
+        name=data["name"],
+        email=data["email"],
+        role=UserRole(data["role"]),
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+    )
+
+
+class PrincipalCache:
+    def __init__(self, ttl: float, maxsize: int, redis_client: Any = None) -> None:
+        self.ttl = ttl
+        self.local: TTLCache[Dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.redis = redis_client
+
+    def get(self, user_id: int, token: str) -> Optional[User]:
+        if self.ttl <= 0:
+            return None
+        key = (user_id, _token_digest(token))
+        data = self.local.get(key)
+        if data is None and self.redis is not None:
+            data = self._redis_get(*key)
+            if data is not None:
+                self.local.set(key, data)
+        return _deserialize(data) if data is not None else None
+
+    def set(self, token: str, user: User) -> None:
+        if self.ttl <= 0:
+            return
+        key = (user.id, _token_digest(token))
+        data = _serialize(user)
+        self.local.set(key, data)
+        if self.redis is not None:
+            self._redis_set(key[0], key[1], data)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.local.delete_where(lambda key: key[0] == user_id)
+        if self.redis is not None:
+            try:
+                self.redis.delete(f"{REDIS_KEY_PREFIX}{user_id}")
+            except Exception:  # pragma: no cover - depends on Redis availability
+                logger.warning("Failed to invalidate cached principal %s in Redis", user_id, exc_info=True)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def _redis_get(self, user_id: int, digest: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = self.redis.hget(f"{REDIS_KEY_PREFIX}{user_id}", digest)
+        except Exception:  # pragma: no cover - depends on Redis availability
+            logger.warning("Principal cache lookup in Redis failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        if entry["expires_at"] <= time.time():
+            return None
+        return entry["user"]
+
+    def _redis_set(self, user_id: int, digest: str, data: Dict[str, Any]) -> None:
+        key = f"{REDIS_KEY_PREFIX}{user_id}"
+        entry = json.dumps({"expires_at": time.time() + self.ttl, "user": data})
+        try:
+            pipeline = self.redis.pipeline()
+            pipeline.hset(key, digest, entry)
+            pipeline.expire(key, max(1, int(self.ttl)))
+            pipeline.execute()
+        except Exception:  # pragma: no cover - depends on Redis availability
+            logger.warning("Principal cache write to Redis failed", exc_info=True)
+
+
+@lru_cache()
+def get_principal_cache() -> PrincipalCache:
+    settings = get_settings()
+    redis_client = None
+    if settings.principal_cache_redis:
+        import redis
+
+        redis_client = redis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.2, socket_connect_timeout=0.2
+        )
+    return PrincipalCache(
+        ttl=settings.principal_cache_ttl_seconds,
+        maxsize=settings.principal_cache_size,
+        redis_client=redis_client,
+    )
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop every cached principal of ``user_id``."""
+
+    get_principal_cache().invalidate_user(user_id)
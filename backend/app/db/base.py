@@ -1,2 +1,2 @@
 # Import all the models, so that Base has them before being imported by Alembic
-from app.models import api_key, crm, user  # noqa: F401
+from app.models import api_key, archive, crm, push, stats, system, user  # noqa: F401
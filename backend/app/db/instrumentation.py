@@ -0,0 +1,254 @@
+"""Connection pool and statement metrics for the database engines.
+
+Each engine gets an :class:`EngineMetrics`, which records:
+
+* pool checkouts, including how long callers waited for a connection,
+  how many checkouts needed an overflow connection, and pool timeouts;
+* connections opened and invalidated;
+* per-statement execution counts and timings.
+
+Checkout waits are timed by a pool subclass from :func:`timed_pool`.
+Statement timings come from engine cursor events. Pool gauges (size,
+checked out, overflow) are read from the live pool when a snapshot is
+taken. ``GET /metrics/db`` serves the snapshots.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_KEY_LENGTH = 200
+OTHER_STATEMENTS = "<other>"
+TOP_STATEMENTS = 20
+
+_registry: Dict[str, "EngineMetrics"] = {}
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class EngineMetrics:
+    """Thread-safe counters for one engine."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        slow_statement_ms: float = 500.0,
+        max_statements: int = 200,
+        wait_samples: int = 1024,
+    ) -> None:
+        self.name = name
+        self.slow_statement_ms = slow_statement_ms
+        self.max_statements = max_statements
+        self._wait_samples = wait_samples
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.overflow_checkouts = 0
+            self.checkout_timeouts = 0
+            self.checkout_wait_total_ms = 0.0
+            self.checkout_wait_max_ms = 0.0
+            self._waits: Deque[float] = deque(maxlen=self._wait_samples)
+            self.connections_opened = 0
+            self.connections_invalidated = 0
+            self.slow_statements = 0
+            self._statements: Dict[str, StatementStats] = {}
+
+    def record_checkout(self, wait_ms: float, *, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_checkouts += int(overflow)
+            self.checkout_wait_total_ms += wait_ms
+            self.checkout_wait_max_ms = max(self.checkout_wait_max_ms, wait_ms)
+            self._waits.append(wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_invalidate(self) -> None:
+        with self._lock:
+            self.connections_invalidated += 1
+
+    def record_statement(self, statement: str, elapsed_ms: float) -> None:
+        key = " ".join(statement.split())[:STATEMENT_KEY_LENGTH]
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    key = OTHER_STATEMENTS
+                stats = self._statements.setdefault(key, StatementStats())
+            stats.add(elapsed_ms)
+            slow = elapsed_ms >= self.slow_statement_ms
+            self.slow_statements += int(slow)
+        if slow:
+            logger.warning("Slow statement on %s (%.1f ms): %s", self.name, elapsed_ms, key)
+
+    def _pool_gauges(self) -> Dict[str, Any]:
+        pool = self._engine.pool if self._engine is not None else None
+        if pool is None:
+            return {}
+        gauges: Dict[str, Any] = {"class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            gauges.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeout_seconds=pool.timeout(),
+            )
+        gauges["recycle_seconds"] = pool._recycle
+        return gauges
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = list(self._waits)
+            statements = sorted(
+                self._statements.items(), key=lambda item: item[1].total_ms, reverse=True
+            )
+            count = sum(stats.count for _, stats in statements)
+            total_ms = sum(stats.total_ms for _, stats in statements)
+            checkouts = {
+                "count": self.checkouts,
+                "overflow": self.overflow_checkouts,
+                "timeouts": self.checkout_timeouts,
+                "wait_ms_avg": self.checkout_wait_total_ms / self.checkouts if self.checkouts else 0.0,
+                "wait_ms_p50": _percentile(waits, 0.5),
+                "wait_ms_p95": _percentile(waits, 0.95),
+                "wait_ms_max": self.checkout_wait_max_ms,
+            }
+            connections = {
+                "opened": self.connections_opened,
+                "invalidated": self.connections_invalidated,
+            }
+            slow = self.slow_statements
+        return {
+            "pool": self._pool_gauges(),
+            "checkouts": checkouts,
+            "connections": connections,
+            "statements": {
+                "count": count,
+                "total_ms": total_ms,
+                "slow": slow,
+                "slow_threshold_ms": self.slow_statement_ms,
+                "top": [
+                    {
+                        "statement": statement,
+                        "count": stats.count,
+                        "total_ms": stats.total_ms,
+                        "avg_ms": stats.total_ms / stats.count,
+                        "max_ms": stats.max_ms,
+                    }
+                    for statement, stats in statements[:TOP_STATEMENTS]
+                ],
+            },
+        }
+
+
+class _TimedCheckout:
+    """Pool mixin that times how long ``connect()`` waits for a connection."""
+
+    metrics: EngineMetrics
+
+    def _do_get(self) -> Any:
+        overflow_before = self.overflow() if isinstance(self, QueuePool) else 0
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        overflow = isinstance(self, QueuePool) and self.overflow() > max(overflow_before, 0)
+        self.metrics.record_checkout((time.perf_counter() - started) * 1000, overflow=overflow)
+        return record
+
+
+def timed_pool(base: Type[Pool], metrics: EngineMetrics) -> Type[Pool]:
+    """Return a subclass of ``base`` that reports checkout waits to ``metrics``.
+
+    The metrics live on the class, so they carry over when ``dispose()``
+    recreates the pool.
+    """
+
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"metrics": metrics})
+
+
+def instrument_engine(engine: Engine, metrics: EngineMetrics) -> EngineMetrics:
+    """Attach connection and statement listeners and register ``metrics``.
+
+    Pass ``async_engine.sync_engine`` for an asyncio engine.
+    """
+
+    metrics._engine = engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.record_connect()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        metrics.record_invalidate()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info["query_started"].pop()
+        metrics.record_statement(statement, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context: Any) -> None:
+        stack = context.connection.info.get("query_started") if context.connection else None
+        if stack:
+            stack.pop()
+
+    _registry[metrics.name] = metrics
+    return metrics
+
+
+def snapshot_metrics() -> Dict[str, Any]:
+    return {name: metrics.snapshot() for name, metrics in _registry.items()}
+
+
+def reset_metrics() -> None:
+    for metrics in _registry.values():
+        metrics.reset()
@@ -0,0 +1,224 @@
+"""Lightweight, idempotent schema migrations.
+
+``Base.metadata.create_all`` only creates missing tables; it never alters an
+existing one. :func:`run_migrations` brings databases created by older
+releases up to date; its steps are cheap and safe to run on every start.
+
+Indexes added to tables that already exist are built separately by
+:func:`create_indexes`, which ``python -m app.db.migrations`` runs once per
+deployment. On PostgreSQL it uses ``CREATE INDEX CONCURRENTLY``, so writes to
+the table carry on while the index builds; a build that fails leaves an
+invalid index, which the next run drops and rebuilds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+from sqlalchemy import Index, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.base_class import Base
+from app.models.crm import reverse_phone_digits
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def add_column_if_missing(connection: Connection, table: str, column: str, ddl_type: str) -> bool:
+    """Add ``column`` to ``table`` when the table exists without it."""
+
+    inspector = inspect(connection)
+    if not inspector.has_table(table):
+        return False
+    if any(item["name"] == column for item in inspector.get_columns(table)):
+        return False
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+    logger.info("Added column %s.%s", table, column)
+    return True
+
+
+def backfill_client_phone_reversed(engine: Engine, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Populate ``clients.phone_reversed`` in short, bounded transactions."""
+
+    total = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                text(
+                    "SELECT id, phone FROM clients "
+                    "WHERE phone_reversed IS NULL AND id > :last_id "
+                    "ORDER BY id LIMIT :limit"
+                ),
+                {"last_id": last_id, "limit": batch_size},
+            ).all()
+            if not rows:
+                break
+            connection.execute(
+                text("UPDATE clients SET phone_reversed = :value WHERE id = :id"),
+                [{"id": row.id, "value": reverse_phone_digits(row.phone)} for row in rows],
+            )
+        total += len(rows)
+        last_id = rows[-1].id
+    if total:
+        logger.info("Backfilled phone_reversed for %s clients", total)
+    return total
+
+
+def drop_foreign_key_if_exists(connection: Connection, table: str, column: str) -> bool:
+    """Drop the foreign key constraint on ``table.column``, if any.
+
+    SQLite cannot drop constraints in place; it does not enforce foreign keys
+    unless asked to, so its tables are left as they are.
+    """
+
+    if connection.dialect.name == "sqlite":
+        return False
+    inspector = inspect(connection)
+    if not inspector.has_table(table):
+        return False
+    dropped = False
+    for foreign_key in inspector.get_foreign_keys(table):
+        if foreign_key["constrained_columns"] == [column] and foreign_key["name"]:
+            connection.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{foreign_key["name"]}"'))
+            logger.info("Dropped foreign key %s on %s.%s", foreign_key["name"], table, column)
+            dropped = True
+    return dropped
+
+
+def drop_index_if_exists(connection: Connection, table: str, index: str) -> bool:
+    inspector = inspect(connection)
+    if not inspector.has_table(table):
+        return False
+    if index not in {item["name"] for item in inspector.get_indexes(table)}:
+        return False
+    concurrently = " CONCURRENTLY" if connection.dialect.name == "postgresql" else ""
+    connection.execute(text(f"DROP INDEX{concurrently} {index}"))
+    logger.info("Dropped index %s", index)
+    return True
+
+
+def clear_duplicate_invoice_hashes(connection: Connection) -> int:
+    """Clear ``content_hash`` on all but the first copy of each uploaded file.
+
+    Uploads raced before the unique index existed; the extra copies keep
+    their data but no longer take part in deduplication.
+    """
+
+    if not inspect(connection).has_table("invoices"):
+        return 0
+    result = connection.execute(
+        text(
+            "UPDATE invoices SET content_hash = NULL "
+            "WHERE content_hash IS NOT NULL AND id NOT IN ("
+            "SELECT MIN(id) FROM invoices WHERE content_hash IS NOT NULL "
+            "GROUP BY client_id, content_hash)"
+        )
+    )
+    if result.rowcount:
+        logger.info("Cleared %s duplicate invoice hashes", result.rowcount)
+    return result.rowcount
+
+
+def _drop_invalid_indexes(connection: Connection) -> None:
+    """Drop indexes left invalid by an interrupted concurrent build."""
+
+    names = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid"
+        )
+    ).scalars()
+    for name in list(names):
+        connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        logger.warning("Dropped invalid index %s", name)
+
+
+def _create_index(connection: Connection, index: Index) -> None:
+    if connection.dialect.name != "postgresql":
+        index.create(connection)
+        return
+    options = index.dialect_options["postgresql"]
+    options["concurrently"] = True
+    try:
+        index.create(connection)
+    finally:
+        options["concurrently"] = False
+
+
+def create_missing_indexes(connection: Connection) -> List[str]:
+    """Create indexes declared on the models that do not exist yet."""
+
+    if connection.dialect.name == "postgresql":
+        _drop_invalid_indexes(connection)
+    inspector = inspect(connection)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                _create_index(connection, index)
+                logger.info("Created index %s", index.name)
+                created.append(index.name)
+    return created
+
+
+def create_indexes(engine: Engine) -> List[str]:
+    """Build the model indexes missing from existing tables.
+
+    Returns the names of the indexes created. Each index is built outside
+    of a transaction, concurrently on PostgreSQL.
+    """
+
+    with engine.begin() as connection:
+        clear_duplicate_invoice_hashes(connection)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        created = create_missing_indexes(connection)
+        # The unique index replaces the old lookup index on the same columns.
+        drop_index_if_exists(connection, "invoices", "ix_invoices_client_hash")
+    return created
+
+
+def run_migrations(engine: Engine) -> None:
+    """Apply all pending schema changes except index builds."""
+
+    with engine.begin() as connection:
+        add_column_if_missing(connection, "clients", "phone_reversed", "VARCHAR")
+        add_column_if_missing(connection, "invoices", "file_name", "VARCHAR")
+        add_column_if_missing(connection, "invoices", "content_hash", "VARCHAR(64)")
+        add_column_if_missing(connection, "invoices", "status", "VARCHAR NOT NULL DEFAULT 'parsed'")
+        add_column_if_missing(connection, "invoices", "error", "VARCHAR")
+        if add_column_if_missing(connection, "invoices", "created_at", "TIMESTAMP"):
+            connection.execute(
+                text("UPDATE invoices SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+            )
+        add_column_if_missing(connection, "reminders", "queued_at", "TIMESTAMP")
+        add_column_if_missing(connection, "reminders_archive", "queued_at", "TIMESTAMP")
+        drop_foreign_key_if_exists(connection, "audit_log", "user_id")
+    backfill_client_phone_reversed(engine)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Apply pending migrations and build missing indexes without blocking writes."
+    )
+    parser.parse_args(argv)
+
+    from app.db.session import engine
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    created = create_indexes(engine)
+    print(f"Created {len(created)} index(es)" + (f": {', '.join(created)}" if created else ""))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - command line entry point
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Route read-only requests to database replicas.
+
+``DATABASE_REPLICA_URLS`` lists read replicas of the primary database.
+Sessions are instances of :class:`RoutingSession`. For GET requests, the
+dependencies in ``app.db.session`` give the session one replica, chosen
+round-robin among the healthy ones, and the session reads from it.
+
+* Flushes and DML statements always go to the primary.
+* After a session's first write, every later statement of that session
+  goes to the primary too.
+* A caller whose request wrote something is pinned to the primary for
+  ``db_replica_stickiness_seconds``, so their next reads see their own
+  writes despite replication lag. Pins live in the process and, when a
+  Redis client is given (``db_replica_pin_redis``), in Redis keys that
+  every worker reads, so the next request sees the pin whichever worker
+  serves it. If Redis cannot be reached, reads go to the primary.
+* A replica whose connection fails is taken out of rotation. It returns
+  once :meth:`ReplicaSet.check` (run periodically by the app lifespan)
+  gets an answer from it again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import logging
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+READ_BIND_KEY = "read_bind"
+WROTE_KEY = "wrote"
+REDIS_PIN_PREFIX = "replica-pin:"
+
+
+class RoutingSession(Session):
+    """Session that reads from ``info["read_bind"]`` until it writes."""
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        if self._flushing or getattr(clause, "is_dml", False):
+            mark_write(self)
+        read_bind = self.info.get(READ_BIND_KEY)
+        if read_bind is not None:
+            return read_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def _sync_session(session: Any) -> Session:
+    return getattr(session, "sync_session", session)
+
+
+def read_from_primary(session: Any) -> None:
+    """Send the rest of ``session`` to the primary, e.g. after a replica miss."""
+
+    _sync_session(session).info.pop(READ_BIND_KEY, None)
+
+
+def mark_write(session: Any) -> None:
+    """Record that ``session`` writes and route the rest of it to the primary.
+
+    Flushes and DML statements are detected automatically. Call this before
+    writing through ``session.connection()`` directly.
+    """
+
+    sync_session = _sync_session(session)
+    sync_session.info[WROTE_KEY] = True
+    sync_session.info.pop(READ_BIND_KEY, None)
+
+
+def has_written(session: Any) -> bool:
+    return bool(_sync_session(session).info.get(WROTE_KEY))
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine, async_engine: AsyncEngine) -> None:
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+
+
+class ReplicaSet:
+    """Round-robin choice among healthy replicas, plus read-your-writes pins."""
+
+    def __init__(
+        self,
+        replicas: Iterable[Replica],
+        *,
+        stickiness_seconds: float,
+        max_pins: int = 10000,
+        redis_client: Any = None,
+    ) -> None:
+        self.replicas: List[Replica] = list(replicas)
+        self._counter = itertools.count()
+        self.stickiness_seconds = stickiness_seconds
+        self._pins: TTLCache[bool] = TTLCache(maxsize=max_pins, ttl=stickiness_seconds)
+        self.redis = redis_client
+        for replica in self.replicas:
+            self._watch(replica)
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _watch(self, replica: Replica) -> None:
+        def on_error(context: Any) -> None:
+            # ``connection`` is None when the pool could not connect at all.
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(replica)
+
+        event.listen(replica.engine, "handle_error", on_error)
+        event.listen(replica.async_engine.sync_engine, "handle_error", on_error)
+
+    def choose(self) -> Optional[Replica]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_down(self, replica: Replica) -> None:
+        if replica.healthy:
+            logger.warning("Replica %s is unavailable; reading from the primary", replica.name)
+        replica.healthy = False
+
+    def check(self) -> None:
+        """Probe every replica with ``SELECT 1`` and update its health."""
+
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            except exc.SQLAlchemyError:
+                self.mark_down(replica)
+                continue
+            if not replica.healthy:
+                logger.info("Replica %s is back in rotation", replica.name)
+            replica.healthy = True
+
+    @staticmethod
+    def caller_key(authorization: Optional[str]) -> Optional[str]:
+        if not authorization:
+            return None
+        return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+
+    def pin(self, caller: Optional[str]) -> None:
+        if caller is None:
+            return
+        self._pins.set(caller, True)
+        if self.redis is not None:
+            try:
+                self.redis.set(
+                    f"{REDIS_PIN_PREFIX}{caller}",
+                    1,
+                    px=max(1, int(self.stickiness_seconds * 1000)),
+                )
+            except Exception:  # pragma: no cover - depends on Redis availability
+                logger.warning("Failed to store the replica pin in Redis", exc_info=True)
+
+    def is_pinned(self, caller: str) -> bool:
+        if self._pins.get(caller):
+            return True
+        if self.redis is None:
+            return False
+        try:
+            return bool(self.redis.exists(f"{REDIS_PIN_PREFIX}{caller}"))
+        except Exception:
+            # Without the shared pins the caller's last write may be unseen.
+            logger.warning("Replica pin lookup in Redis failed; reading from the primary", exc_info=True)
+            return True
+
+    def read_bind(self, method: str, caller: Optional[str], *, asynchronous: bool) -> Any:
+        """Return the engine a request should read from, or ``None`` for the primary."""
+
+        if method not in READ_METHODS or not self.replicas:
+            return None
+        if caller is not None and self.is_pinned(caller):
+            return None
+        replica = self.choose()
+        if replica is None:
+            return None
+        return replica.async_engine.sync_engine if asynchronous else replica.engine
@@ -1,22 +1,132 @@
+from collections.abc import AsyncIterator
+from typing import Any, Optional
+
+import redis
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from app.core.config import get_settings
+from app.db.instrumentation import EngineMetrics, instrument_engine, timed_pool
+from app.db.routing import READ_BIND_KEY, Replica, ReplicaSet, RoutingSession, has_written
 
 settings = get_settings()
 
-engine_kwargs: dict = {"pool_pre_ping": True}
+pool_kwargs: dict = {
+    "pool_pre_ping": True,
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout_seconds,
+    "pool_recycle": settings.db_pool_recycle_seconds,
+}
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """Return ``url`` with its driver swapped for the asyncio one."""
+
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def _create_engine(url: str, name: str) -> Engine:
+    metrics = EngineMetrics(name, slow_statement_ms=settings.db_slow_statement_ms)
+    kwargs: dict = {**pool_kwargs, "poolclass": timed_pool(QueuePool, metrics)}
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    created = create_engine(url, **kwargs)
+    instrument_engine(created, metrics)
+    return created
+
+
+def _create_async_engine(url: str, name: str) -> AsyncEngine:
+    metrics = EngineMetrics(name, slow_statement_ms=settings.db_slow_statement_ms)
+    kwargs: dict = {**pool_kwargs, "poolclass": timed_pool(AsyncAdaptedQueuePool, metrics)}
+    if url.startswith("sqlite"):
+        # aiosqlite connections belong to the event loop that opened them, and a
+        # SQLite file gains nothing from pooling.
+        kwargs = {"pool_pre_ping": True, "poolclass": NullPool}
+    created = create_async_engine(async_database_url(url), **kwargs)
+    instrument_engine(created.sync_engine, metrics)
+    return created
+
+
+engine = _create_engine(settings.database_url, "sync")
+async_engine = _create_async_engine(settings.database_url, "async")
 
-if settings.database_url.startswith("sqlite"):
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
 
-engine = create_engine(settings.database_url, **engine_kwargs)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _replica_pin_redis() -> Any:
+    if not settings.db_replica_pin_redis or not settings.get_replica_urls():
+        return None
+    return redis.Redis.from_url(settings.redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
 
 
-def get_db():
+replicas = ReplicaSet(
+    (
+        Replica(
+            f"replica{index}",
+            _create_engine(url, f"replica{index}-sync"),
+            _create_async_engine(url, f"replica{index}-async"),
+        )
+        for index, url in enumerate(settings.get_replica_urls(), start=1)
+    ),
+    stickiness_seconds=settings.db_replica_stickiness_seconds,
+    redis_client=_replica_pin_redis(),
+)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, sync_session_class=RoutingSession
+)
+
+
+def _route(request: Request, db: Any, *, asynchronous: bool) -> Optional[str]:
+    caller = ReplicaSet.caller_key(request.headers.get("authorization"))
+    read_bind = replicas.read_bind(request.method, caller, asynchronous=asynchronous)
+    if read_bind is not None:
+        db.info[READ_BIND_KEY] = read_bind
+    return caller
+
+
+def get_db(request: Request):
     db = SessionLocal()
+    caller = _route(request, db, asynchronous=False)
     try:
         yield db
     finally:
+        if has_written(db):
+            replicas.pin(caller)
         db.close()
+
+
+async def get_async_db(request: Request) -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        caller = _route(request, db, asynchronous=True)
+        try:
+            yield db
+        finally:
+            if has_written(db):
+                replicas.pin(caller)
+
+
+def async_session(read_bind: Any = None) -> AsyncSession:
+    """Open an ``AsyncSession`` outside of a request dependency.
+
+    ``read_bind`` is the replica a request's session reads from; pass it on
+    so work started by that request (such as a streamed response) reads from
+    the same replica.
+    """
+
+    db = AsyncSessionLocal()
+    if read_bind is not None:
+        db.info[READ_BIND_KEY] = read_bind
+    return db
@@ -6,19 +6,24 @@ import time
 from sqlalchemy.exc import OperationalError
 
 from app.db.base_class import Base
+from app.db.migrations import run_migrations
 from app.db.session import engine
 
 logger = logging.getLogger(__name__)
 
 
 def init_database(max_retries: int = 5, retry_interval: float = 1.0) -> None:
-    """Create all database tables, retrying until the database is ready."""
+    """Create all database tables and apply pending migrations.
+
+    Retries until the database is ready.
+    """
 
     attempts = 0
     while True:
         attempts += 1
         try:
             Base.metadata.create_all(bind=engine)
+            run_migrations(engine)
             if attempts > 1:
                 logger.info("Database initialised after %s attempts", attempts)
             return
@@ -1,17 +1,72 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_socketio import SocketManager
+from starlette.concurrency import run_in_threadpool
 
 from app.db import base  # noqa: F401  # Ensure models are imported before metadata creation
+from app.db import session as db_session
 from app.db.utils import init_database
 
-from app.api.routes import admin, ai, auth, clients, dashboard, interactions, push, reminders, system
+from app.api.routes import (
+    admin,
+    ai,
+    auth,
+    clients,
+    dashboard,
+    interactions,
+    invoices,
+    push,
+    reminders,
+    system,
+)
+from app.api.routes.ai import CACHE_STATUS_HEADER
 from app.core.config import get_settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import shutdown_hash_executor
+from app.services import stats  # noqa: F401  # Registers the dashboard rollup listeners
 from app.services.admin import ensure_default_admin
+from app.services.audit import close_audit_writer, start_audit_writer
+from app.services.ai import close_ai_engine, start_ai_engine
+from app.services.realtime import MOUNT_LOCATION, create_socket_app, create_socket_server
 
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name)
+
+async def check_replicas_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await run_in_threadpool(db_session.replicas.check)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    init_database()
+    ensure_default_admin()
+    app.state.ai_engine = start_ai_engine()
+    start_audit_writer()
+    replica_checks = None
+    if db_session.replicas:
+        replica_checks = asyncio.create_task(
+            check_replicas_periodically(settings.db_replica_check_interval_seconds)
+        )
+    try:
+        yield
+    finally:
+        if replica_checks is not None:
+            replica_checks.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await replica_checks
+        await close_ai_engine()
+        await run_in_threadpool(close_audit_writer)
+        await db_session.async_engine.dispose()
+        shutdown_hash_executor()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,9 +74,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, CACHE_STATUS_HEADER],
 )
 
-socket_manager = SocketManager(app=app)
+sio = create_socket_server()
+app.mount(MOUNT_LOCATION, create_socket_app(sio))
+app.sio = sio
 
 app.include_router(system.router)
 app.include_router(auth.router)
@@ -29,6 +87,7 @@ app.include_router(admin.router)
 app.include_router(clients.router)
 app.include_router(interactions.router)
 app.include_router(reminders.router)
+app.include_router(invoices.router)
 app.include_router(ai.router)
 app.include_router(push.router)
 app.include_router(dashboard.router)
@@ -38,13 +97,3 @@ app.include_router(dashboard.router)
 def read_root() -> dict[str, str]:
     return {"message": settings.app_name}
 
-
-@socket_manager.on("message")
-async def handle_message(sid: str, data: dict) -> None:
-    await socket_manager.emit("message", data)
-
-
-@app.on_event("startup")
-def on_startup() -> None:
-    init_database()
-    ensure_default_admin()
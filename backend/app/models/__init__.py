@@ -1,3 +1,3 @@
-from app.models import api_key, crm, user
+from app.models import api_key, crm, push, stats, system, user
 
-__all__ = ["crm", "user", "api_key"]
+__all__ = ["crm", "user", "api_key", "push", "stats", "system"]
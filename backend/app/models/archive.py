@@ -0,0 +1,55 @@
+"""Archive copies of rows moved out by ``app.services.retention``.
+
+The archive tables repeat their source table's columns without foreign keys.
+They are written once and read rarely, so they stay cheap to insert into and
+never hold up the live tables. The one secondary index is on archived
+interactions, which the dashboard rollup counts per client.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String
+
+from app.db.base_class import Base
+
+
+class InteractionArchive(Base):
+    __tablename__ = "interactions_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    client_id = Column(Integer, nullable=False)
+    type = Column(String, nullable=False)
+    result = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Seeding or recomputing a manager's rollup counts their archived
+        # interactions per client and day.
+        Index("ix_interactions_archive_client_created", "client_id", "created_at"),
+    )
+
+
+class ReminderArchive(Base):
+    __tablename__ = "reminders_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    client_id = Column(Integer, nullable=False)
+    remind_at = Column(DateTime, nullable=False)
+    reason = Column(String, nullable=False)
+    auto_generated = Column(Boolean, nullable=True)
+    status = Column(String, nullable=False)
+    queued_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class AuditLogArchive(Base):
+    __tablename__ = "audit_log_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False)
+    action = Column(String, nullable=False)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -6,12 +6,13 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
 )
 from sqlalchemy.ext.mutable import MutableList
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 from app.db.base_class import Base
 from app.models.user import User
@@ -23,6 +24,9 @@ class Client(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     phone = Column(String, nullable=False)
+    # Digits of ``phone`` in reverse order, so that "ends with" searches become
+    # index-friendly prefix matches.
+    phone_reversed = Column(String, nullable=True)
     email = Column(String, nullable=False)
     city = Column(String, nullable=True)
     demand = Column(String, nullable=True)
@@ -37,6 +41,27 @@ class Client(Base):
     interactions = relationship("Interaction", back_populates="client")
     reminders = relationship("Reminder", back_populates="client")
 
+    __table_args__ = (
+        Index("ix_clients_manager_created", "manager_id", "created_at", "id"),
+        Index(
+            "ix_clients_manager_phone_reversed",
+            "manager_id",
+            "phone_reversed",
+            postgresql_ops={"phone_reversed": "text_pattern_ops"},
+        ),
+    )
+
+    @validates("phone")
+    def _sync_phone_reversed(self, _key: str, value: str) -> str:
+        self.phone_reversed = reverse_phone_digits(value)
+        return value
+
+
+def reverse_phone_digits(phone: str | None) -> str:
+    """Return the digits of ``phone`` in reverse order."""
+
+    return "".join(filter(str.isdigit, phone or ""))[::-1]
+
 
 class Interaction(Base):
     __tablename__ = "interactions"
@@ -49,6 +74,12 @@ class Interaction(Base):
 
     client = relationship("Client", back_populates="interactions")
 
+    __table_args__ = (
+        Index("ix_interactions_client_created", "client_id", "created_at"),
+        # Retention archives the oldest interactions first.
+        Index("ix_interactions_created", "created_at", "id"),
+    )
+
 
 class Invoice(Base):
     __tablename__ = "invoices"
@@ -56,11 +87,24 @@ class Invoice(Base):
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     file_path = Column(String, nullable=False)
+    file_name = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    status = Column(String, nullable=False, default="pending")
+    error = Column(String, nullable=True)
     total_sum = Column(Numeric, nullable=False, default=0)
     parsed_data = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     client = relationship("Client")
 
+    __table_args__ = (
+        # One invoice per file and client; concurrent duplicate uploads
+        # collide here instead of both being stored.
+        Index("uq_invoices_client_hash", "client_id", "content_hash", unique=True),
+        # The client timeline reads each client's invoices newest first.
+        Index("ix_invoices_client_created", "client_id", "created_at", "id"),
+    )
+
 
 class Reminder(Base):
     __tablename__ = "reminders"
@@ -71,9 +115,18 @@ class Reminder(Base):
     reason = Column(String, nullable=False)
     auto_generated = Column(Boolean, default=False)
     status = Column(String, nullable=False, default="pending")
+    # When the dispatcher claimed the reminder; set while it is ``queued``.
+    queued_at = Column(DateTime, nullable=True)
 
     client = relationship("Client", back_populates="reminders")
 
+    __table_args__ = (
+        # Due-reminder dispatch scans pending rows in remind_at order.
+        Index("ix_reminders_status_remind_at", "status", "remind_at"),
+        # The reminders listing walks each client's reminders in keyset order.
+        Index("ix_reminders_client_remind_at", "client_id", "remind_at", "id"),
+    )
+
 
 class Funnel(Base):
     __tablename__ = "funnels"
@@ -102,13 +155,18 @@ class ClientProgress(Base):
     stage = Column(String, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (Index("ix_client_progress_client_updated", "client_id", "updated_at", "id"),)
+
 
 class AuditLog(Base):
     __tablename__ = "audit_log"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # No foreign key: the trail outlives the users it names, as in the archive.
+    user_id = Column(Integer, nullable=False)
     action = Column(String, nullable=False)
     entity = Column(String, nullable=False)
     entity_id = Column(Integer, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (Index("ix_audit_log_timestamp", "timestamp", "id"),)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Text
+
+from app.db.base_class import Base
+
+
+class PushSubscription(Base):
+    __tablename__ = "push_subscriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    endpoint = Column(Text, nullable=False)
+    # SHA-256 of the endpoint URL; a browser keeps its endpoint across
+    # re-registrations, so this identifies the device.
+    endpoint_hash = Column(String(64), nullable=False, unique=True)
+    keys = Column(JSON, nullable=False, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def to_subscription_info(self) -> dict:
+        return {"endpoint": self.endpoint, "keys": dict(self.keys or {})}
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric
+
+from app.db.base_class import Base
+
+
+class ManagerStats(Base):
+    """Per-manager dashboard totals maintained by ``app.services.stats``."""
+
+    __tablename__ = "manager_stats"
+
+    manager_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    clients = Column(Integer, nullable=False, default=0)
+    interactions = Column(Integer, nullable=False, default=0)
+    pending_reminders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class ManagerDailyInteractions(Base):
+    """Number of interactions a manager logged on a given (UTC) day."""
+
+    __tablename__ = "manager_daily_interactions"
+
+    manager_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    interactions = Column(Integer, nullable=False, default=0)
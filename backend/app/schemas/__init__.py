@@ -1,3 +1,3 @@
-from app.schemas import ai, api_key, auth, crm
+from app.schemas import ai, api_key, auth, crm, push
 
-__all__ = ["auth", "crm", "api_key", "ai"]
+__all__ = ["auth", "crm", "api_key", "ai", "push"]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -50,9 +50,41 @@ class InvoiceParseResponse(BaseModel):
 
 
 class IdlePromptRequest(BaseModel):
+    """Clients to consider for the idle prompt.
+
+    When ``clients`` is empty the server looks up the manager's clients with
+    no interaction in the last ``idle_days`` days and uses the top ``limit``.
+    """
+
     clients: List[dict[str, Any]] = Field(default_factory=list)
+    idle_days: int = Field(7, ge=1, le=365)
+    limit: int = Field(5, ge=1, le=50)
 
 
 class IdlePromptResponse(BaseModel):
     prompt: str
     client_ids: List[int] = Field(default_factory=list)
+
+
+class AIBatchJob(BaseModel):
+    id: Optional[str] = None
+    type: Literal["recommend", "reminder_text", "suggest_message", "idle_prompt"]
+    payload: dict[str, Any] = Field(default_factory=dict)
+
+
+class AIBatchRequest(BaseModel):
+    jobs: List[AIBatchJob] = Field(default_factory=list, max_length=500)
+    stream: bool = False
+
+
+class AIBatchResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    type: str
+    status: Literal["ok", "error", "timeout"]
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class AIBatchResponse(BaseModel):
+    results: List[AIBatchResult] = Field(default_factory=list)
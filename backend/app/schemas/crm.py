@@ -74,6 +74,18 @@ class ReminderRead(ReminderBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TimelineEvent(BaseModel):
+    kind: str
+    id: int
+    at: datetime
+    title: Optional[str] = None
+    detail: Optional[str] = None
+    status: Optional[str] = None
+    amount: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class FunnelBase(BaseModel):
     name: str
     stages: List[str]
@@ -111,10 +123,20 @@ class InvoiceBase(BaseModel):
 
 class InvoiceRead(InvoiceBase):
     id: int
+    file_name: str | None = None
+    content_hash: str | None = None
+    status: str
+    error: str | None = None
+    created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class InvoiceUploadResponse(BaseModel):
+    invoice: InvoiceRead
+    duplicate: bool = False
+
+
 class ClientProgressBase(BaseModel):
     client_id: int
     funnel_id: int
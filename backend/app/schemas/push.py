@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class PushKeys(BaseModel):
+    p256dh: str
+    auth: str
+
+
+class PushSubscriptionCreate(BaseModel):
+    endpoint: str = Field(min_length=1)
+    keys: PushKeys
+    expirationTime: Optional[float] = None
+
+
+class PushSubscriptionRead(BaseModel):
+    id: int
+    endpoint: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PushSubscriptionRemove(BaseModel):
+    endpoint: str = Field(min_length=1)
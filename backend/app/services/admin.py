@@ -1,18 +1,39 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
+
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.core.security import get_password_hash, verify_password
 from app.db.session import SessionLocal
+from app.models.system import SystemState
 from app.models.user import User, UserRole
 
+ADMIN_PASSWORD_STAMP_KEY = "default_admin_password_stamp"
+
+
+def _password_stamp(key: str, username: str, password: str, password_hash: str) -> str:
+    """Keyed digest tying the configured credentials to the stored hash."""
+
+    message = "\0".join((username, password, password_hash)).encode("utf-8")
+    return hmac.new(key.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
 
 def ensure_default_admin() -> None:
-    """Create the default administrator account if it does not exist."""
+    """Create the default administrator account if it does not exist.
+
+    Verifying the configured password is deliberately slow. When
+    ``ADMIN_PASSWORD_STAMP_KEY`` is set, the result is remembered as an HMAC
+    of (credentials, stored hash) under that key, and later starts skip the
+    check while neither has changed. Without the key nothing derived from
+    the plaintext password is stored and every start verifies it.
+    """
 
     settings = get_settings()
     username, password = settings.get_default_admin()
+    stamp_key = settings.admin_password_stamp_key
 
     session: Session = SessionLocal()
     try:
@@ -22,9 +43,25 @@ def ensure_default_admin() -> None:
             if user.role != UserRole.ADMIN:
                 user.role = UserRole.ADMIN
                 updated = True
-            if not verify_password(password, user.password_hash):
-                user.password_hash = get_password_hash(password)
-                updated = True
+            stamp = session.get(SystemState, ADMIN_PASSWORD_STAMP_KEY)
+            if not stamp_key:
+                if stamp is not None:
+                    session.delete(stamp)
+                stamp = None
+            expected_stamp = (
+                _password_stamp(stamp_key, username, password, user.password_hash)
+                if stamp_key
+                else None
+            )
+            if stamp is None or not hmac.compare_digest(stamp.value, expected_stamp):
+                if not verify_password(password, user.password_hash):
+                    user.password_hash = get_password_hash(password)
+                    updated = True
+                if stamp_key:
+                    _store_stamp(
+                        session,
+                        _password_stamp(stamp_key, username, password, user.password_hash),
+                    )
             expected_email = (
                 username if "@" in username else f"{username}@example.com"
             )
@@ -33,7 +70,7 @@ def ensure_default_admin() -> None:
                 updated = True
             if updated:
                 session.add(user)
-                session.commit()
+            session.commit()
             return
 
         admin = User(
@@ -43,7 +80,14 @@ def ensure_default_admin() -> None:
             password_hash=get_password_hash(password),
         )
         session.add(admin)
+        if stamp_key:
+            _store_stamp(
+                session, _password_stamp(stamp_key, username, password, admin.password_hash)
+            )
         session.commit()
     finally:
         session.close()
 
+
+def _store_stamp(session: Session, value: str) -> None:
+    session.merge(SystemState(key=ADMIN_PASSWORD_STAMP_KEY, value=value))
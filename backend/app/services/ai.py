@@ -1,21 +1,72 @@
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+import json
+import logging
 import re
 
-import openai
+import httpx
 
 from app.core.config import get_settings
+from app.services.invoice_parser import parse_invoice_text
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
 class AIEngine:
-    def __init__(self) -> None:
-        if settings.openai_api_key:
-            openai.api_key = settings.openai_api_key
+    """Application-scoped AI engine.
+
+    One instance is created in the app lifespan and shared by all requests.
+    It owns a pooled ``httpx.AsyncClient`` for the model API, so connections
+    and TLS sessions are reused between calls. Pointing ``OPENAI_BASE_URL`` at
+    a local stub server (or passing ``transport``) makes it testable offline.
+    Without ``OPENAI_API_KEY``, or when the model API fails, suggestions fall
+    back to deterministic placeholder text.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.api_key = settings.openai_api_key if api_key is None else api_key
         self.model = settings.openai_model
         self.temperature = settings.openai_temperature
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        self.http = httpx.AsyncClient(
+            base_url=base_url or settings.openai_base_url,
+            headers=headers,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=settings.ai_max_connections,
+                max_keepalive_connections=settings.ai_max_keepalive_connections,
+                keepalive_expiry=settings.ai_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(
+                settings.ai_request_timeout_seconds,
+                connect=settings.ai_connect_timeout_seconds,
+            ),
+        )
+
+    @property
+    def llm_enabled(self) -> bool:
+        return bool(self.api_key)
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def complete(self, messages: List[dict[str, str]]) -> str:
+        """Run a chat completion against the configured model."""
+
+        response = await self.http.post(
+            "/chat/completions",
+            json={"model": self.model, "temperature": self.temperature, "messages": messages},
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
 
     async def analyze_interaction_history(self, history: list[dict[str, Any]]) -> Dict[str, Any]:
         return {
@@ -36,39 +87,58 @@ class AIEngine:
         return {"remind_at": (base + timedelta(hours=offset_hours)).isoformat()}
 
     async def suggest_message(self, payload: dict[str, Any]) -> Dict[str, Any]:
-        text: str = payload.get("text", "")
-        client_name = payload.get("client_name") or "клиента"
-        stage = payload.get("stage", "в работе")
-        history: List[dict[str, Any]] = payload.get("history", [])
-        last_interaction = history[-1]["content"] if history else ""
-
-        acknowledgement = ""
-        if last_interaction:
-            acknowledgement = f" Учтите последнее сообщение: «{last_interaction[:80]}»."
-
-        suggestion = (
-            f"Предлагаю ответить {client_name} с благодарностью за обращение, подтвердить детали запроса"
-            f" и предложить следующий шаг на стадии {stage}." + acknowledgement
-        )
-
-        return {
-            "suggestion": suggestion,
-            "context": "AI учёл историю переписки и текущий этап сделки.",
-            "actions": [
-                {"value": "add-reminder", "label": "Создать напоминание", "variant": "primary"},
-                {"value": "attach-invoice", "label": "Приложить счёт"},
-            ],
+        suggestion = None
+        if self.llm_enabled:
+            try:
+                suggestion = await self.complete(_suggestion_messages(payload))
+            except httpx.HTTPError:
+                logger.warning("Model API request failed; using the placeholder suggestion", exc_info=True)
+        if suggestion is None:
+            suggestion = _placeholder_suggestion(payload)
+        return suggestion_result(suggestion)
+
+    async def stream_suggestion(self, payload: dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the suggestion text in chunks as the model produces them.
+
+        Closing the iterator closes the upstream response, so an abandoned
+        generation stops consuming tokens.
+        """
+
+        if not self.llm_enabled:
+            for chunk in re.findall(r"\S+\s*", _placeholder_suggestion(payload)):
+                yield chunk
+            return
+
+        request = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "messages": _suggestion_messages(payload),
+            "stream": True,
         }
+        async with self.http.stream("POST", "/chat/completions", json=request) as response:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError:
+                # Nothing has been sent yet, so the placeholder can stand in.
+                logger.warning("Model API request failed; using the placeholder suggestion", exc_info=True)
+                for chunk in re.findall(r"\S+\s*", _placeholder_suggestion(payload)):
+                    yield chunk
+                return
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
 
     async def generate_reminder_text(self, context: dict[str, Any]) -> Dict[str, Any]:
-        priority = context.get("priority", "medium")
         client_name = context.get("client_name", "клиент")
-        base = datetime.utcnow()
-        hours = 6 if priority == "high" else 24
-        due_at = base + timedelta(hours=hours)
         return {
             "text": f"Связаться с {client_name} и уточнить статус предложения.",
-            "due_at": due_at,
+            "due_at": reminder_due_at(context),
         }
 
     async def generate_idle_prompt(self, clients: List[dict[str, Any]]) -> Dict[str, Any]:
@@ -82,42 +152,86 @@ class AIEngine:
         }
 
     async def parse_invoice(self, invoice_text: str | None) -> Dict[str, Any]:
-        if not invoice_text:
-            return {"total": 0.0, "items": [], "context": "Не удалось распознать содержимое счёта."}
-
-        lines = [line.strip() for line in invoice_text.splitlines() if line.strip()]
-        number_pattern = re.compile(r"(?<!\d)(\d+[\d\s]*(?:[\.,]\d{1,2})?)")
-        totals: List[float] = []
-        items: List[dict[str, Any]] = []
-
-        for line in lines:
-            matches = number_pattern.findall(line)
-            if not matches:
-                continue
-            values = []
-            for match in matches:
-                normalized = match.replace(" ", "").replace(",", ".")
-                try:
-                    values.append(float(normalized))
-                except ValueError:
-                    continue
-            if not values:
-                continue
-            totals.extend(values)
-            if len(values) >= 2:
-                items.append({
-                    "description": line[:80],
-                    "quantity": values[0],
-                    "price": values[1],
-                })
-
-        total_sum = totals[-1] if totals else 0.0
-        return {
-            "total": round(total_sum, 2),
-            "items": items[:10],
-            "context": "Извлечены числовые значения из счёта и рассчитана примерная сумма.",
+        return parse_invoice_text(invoice_text)
+
+
+def _placeholder_suggestion(payload: dict[str, Any]) -> str:
+    client_name = payload.get("client_name") or "клиента"
+    stage = payload.get("stage", "в работе")
+    history: List[dict[str, Any]] = payload.get("history", [])
+    last_interaction = history[-1]["content"] if history else ""
+
+    acknowledgement = ""
+    if last_interaction:
+        acknowledgement = f" Учтите последнее сообщение: «{last_interaction[:80]}»."
+
+    return (
+        f"Предлагаю ответить {client_name} с благодарностью за обращение, подтвердить детали запроса"
+        f" и предложить следующий шаг на стадии {stage}." + acknowledgement
+    )
+
+
+def reminder_due_at(context: dict[str, Any]) -> datetime:
+    """When a reminder about ``context`` is due, counted from now.
+
+    Cached reminder texts get a fresh value on every request.
+    """
+
+    hours = 6 if context.get("priority", "medium") == "high" else 24
+    return datetime.utcnow() + timedelta(hours=hours)
+
+
+def suggestion_result(suggestion: str) -> Dict[str, Any]:
+    return {
+        "suggestion": suggestion,
+        "context": "AI учёл историю переписки и текущий этап сделки.",
+        "actions": [
+            {"value": "add-reminder", "label": "Создать напоминание", "variant": "primary"},
+            {"value": "attach-invoice", "label": "Приложить счёт"},
+        ],
+    }
+
+
+def _suggestion_messages(payload: dict[str, Any]) -> List[dict[str, str]]:
+    client_name = payload.get("client_name") or "клиент"
+    stage = payload.get("stage") or "в работе"
+    messages = [
+        {
+            "role": "system",
+            "content": (
+                "Ты помощник менеджера по продажам. Предложи короткий ответ клиенту "
+                f"{client_name}; текущая стадия сделки: {stage}."
+            ),
         }
+    ]
+    for snippet in payload.get("history", []):
+        role = "assistant" if snippet.get("sender") == "manager" else "user"
+        messages.append({"role": role, "content": snippet.get("content", "")})
+    messages.append({"role": "user", "content": payload.get("text", "")})
+    return messages
+
+
+_engine: Optional[AIEngine] = None
+
+
+def start_ai_engine(**kwargs: Any) -> AIEngine:
+    """Create the shared engine; called from the application lifespan."""
+
+    global _engine
+    _engine = AIEngine(**kwargs)
+    return _engine
+
+
+async def close_ai_engine() -> None:
+    global _engine
+    if _engine is not None:
+        await _engine.aclose()
+        _engine = None
 
 
 def get_ai_engine() -> AIEngine:
-    return AIEngine()
+    """Return the shared engine, creating it on first use outside the app."""
+
+    if _engine is None:
+        return start_ai_engine()
+    return _engine
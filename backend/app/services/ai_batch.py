@@ -0,0 +1,112 @@
+"""Concurrent execution of heterogeneous AI jobs on the shared engine."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+from pydantic import ValidationError
+
+from app.schemas.ai import (
+    AIBatchJob,
+    AIBatchResult,
+    IdlePromptRequest,
+    IdlePromptResponse,
+    ReminderTextRequest,
+    ReminderTextResponse,
+    SuggestMessageRequest,
+    SuggestMessageResponse,
+)
+from app.services.ai import AIEngine, reminder_due_at
+from app.services.ai_cache import AIResponseCache, cache_key
+
+
+async def _recommend(engine: AIEngine, cache: AIResponseCache, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "recommendation": await engine.generate_next_step(payload),
+        "reminder": await engine.schedule_reminder(payload),
+    }
+
+
+async def _reminder_text(engine: AIEngine, cache: AIResponseCache, payload: Dict[str, Any]) -> Dict[str, Any]:
+    request = ReminderTextRequest.model_validate(payload).model_dump()
+
+    # Only the text is cached; ``due_at`` is relative to the request time.
+    async def compute() -> Dict[str, Any]:
+        result = await engine.generate_reminder_text(request)
+        return {"text": result["text"]}
+
+    result, _ = await cache.get_or_compute(cache_key("reminder_text", request, engine.model), compute)
+    return ReminderTextResponse(text=result["text"], due_at=reminder_due_at(request)).model_dump(mode="json")
+
+
+async def _suggest_message(engine: AIEngine, cache: AIResponseCache, payload: Dict[str, Any]) -> Dict[str, Any]:
+    request = SuggestMessageRequest.model_validate(payload).model_dump()
+
+    async def compute() -> Dict[str, Any]:
+        result = await engine.suggest_message(request)
+        return SuggestMessageResponse(**result).model_dump(mode="json")
+
+    result, _ = await cache.get_or_compute(cache_key("suggest_message", request, engine.model), compute)
+    return result
+
+
+async def _idle_prompt(engine: AIEngine, cache: AIResponseCache, payload: Dict[str, Any]) -> Dict[str, Any]:
+    request = IdlePromptRequest.model_validate(payload)
+    result = await engine.generate_idle_prompt(request.clients)
+    return IdlePromptResponse(**result).model_dump(mode="json")
+
+
+JOB_HANDLERS: Dict[str, Callable[[AIEngine, AIResponseCache, Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+    "recommend": _recommend,
+    "reminder_text": _reminder_text,
+    "suggest_message": _suggest_message,
+    "idle_prompt": _idle_prompt,
+}
+
+
+async def run_batch(
+    engine: AIEngine,
+    cache: AIResponseCache,
+    jobs: List[AIBatchJob],
+    *,
+    concurrency: int,
+    timeout: float,
+) -> AsyncIterator[AIBatchResult]:
+    """Run ``jobs`` concurrently and yield each result as soon as it is ready.
+
+    At most ``concurrency`` jobs run at a time and each one is cancelled after
+    ``timeout`` seconds. Closing the iterator early cancels the pending jobs.
+    """
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, job: AIBatchJob) -> AIBatchResult:
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(
+                    JOB_HANDLERS[job.type](engine, cache, job.payload), timeout
+                )
+            except asyncio.TimeoutError:
+                return AIBatchResult(index=index, id=job.id, type=job.type, status="timeout")
+            except ValidationError as exc:
+                return AIBatchResult(
+                    index=index, id=job.id, type=job.type, status="error", error=str(exc)
+                )
+            except Exception as exc:  # noqa: BLE001 - one failing job must not fail the batch
+                return AIBatchResult(
+                    index=index,
+                    id=job.id,
+                    type=job.type,
+                    status="error",
+                    error=exc.__class__.__name__,
+                )
+            return AIBatchResult(index=index, id=job.id, type=job.type, status="ok", result=result)
+
+    tasks = [asyncio.create_task(run(index, job)) for index, job in enumerate(jobs)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,138 @@
+"""Two-tier cache for AI responses.
+
+Responses are keyed by a canonical hash of the normalized request, so the
+same client, stage and message map to one entry however the JSON was
+formatted. The first tier is an in-process LRU; when ``ai_cache_redis`` is
+enabled a second tier in Redis is shared by all workers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "ai-cache:"
+
+HIT = "hit"
+MISS = "miss"
+BYPASS = "bypass"
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def cache_key(kind: str, payload: Dict[str, Any], model: str) -> str:
+    """Return the canonical cache key for an AI request."""
+
+    canonical = json.dumps(
+        {"kind": kind, "model": model, "payload": _normalize(payload)},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return f"{kind}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+class AIResponseCache:
+    def __init__(self, maxsize: int, ttl: float, redis_client: Any = None) -> None:
+        self.ttl = ttl
+        self.local: TTLCache[Dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.redis = redis_client
+        self.redis_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.local.get(key)
+        if value is None and self.redis is not None:
+            try:
+                raw = await self.redis.get(f"{REDIS_KEY_PREFIX}{key}")
+            except Exception:  # pragma: no cover - depends on Redis availability
+                logger.warning("AI cache lookup in Redis failed", exc_info=True)
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.redis_hits += 1
+                self.local.set(key, value)
+        if value is None:
+            self.misses += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.local.set(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(
+                    f"{REDIS_KEY_PREFIX}{key}",
+                    json.dumps(value, ensure_ascii=False),
+                    ex=max(1, int(self.ttl)),
+                )
+            except Exception:  # pragma: no cover - depends on Redis availability
+                logger.warning("AI cache write to Redis failed", exc_info=True)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        *,
+        bypass: bool = False,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Return the cached value for ``key`` or compute and store it.
+
+        ``bypass`` forces regeneration; the fresh value replaces the entry.
+        """
+
+        if bypass:
+            self.bypasses += 1
+        else:
+            cached = await self.get(key)
+            if cached is not None:
+                return cached, HIT
+        value = await compute()
+        await self.set(key, value)
+        return value, BYPASS if bypass else MISS
+
+    def stats(self) -> Dict[str, int]:
+        local = self.local.stats()
+        return {
+            "size": local["size"],
+            "maxsize": local["maxsize"],
+            "evictions": local["evictions"],
+            "local_hits": local["hits"],
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+        }
+
+
+@lru_cache()
+def get_ai_cache() -> AIResponseCache:
+    settings = get_settings()
+    redis_client = None
+    if settings.ai_cache_redis:
+        from redis import asyncio as redis_asyncio
+
+        redis_client = redis_asyncio.Redis.from_url(
+            settings.redis_url, socket_timeout=0.2, socket_connect_timeout=0.2
+        )
+    return AIResponseCache(
+        maxsize=settings.ai_cache_size,
+        ttl=settings.ai_cache_ttl_seconds,
+        redis_client=redis_client,
+    )
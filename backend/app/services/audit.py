@@ -0,0 +1,294 @@
+"""Buffered writer for the compliance audit log.
+
+Routes call :func:`record_audit_event` after a mutation commits. That call
+only appends the event to an in-process buffer. A background thread writes
+the buffer to ``audit_log`` as multi-row INSERTs. It flushes once
+``audit_flush_size`` events are waiting, or every
+``audit_flush_interval_seconds``, whichever comes first.
+
+When a flush fails, the events are written to an NDJSON file in
+``audit_spill_dir``. The file is fsynced and renamed into place. Later
+flushes replay spilled files, oldest first, before writing new events. A
+crash between replaying a file and deleting it can therefore insert that
+file's events twice; no event is lost. The buffer holds at most
+``audit_max_buffer`` events; past that, ``record`` spills it straight to disk.
+
+When the database rejects a batch for a reason other than a lost
+connection (a constraint violation, say), its events are retried one row at
+a time, and only the rows rejected on their own are written to an
+``*.ndjson.rejected`` file for an operator. A spilled file that cannot be
+parsed is renamed to ``*.rejected`` as a whole. Either way flushing moves
+on, so one bad event cannot hold up every later one.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, SQLAlchemyError
+
+from app.core.config import get_settings
+from app.models.crm import AuditLog
+
+logger = logging.getLogger(__name__)
+
+ROWS_PER_INSERT = 500
+SPILL_PATTERN = "audit-*.ndjson"
+REJECTED_SUFFIX = ".rejected"
+
+_audit_table = AuditLog.__table__
+_writer: Optional["AuditWriter"] = None
+
+
+def _is_transient(error: SQLAlchemyError) -> bool:
+    """Whether ``error`` may go away on retry (the database is unreachable)."""
+
+    if isinstance(error, (OperationalError, InterfaceError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        *,
+        flush_size: int,
+        flush_interval: float,
+        spill_dir: str | Path,
+        max_buffer: int = 100_000,
+        engine: Optional[Engine] = None,
+    ) -> None:
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.spill_dir = Path(spill_dir)
+        self.max_buffer = max(max_buffer, flush_size)
+        self.engine = engine
+        self.written = 0
+        self.spilled = 0
+        self.rejected = 0
+        self.dropped = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background thread and flush what is left."""
+
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def record(self, user_id: int, action: str, entity: str, entity_id: int) -> None:
+        event = {
+            "user_id": user_id,
+            "action": action,
+            "entity": entity,
+            "entity_id": entity_id,
+            "timestamp": datetime.utcnow(),
+        }
+        overflow: List[Dict[str, Any]] = []
+        with self._buffer_lock:
+            self._buffer.append(event)
+            pending = len(self._buffer)
+            if pending >= self.max_buffer:
+                overflow, self._buffer = self._buffer, []
+        if overflow:
+            logger.warning("Audit buffer full; spilling %s events to disk", len(overflow))
+            self._save(overflow)
+        elif pending >= self.flush_size:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit log flush failed")
+
+    def flush(self) -> int:
+        """Write buffered and spilled events; returns the number inserted."""
+
+        with self._flush_lock:
+            with self._buffer_lock:
+                events, self._buffer = self._buffer, []
+            try:
+                inserted = self._replay_spilled()
+                if events:
+                    inserted += self._write(events)
+            except Exception:
+                logger.warning("Audit log flush failed; spilling %s events", len(events), exc_info=True)
+                self._save(events)
+                return 0
+            self.written += inserted
+            return inserted
+
+    def _save(self, events: List[Dict[str, Any]]) -> None:
+        """Spill ``events``; if the disk fails too, put them back in the buffer."""
+
+        try:
+            self._spill(events)
+        except OSError:
+            logger.exception("Could not spill %s audit events", len(events))
+            with self._buffer_lock:
+                self._buffer[:0] = events
+                excess = len(self._buffer) - self.max_buffer
+                if excess > 0:
+                    # Neither the database nor the disk takes events; keep
+                    # memory bounded by dropping the oldest.
+                    del self._buffer[:excess]
+                    self.dropped += excess
+            if excess > 0:
+                logger.error("Dropped %s audit events", excess)
+
+    def _engine(self) -> Engine:
+        if self.engine is not None:
+            return self.engine
+        from app.db import session as db_session
+
+        return db_session.engine
+
+    def _insert(self, events: List[Dict[str, Any]]) -> None:
+        with self._engine().begin() as connection:
+            for start in range(0, len(events), ROWS_PER_INSERT):
+                connection.execute(insert(_audit_table).values(events[start : start + ROWS_PER_INSERT]))
+
+    def _write(self, events: List[Dict[str, Any]]) -> int:
+        """Insert ``events``, setting aside rows the database rejects.
+
+        Returns the number inserted. Transient errors propagate.
+        """
+
+        try:
+            self._insert(events)
+            return len(events)
+        except SQLAlchemyError as error:
+            if _is_transient(error):
+                raise
+            logger.warning("Audit batch rejected; retrying %s events one by one", len(events), exc_info=True)
+        bad = []
+        for event in events:
+            try:
+                self._insert([event])
+            except SQLAlchemyError as error:
+                if _is_transient(error):
+                    raise
+                bad.append(event)
+        if bad:
+            logger.error("Database rejected %s audit events; setting them aside", len(bad))
+            self._spill(bad, rejected=True)
+            self.rejected += 1
+        return len(events) - len(bad)
+
+    def _spill(self, events: List[Dict[str, Any]], *, rejected: bool = False) -> None:
+        if not events:
+            return
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        suffix = REJECTED_SUFFIX if rejected else ""
+        path = self.spill_dir / f"audit-{time.time_ns()}.ndjson{suffix}"
+        temporary = path.with_suffix(".tmp")
+        with temporary.open("w", encoding="utf-8") as handle:
+            for event in events:
+                handle.write(json.dumps({**event, "timestamp": event["timestamp"].isoformat()}) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+        if not rejected:
+            self.spilled += len(events)
+
+    def _reject(self, path: Path) -> None:
+        logger.error("Moving unreplayable audit spill file %s aside", path.name, exc_info=True)
+        try:
+            os.replace(path, path.with_name(path.name + REJECTED_SUFFIX))
+        except FileNotFoundError:
+            return
+        self.rejected += 1
+
+    def _replay_spilled(self) -> int:
+        """Insert spilled events, oldest file first.
+
+        Raises on transient database errors, so the flush spills its new
+        events and retries later. Files that cannot be parsed are moved
+        aside; rows the database rejects are set aside by :meth:`_write`.
+        """
+
+        if not self.spill_dir.is_dir():
+            return 0
+        replayed = 0
+        for path in sorted(self.spill_dir.glob(SPILL_PATTERN)):
+            try:
+                with path.open(encoding="utf-8") as handle:
+                    events = [json.loads(line) for line in handle if line.strip()]
+                for event in events:
+                    event["timestamp"] = datetime.fromisoformat(event["timestamp"])
+            except FileNotFoundError:
+                # Another process replayed it first.
+                continue
+            except (ValueError, KeyError, TypeError):
+                self._reject(path)
+                continue
+            inserted = self._write(events) if events else 0
+            path.unlink(missing_ok=True)
+            replayed += inserted
+            logger.info("Replayed %s spilled audit events from %s", inserted, path.name)
+        return replayed
+
+
+def start_audit_writer(**kwargs: Any) -> AuditWriter:
+    """Create and start the shared writer; called from the application lifespan."""
+
+    global _writer
+    if _writer is not None:
+        _writer.close()
+    settings = get_settings()
+    options = {
+        "flush_size": settings.audit_flush_size,
+        "flush_interval": settings.audit_flush_interval_seconds,
+        "spill_dir": settings.audit_spill_dir,
+        "max_buffer": settings.audit_max_buffer,
+        **kwargs,
+    }
+    _writer = AuditWriter(**options)
+    _writer.start()
+    return _writer
+
+
+def close_audit_writer() -> None:
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def get_audit_writer() -> AuditWriter:
+    """Return the shared writer, starting one on first use outside the app."""
+
+    if _writer is None:
+        return start_audit_writer()
+    return _writer
+
+
+def record_audit_event(user_id: int, action: str, entity: str, entity_id: int) -> None:
+    get_audit_writer().record(user_id, action, entity, entity_id)
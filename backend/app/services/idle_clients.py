@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import case, exists, func, select
+from sqlalchemy.orm import Session
+
+from app.models.crm import Client, Interaction
+
+PRIORITY_RANK = case(
+    (Client.priority == "high", 0),
+    (Client.priority == "medium", 1),
+    (Client.priority == "low", 2),
+    else_=3,
+)
+
+
+def find_idle_clients(
+    db: Session, manager_id: int, idle_days: int, limit: int
+) -> List[Dict[str, Any]]:
+    """Return the manager's most valuable clients without recent interactions.
+
+    Idleness is an anti-join against ``interactions`` and the last contact a
+    correlated ``MAX``; both are answered from the (client_id, created_at)
+    index. Clients are ranked by priority, then by ``total_sum``.
+    """
+
+    cutoff = datetime.utcnow() - timedelta(days=idle_days)
+    recent_interaction = exists().where(
+        Interaction.client_id == Client.id, Interaction.created_at >= cutoff
+    )
+    last_interaction_at = (
+        select(func.max(Interaction.created_at))
+        .where(Interaction.client_id == Client.id)
+        .correlate(Client)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(
+            Client.id,
+            Client.name,
+            Client.priority,
+            Client.total_sum,
+            last_interaction_at.label("last_interaction_at"),
+        )
+        .where(Client.manager_id == manager_id, ~recent_interaction)
+        .order_by(PRIORITY_RANK, Client.total_sum.desc(), Client.id)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "priority": row.priority,
+            "total_sum": float(row.total_sum or 0),
+            "last_interaction_at": row.last_interaction_at,
+        }
+        for row in rows
+    ]
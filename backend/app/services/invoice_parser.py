@@ -0,0 +1,112 @@
+"""Streaming invoice parser.
+
+Lines are consumed one at a time and only the running total and the first
+``MAX_ITEMS`` line items are kept, so memory stays constant however large
+the document is. Files are read through ``mmap`` and many invoices can be
+parsed across a process pool with :func:`parse_invoices_batch`.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+NUMBER_PATTERN = re.compile(r"(?<!\d)(\d+[\d\s]*(?:[\.,]\d{1,2})?)")
+# The line boundaries of str.splitlines(): besides \n, \r and \r\n these
+# include \v, \f, the \x1c-\x1e separators, NEL and U+2028/U+2029.
+LINE_BREAK_PATTERN = re.compile("\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+MAX_ITEMS = 10
+DESCRIPTION_LENGTH = 80
+
+PARSED_CONTEXT = "Извлечены числовые значения из счёта и рассчитана примерная сумма."
+EMPTY_CONTEXT = "Не удалось распознать содержимое счёта."
+
+
+def _line_values(line: str) -> List[float]:
+    values = []
+    for match in NUMBER_PATTERN.findall(line):
+        try:
+            values.append(float(match.replace(" ", "").replace(",", ".")))
+        except ValueError:
+            continue
+    return values
+
+
+def parse_invoice_lines(lines: Iterable[str]) -> Dict[str, Any]:
+    """Parse an invoice from an iterable of text lines."""
+
+    last_value: Optional[float] = None
+    items: List[Dict[str, Any]] = []
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            continue
+        values = _line_values(line)
+        if not values:
+            continue
+        last_value = values[-1]
+        if len(values) >= 2 and len(items) < MAX_ITEMS:
+            items.append(
+                {
+                    "description": line[:DESCRIPTION_LENGTH],
+                    "quantity": values[0],
+                    "price": values[1],
+                }
+            )
+    return {
+        "total": round(last_value or 0.0, 2),
+        "items": items,
+        "context": PARSED_CONTEXT,
+    }
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of ``text`` as ``str.splitlines()`` would, lazily."""
+
+    start = 0
+    for match in LINE_BREAK_PATTERN.finditer(text):
+        yield text[start : match.start()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+
+def parse_invoice_text(text: Optional[str]) -> Dict[str, Any]:
+    """Parse invoice text without materializing a list of its lines."""
+
+    if not text:
+        return {"total": 0.0, "items": [], "context": EMPTY_CONTEXT}
+    return parse_invoice_lines(iter_lines(text))
+
+
+def _iter_mapped_lines(mapped: mmap.mmap) -> Iterator[str]:
+    # readline() only splits on b"\n"; split the rest the way splitlines() does.
+    for raw_line in iter(mapped.readline, b""):
+        yield from iter_lines(raw_line.decode("utf-8", errors="replace"))
+
+
+def parse_invoice_file(path: str | os.PathLike[str]) -> Dict[str, Any]:
+    """Parse an invoice file through a read-only memory map."""
+
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return parse_invoice_text(None)
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_invoice_lines(_iter_mapped_lines(mapped))
+
+
+def parse_invoices_batch(
+    paths: Iterable[str | os.PathLike[str]], max_workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Parse many invoice files in parallel; results keep the input order."""
+
+    paths = [os.fspath(path) for path in paths]
+    if len(paths) <= 1 or max_workers == 1:
+        return [parse_invoice_file(path) for path in paths]
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_invoice_file, paths, chunksize=chunksize))
@@ -0,0 +1,70 @@
+"""Storage of uploaded invoice files."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds ``invoice_max_upload_mb``."""
+
+
+@dataclass
+class StoredFile:
+    path: Path
+    content_hash: str
+    size: int
+
+
+def _storage_path(storage_dir: Path, content_hash: str, file_name: str | None) -> Path:
+    suffix = Path(file_name or "").suffix.lower()[:10]
+    return storage_dir / content_hash[:2] / f"{content_hash}{suffix}"
+
+
+async def store_upload(upload: UploadFile) -> StoredFile:
+    """Stream ``upload`` to content-addressed storage in fixed-size chunks.
+
+    The file is hashed while it is written, so identical uploads end up at
+    the same path and are stored only once.
+    """
+
+    settings = get_settings()
+    storage_dir = Path(settings.invoice_storage_dir)
+    max_bytes = settings.invoice_max_upload_mb * 1024 * 1024
+    await run_in_threadpool(storage_dir.mkdir, parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    handle, temp_name = tempfile.mkstemp(dir=storage_dir, suffix=".part")
+    try:
+        with os.fdopen(handle, "wb") as output:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {settings.invoice_max_upload_mb} MB")
+                digest.update(chunk)
+                await run_in_threadpool(output.write, chunk)
+
+        content_hash = digest.hexdigest()
+        path = _storage_path(storage_dir, content_hash, upload.filename)
+        if path.exists():
+            os.unlink(temp_name)
+        else:
+            await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+            os.replace(temp_name, path)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+    return StoredFile(path=path, content_hash=content_hash, size=size)
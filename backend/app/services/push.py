@@ -1,31 +1,162 @@
-from typing import Any, Dict
+"""Web Push delivery.
 
-from pywebpush import WebPushException, webpush
+A worker keeps one :class:`PushNotificationService` for its lifetime. It
+reuses a pooled HTTP session across deliveries and signs one VAPID token per
+push-service audience, re-signing only when the token is close to expiry.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from py_vapid import Vapid
+from pywebpush import WebPushException, WebPusher, webpush
+from requests.adapters import HTTPAdapter
 
 from app.core.config import get_settings
 
-settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Push services accept VAPID tokens valid for up to 24 hours.
+VAPID_TOKEN_LIFETIME_SECONDS = 12 * 60 * 60
+VAPID_REFRESH_MARGIN_SECONDS = 10 * 60
+
+# The push service dropped the subscription; it will never be valid again.
+EXPIRED_STATUSES = {404, 410}
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def push_audience(endpoint: str) -> str:
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+class VapidTokenCache:
+    """Signed VAPID headers per audience, reused until they near expiry."""
+
+    def __init__(
+        self,
+        private_key: str,
+        subject: str,
+        lifetime: int = VAPID_TOKEN_LIFETIME_SECONDS,
+        refresh_margin: int = VAPID_REFRESH_MARGIN_SECONDS,
+    ) -> None:
+        self.vapid = Vapid.from_string(private_key=private_key)
+        self.subject = subject
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[str, tuple[Dict[str, str], int]] = {}
+        self._lock = threading.Lock()
+
+    def headers(self, audience: str) -> Dict[str, str]:
+        now = int(time.time())
+        with self._lock:
+            cached = self._tokens.get(audience)
+            if cached is not None and cached[1] - self.refresh_margin > now:
+                return cached[0]
+            expires_at = now + self.lifetime
+            headers = self.vapid.sign({"sub": self.subject, "aud": audience, "exp": expires_at})
+            self._tokens[audience] = (headers, expires_at)
+            return headers
+
+
+@dataclass
+class PushBatchResult:
+    delivered: int = 0
+    # Endpoints the push service reported as gone (404/410).
+    expired: List[str] = field(default_factory=list)
+    # Messages that failed transiently and may succeed on retry.
+    retry: List[Dict[str, Any]] = field(default_factory=list)
+    # Subscriptions rejected for good (bad payload, bad keys, ...).
+    rejected: int = 0
 
 
 class PushNotificationService:
     def __init__(self) -> None:
+        settings = get_settings()
         self.vapid_private_key = settings.vapid_private_key
         self.vapid_public_key = settings.vapid_public_key
         self.vapid_email = settings.vapid_email
+        self.timeout = settings.push_request_timeout_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.push_pool_size, pool_maxsize=settings.push_pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._tokens: Optional[VapidTokenCache] = None
 
-    def send_notification(self, subscription_info: Dict[str, Any], payload: str) -> None:
+    def _require_keys(self) -> None:
         if not self.vapid_private_key or not self.vapid_public_key:
             raise RuntimeError("VAPID keys are not configured")
+
+    @property
+    def tokens(self) -> VapidTokenCache:
+        if self._tokens is None:
+            self._require_keys()
+            self._tokens = VapidTokenCache(self.vapid_private_key, self.vapid_email)
+        return self._tokens
+
+    def send_notification(self, subscription_info: Dict[str, Any], payload: str) -> None:
+        self._require_keys()
         try:
             webpush(
                 subscription_info,
                 payload,
                 vapid_private_key=self.vapid_private_key,
                 vapid_claims={"sub": self.vapid_email},
+                requests_session=self.session,
+                timeout=self.timeout,
             )
         except WebPushException as exc:
             raise RuntimeError(f"Failed to send notification: {exc}") from exc
 
+    def send_batch(self, messages: Iterable[Dict[str, Any]]) -> PushBatchResult:
+        """Deliver each ``{"subscription": ..., "payload": ...}`` message.
+
+        Everything goes over the pooled session. Failures are classified
+        rather than raised, so one bad subscription does not stop the rest of
+        the batch.
+        """
+
+        result = PushBatchResult()
+        for message in messages:
+            subscription = message["subscription"]
+            endpoint = subscription.get("endpoint", "")
+            try:
+                headers = dict(self.tokens.headers(push_audience(endpoint)))
+                response = WebPusher(subscription, requests_session=self.session).send(
+                    message["payload"], headers, timeout=self.timeout
+                )
+            except WebPushException:
+                logger.warning("Invalid push subscription for %s", endpoint, exc_info=True)
+                result.rejected += 1
+                continue
+            except requests.RequestException:
+                logger.warning("Push delivery to %s failed", endpoint, exc_info=True)
+                result.retry.append(message)
+                continue
+
+            status_code = response.status_code
+            if status_code <= 202:
+                result.delivered += 1
+            elif status_code in EXPIRED_STATUSES:
+                result.expired.append(endpoint)
+            elif status_code in RETRYABLE_STATUSES:
+                result.retry.append(message)
+            else:
+                logger.warning("Push service rejected %s with %s", endpoint, status_code)
+                result.rejected += 1
+        return result
+
 
+@lru_cache()
 def get_push_service() -> PushNotificationService:
     return PushNotificationService()
@@ -0,0 +1,174 @@
+"""Persistent Web Push subscriptions with a read-through Redis cache.
+
+Subscriptions live in the ``push_subscriptions`` table, so every worker sees
+the same devices and they survive restarts. When ``push_cache_redis`` is
+enabled, a user's subscription list is cached in Redis and ``/push/send``
+resolves devices without touching the database; every change to a user's
+subscriptions drops that entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.push import PushSubscription
+from app.schemas.push import PushSubscriptionCreate
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "push:subscriptions:"
+
+
+def endpoint_hash(endpoint: str) -> str:
+    return hashlib.sha256(endpoint.encode("utf-8")).hexdigest()
+
+
+class SubscriptionCache:
+    def __init__(self, redis_client: Any = None, ttl: int = 300) -> None:
+        self.redis = redis_client
+        self.ttl = ttl
+
+    def get(self, user_id: int) -> Optional[List[Dict[str, Any]]]:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(f"{REDIS_KEY_PREFIX}{user_id}")
+        except Exception:  # pragma: no cover - depends on Redis availability
+            logger.warning("Push subscription cache lookup failed", exc_info=True)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, user_id: int, subscriptions: List[Dict[str, Any]]) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(f"{REDIS_KEY_PREFIX}{user_id}", json.dumps(subscriptions), ex=self.ttl)
+        except Exception:  # pragma: no cover - depends on Redis availability
+            logger.warning("Push subscription cache write failed", exc_info=True)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        keys = [f"{REDIS_KEY_PREFIX}{user_id}" for user_id in set(user_ids)]
+        if self.redis is None or not keys:
+            return
+        try:
+            self.redis.delete(*keys)
+        except Exception:  # pragma: no cover - depends on Redis availability
+            logger.warning("Push subscription cache invalidation failed", exc_info=True)
+
+
+@lru_cache()
+def get_subscription_cache() -> SubscriptionCache:
+    settings = get_settings()
+    redis_client = None
+    if settings.push_cache_redis:
+        import redis
+
+        redis_client = redis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.2, socket_connect_timeout=0.2
+        )
+    return SubscriptionCache(redis_client, ttl=settings.push_cache_ttl_seconds)
+
+
+def register_subscription(
+    db: Session, user_id: int, subscription: PushSubscriptionCreate
+) -> PushSubscription:
+    """Store ``subscription`` for ``user_id``.
+
+    Registering an endpoint that is already known updates it in place, so a
+    browser that re-subscribes (or switches user) keeps a single row.
+    """
+
+    digest = endpoint_hash(subscription.endpoint)
+    keys = subscription.keys.model_dump()
+    previous_owner = None
+    record = db.query(PushSubscription).filter(PushSubscription.endpoint_hash == digest).first()
+    if record is None:
+        record = PushSubscription(
+            user_id=user_id, endpoint=subscription.endpoint, endpoint_hash=digest, keys=keys
+        )
+        db.add(record)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Registered concurrently by another request; update that row.
+            db.rollback()
+            record = db.query(PushSubscription).filter(PushSubscription.endpoint_hash == digest).one()
+    if record.user_id != user_id or record.keys != keys:
+        previous_owner = record.user_id
+        record.user_id = user_id
+        record.keys = keys
+        db.commit()
+    db.refresh(record)
+    get_subscription_cache().invalidate(
+        [user_id] if previous_owner is None else [user_id, previous_owner]
+    )
+    return record
+
+
+def remove_subscriptions(db: Session, endpoint_hashes: Iterable[str]) -> int:
+    """Delete subscriptions by endpoint hash and return how many were removed."""
+
+    hashes = list(set(endpoint_hashes))
+    if not hashes:
+        return 0
+    records = db.query(PushSubscription).filter(PushSubscription.endpoint_hash.in_(hashes)).all()
+    for record in records:
+        db.delete(record)
+    db.commit()
+    get_subscription_cache().invalidate(record.user_id for record in records)
+    return len(records)
+
+
+def get_user_subscriptions(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    """Return the user's subscription infos, served from Redis when cached."""
+
+    cache = get_subscription_cache()
+    cached = cache.get(user_id)
+    if cached is not None:
+        return cached
+    subscriptions = [
+        record.to_subscription_info()
+        for record in db.query(PushSubscription)
+        .filter(PushSubscription.user_id == user_id)
+        .order_by(PushSubscription.id)
+    ]
+    cache.set(user_id, subscriptions)
+    return subscriptions
+
+
+def get_subscriptions_for_users(db: Session, user_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Return subscription infos for many users with a single query."""
+
+    ids = list(set(user_ids))
+    subscriptions: Dict[int, List[Dict[str, Any]]] = {user_id: [] for user_id in ids}
+    if not ids:
+        return subscriptions
+    for record in (
+        db.query(PushSubscription)
+        .filter(PushSubscription.user_id.in_(ids))
+        .order_by(PushSubscription.id)
+    ):
+        subscriptions[record.user_id].append(record.to_subscription_info())
+    return subscriptions
+
+
+def enqueue_push_messages(messages: List[Dict[str, Any]]) -> int:
+    """Queue ``{"subscription", "payload"}`` messages in ``push_batch_size`` chunks.
+
+    Returns the number of Celery tasks enqueued.
+    """
+
+    from app.workers.celery_app import send_push_batch_task
+
+    batch_size = max(1, get_settings().push_batch_size)
+    for start in range(0, len(messages), batch_size):
+        send_push_batch_task.delay(messages[start : start + batch_size])
+    return -(-len(messages) // batch_size)
@@ -0,0 +1,231 @@
+"""Socket.IO server: authenticated connections, rooms and bounded sends.
+
+Every connection must present a JWT, either as ``auth={"token": ...}`` or in an
+``Authorization: Bearer`` header. The socket joins its manager's room and
+can join the rooms of that manager's clients.
+
+When ``socketio_redis`` is enabled, emits go through Redis pub/sub, so an
+event published on one worker reaches sockets connected to any worker.
+Packets to a socket whose outgoing queue holds more than
+``socketio_max_queue_size`` entries are dropped and the socket is
+disconnected. A slow client then reconnects and reloads its state instead
+of buffering without bound. The guard hooks into python-socketio internals,
+which is why requirements.txt pins python-socketio and python-engineio to
+one minor release; ``tests/test_realtime.py`` checks the hooks through the
+public ``emit`` API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import socketio
+from socketio import exceptions
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.principal_cache import get_principal_cache
+from app.core.security import decode_token
+from app.models.crm import Client
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SOCKETIO_PATH = "socket.io"
+MOUNT_LOCATION = "/ws"
+DASHBOARD_DELTA_EVENT = "dashboard:delta"
+
+_server: Optional["BoundedAsyncServer"] = None
+
+
+def manager_room(manager_id: int) -> str:
+    return f"manager:{manager_id}"
+
+
+def client_room(client_id: int) -> str:
+    return f"client:{client_id}"
+
+
+class BoundedAsyncServer(socketio.AsyncServer):
+    """``AsyncServer`` that refuses to queue unbounded output for one socket."""
+
+    def __init__(self, *args: Any, max_queue_size: int = 100, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_queue_size = max_queue_size
+        self.dropped_packets = 0
+
+    async def _backlogged(self, eio_sid: str) -> bool:
+        socket = self.eio.sockets.get(eio_sid)
+        if socket is None or socket.closed or socket.queue.qsize() < self.max_queue_size:
+            return False
+        self.dropped_packets += 1
+        logger.warning("Disconnecting socket %s: send queue is full", eio_sid)
+        # ``eio.disconnect`` would wait for the slow client to drain its queue.
+        # Abort instead, as engine.io does for clients that stop answering
+        # pings, and drop the backlog so the socket's writer stops.
+        await socket.close(wait=False, abort=True, reason=self.eio.reason.SERVER_DISCONNECT)
+        while True:
+            try:
+                socket.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            socket.queue.task_done()
+        socket.queue.put_nowait(None)
+        return True
+
+    async def _send_packet(self, eio_sid: str, pkt: Any) -> None:
+        if not await self._backlogged(eio_sid):
+            await super()._send_packet(eio_sid, pkt)
+
+    async def _send_eio_packet(self, eio_sid: str, eio_pkt: Any) -> None:
+        if not await self._backlogged(eio_sid):
+            await super()._send_eio_packet(eio_sid, eio_pkt)
+
+
+def _token_from(environ: Dict[str, Any], auth: Any) -> Optional[str]:
+    if isinstance(auth, dict) and auth.get("token"):
+        return str(auth["token"])
+    header = environ.get("HTTP_AUTHORIZATION", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token
+    return None
+
+
+def _resolve_user_id(token: str) -> Optional[int]:
+    try:
+        payload = decode_token(token)
+    except ValueError:
+        return None
+    user_id = int(payload.get("sub", 0))
+    cache = get_principal_cache()
+    if cache.get(user_id, token) is not None:
+        return user_id
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return None
+        cache.set(token, user)
+        return user.id
+    finally:
+        db.close()
+
+
+def _owns_client(manager_id: int, client_id: int) -> bool:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return (
+            db.query(Client.id)
+            .filter(Client.id == client_id, Client.manager_id == manager_id)
+            .first()
+            is not None
+        )
+    finally:
+        db.close()
+
+
+def _client_id(data: Any) -> Optional[int]:
+    if not isinstance(data, dict):
+        return None
+    try:
+        return int(data["client_id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def register_handlers(sio: socketio.AsyncServer) -> None:
+    @sio.event
+    async def connect(sid: str, environ: Dict[str, Any], auth: Any = None) -> None:
+        token = _token_from(environ, auth)
+        user_id = await run_in_threadpool(_resolve_user_id, token) if token else None
+        if user_id is None:
+            raise exceptions.ConnectionRefusedError("invalid_token")
+        await sio.save_session(sid, {"user_id": user_id})
+        await sio.enter_room(sid, manager_room(user_id))
+
+    @sio.event
+    async def subscribe_client(sid: str, data: Any) -> Dict[str, Any]:
+        client_id = _client_id(data)
+        session = await sio.get_session(sid)
+        if client_id is None or not await run_in_threadpool(
+            _owns_client, session["user_id"], client_id
+        ):
+            return {"ok": False, "error": "Client not found"}
+        await sio.enter_room(sid, client_room(client_id))
+        return {"ok": True}
+
+    @sio.event
+    async def unsubscribe_client(sid: str, data: Any) -> Dict[str, Any]:
+        client_id = _client_id(data)
+        if client_id is not None:
+            await sio.leave_room(sid, client_room(client_id))
+        return {"ok": True}
+
+    @sio.on("message")
+    async def handle_message(sid: str, data: Any) -> None:
+        # Messages about a client go to the sockets watching that client;
+        # everything else stays within the sender's manager room.
+        session = await sio.get_session(sid)
+        room = manager_room(session["user_id"])
+        client_id = _client_id(data)
+        if client_id is not None:
+            room = client_room(client_id)
+            if room not in sio.rooms(sid):
+                return
+        await sio.emit("message", data, room=room)
+
+
+def create_socket_server() -> BoundedAsyncServer:
+    settings = get_settings()
+    client_manager = None
+    if settings.socketio_redis:
+        client_manager = socketio.AsyncRedisManager(
+            settings.redis_url, channel=settings.socketio_channel
+        )
+    sio = BoundedAsyncServer(
+        async_mode="asgi",
+        client_manager=client_manager,
+        cors_allowed_origins="*" if "*" in settings.cors_origins else settings.cors_origins,
+        max_queue_size=settings.socketio_max_queue_size,
+        max_http_buffer_size=settings.socketio_max_message_bytes,
+    )
+    register_handlers(sio)
+    global _server
+    _server = sio
+    return sio
+
+
+async def publish_dashboard_delta(
+    manager_id: int, *, counters: Optional[Dict[str, int]] = None, **items: Any
+) -> None:
+    """Emit a small dashboard update to the manager's room.
+
+    ``counters`` holds increments of the dashboard totals; ``items`` carry
+    new rows (``interaction=...``, ``client=...``, ``reminder=...``) as JSON
+    ready dicts. A failed emit only means the dashboard catches up on its
+    next full load, so it never fails the request.
+    """
+
+    if _server is None:
+        return
+    payload = {"counters": counters or {}, **items}
+    try:
+        await _server.emit(DASHBOARD_DELTA_EVENT, payload, room=manager_room(manager_id))
+    except Exception:  # noqa: BLE001 - live updates are best effort
+        logger.warning("Failed to publish dashboard delta", exc_info=True)
+
+
+def create_socket_app(sio: socketio.AsyncServer) -> socketio.ASGIApp:
+    # Starlette mounts keep the full request path, so the Engine.IO path has
+    # to include the mount location.
+    return socketio.ASGIApp(
+        socketio_server=sio, socketio_path=f"{MOUNT_LOCATION.strip('/')}/{SOCKETIO_PATH}"
+    )
@@ -0,0 +1,134 @@
+"""Delivery of due reminders as push notifications.
+
+:func:`dispatch_due_reminders` claims a batch of pending reminders whose
+``remind_at`` has passed, marks them ``queued`` and commits. It then queues a
+push to every device of each client's manager and marks the batch ``sent``.
+The broker is only contacted after the claim has committed, so no row locks
+are held while it answers.
+
+On PostgreSQL the claim uses ``FOR UPDATE SKIP LOCKED``, so several
+dispatchers can run at once without sending a reminder twice. A batch whose
+pushes could not be queued, or whose dispatcher died before marking it
+``sent``, stays ``queued``. It is claimed again once it has been queued for
+``QUEUED_RETRY_AFTER``, so a notification is repeated rather than lost.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.crm import Client, Reminder
+from app.services.push_subscriptions import enqueue_push_messages, get_subscriptions_for_users
+from app.services.stats import apply_pending_reminder_deltas
+
+logger = logging.getLogger(__name__)
+
+QUEUED_STATUS = "queued"
+SENT_STATUS = "sent"
+PUSH_TITLE = "Напоминание"
+QUEUED_RETRY_AFTER = timedelta(minutes=5)
+
+
+def reminder_payload(reminder_id: int, client_id: int, client_name: str, reason: str) -> str:
+    return json.dumps(
+        {
+            "title": PUSH_TITLE,
+            "body": f"Свяжитесь с {client_name}: {reason}",
+            "reminder_id": reminder_id,
+            "client_id": client_id,
+        },
+        ensure_ascii=False,
+    )
+
+
+def dispatch_due_reminders(
+    db: Session, *, batch_size: int, now: Optional[datetime] = None
+) -> int:
+    """Send one batch of due reminders.
+
+    Returns the size of the batch that was due, including reminders another
+    dispatcher claimed first, so callers know whether more may be waiting.
+    """
+
+    now = now or datetime.utcnow()
+    claimable = or_(
+        and_(Reminder.status == "pending", Reminder.remind_at <= now),
+        and_(Reminder.status == QUEUED_STATUS, Reminder.queued_at <= now - QUEUED_RETRY_AFTER),
+    )
+    due = db.execute(
+        select(Reminder.id, Client.id, Client.name, Reminder.reason, Client.manager_id, Reminder.status)
+        .join(Reminder.client)
+        .where(claimable)
+        .order_by(Reminder.remind_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True, of=Reminder)
+    ).all()
+    if not due:
+        db.rollback()
+        return 0
+
+    # The status guard keeps the claim safe on databases without row locks:
+    # only the dispatcher whose UPDATE flips a row gets to send it.
+    claimed = set(
+        db.scalars(
+            update(Reminder)
+            .where(Reminder.id.in_([row[0] for row in due]), claimable)
+            .values(status=QUEUED_STATUS, queued_at=now)
+            .returning(Reminder.id)
+            .execution_options(synchronize_session=False)
+        )
+    )
+    rows = [row for row in due if row[0] in claimed]
+
+    manager_ids = {row.manager_id for row in rows if row.manager_id is not None}
+    subscriptions = get_subscriptions_for_users(db, manager_ids)
+    messages = [
+        {"subscription": subscription, "payload": reminder_payload(*row[:4])}
+        for row in rows
+        if row.manager_id is not None
+        for subscription in subscriptions[row.manager_id]
+    ]
+    # Retried rows already left ``pending`` when they were first claimed.
+    sent_per_manager = Counter(
+        row.manager_id for row in rows if row.manager_id is not None and row.status == "pending"
+    )
+    apply_pending_reminder_deltas(
+        db.connection(), {manager_id: -count for manager_id, count in sent_per_manager.items()}
+    )
+    db.commit()
+
+    try:
+        enqueue_push_messages(messages)
+    except Exception:
+        logger.exception(
+            "Could not queue pushes for %s reminders; retrying in %s", len(rows), QUEUED_RETRY_AFTER
+        )
+        return len(due)
+    db.execute(
+        update(Reminder)
+        .where(Reminder.id.in_(claimed), Reminder.status == QUEUED_STATUS)
+        .values(status=SENT_STATUS)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(due)
+
+
+def drain_due_reminders(db: Session, *, batch_size: int, time_budget: float) -> int:
+    """Dispatch batches until none are due or ``time_budget`` seconds pass."""
+
+    deadline = time.monotonic() + time_budget
+    total = 0
+    while True:
+        claimed = dispatch_due_reminders(db, batch_size=batch_size)
+        total += claimed
+        if claimed < batch_size or time.monotonic() >= deadline:
+            return total
@@ -0,0 +1,155 @@
+"""Move rows older than ``retention_days`` into the archive tables.
+
+Interactions, audit log entries and reminders that are neither pending nor
+queued for delivery are copied into their ``*_archive`` table and deleted
+from the live table. Each batch is one short transaction of at most
+``retention_batch_size`` rows. On PostgreSQL, the batch locks its rows with
+``FOR UPDATE SKIP LOCKED``, so rows a request is working on are left for a
+later run. Runs pause between batches and stop once their time budget is
+spent. The dashboard rollup counts archived interactions too, so archiving
+leaves it unchanged.
+
+``python -m app.services.retention`` runs a single pass from the command
+line and prints the rows archived per table. The Celery beat job does the
+same every ``retention_interval_seconds``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.archive import AuditLogArchive, InteractionArchive, ReminderArchive
+from app.models.crm import AuditLog, Interaction, Reminder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    name: str
+    model: Any
+    archive: Any
+    timestamp: str
+    conditions: Tuple[Any, ...] = ()
+
+
+POLICIES: Tuple[RetentionPolicy, ...] = (
+    RetentionPolicy("interactions", Interaction, InteractionArchive, "created_at"),
+    RetentionPolicy(
+        "reminders",
+        Reminder,
+        ReminderArchive,
+        "remind_at",
+        # Queued reminders still wait for their push to be delivered.
+        (Reminder.status.notin_(("pending", "queued")),),
+    ),
+    RetentionPolicy("audit_log", AuditLog, AuditLogArchive, "timestamp"),
+)
+
+
+def archive_batch(
+    db: Session, policy: RetentionPolicy, *, cutoff: datetime, batch_size: int
+) -> int:
+    """Archive up to ``batch_size`` expired rows of one table and commit."""
+
+    model = policy.model
+    timestamp = getattr(model, policy.timestamp)
+    ids = list(
+        db.scalars(
+            select(model.id)
+            .where(timestamp < cutoff, *policy.conditions)
+            .order_by(timestamp, model.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    )
+    if not ids:
+        db.rollback()
+        return 0
+
+    columns = [column.name for column in model.__table__.columns]
+    db.execute(
+        insert(policy.archive).from_select(
+            columns, select(*model.__table__.columns).where(model.id.in_(ids))
+        )
+    )
+    db.execute(
+        delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(ids)
+
+
+def run_retention(
+    db: Session,
+    *,
+    retention_days: int,
+    batch_size: int,
+    time_budget: float,
+    pause: float = 0.0,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Archive expired rows of every table and return the counts per table.
+
+    Tables are drained one after the other until they have nothing left to
+    archive or ``time_budget`` seconds pass; the next run picks up the rest.
+    """
+
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    deadline = time.monotonic() + time_budget
+    archived = {policy.name: 0 for policy in POLICIES}
+    for policy in POLICIES:
+        while time.monotonic() < deadline:
+            count = archive_batch(db, policy, cutoff=cutoff, batch_size=batch_size)
+            archived[policy.name] += count
+            if count < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    logger.info(
+        "Archived rows older than %s: %s",
+        cutoff.isoformat(timespec="seconds"),
+        ", ".join(f"{name}={count}" for name, count in archived.items()),
+    )
+    return archived
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Archive rows older than the retention period.")
+    parser.add_argument("--days", type=int, default=settings.retention_days)
+    parser.add_argument("--batch-size", type=int, default=settings.retention_batch_size)
+    args = parser.parse_args(argv)
+
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        archived = run_retention(
+            session,
+            retention_days=args.days,
+            batch_size=args.batch_size,
+            time_budget=settings.retention_interval_seconds,
+            pause=settings.retention_batch_pause_seconds,
+        )
+    finally:
+        session.close()
+
+    for name, count in archived.items():
+        print(f"{name}: {count} archived")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - command line entry point
+    sys.exit(main())
@@ -0,0 +1,481 @@
+"""Incrementally maintained per-manager dashboard rollup.
+
+Every ORM flush that touches ``Client``, ``Interaction``, ``Reminder`` or
+``Invoice`` rows applies the corresponding deltas to ``manager_stats`` and
+``manager_daily_interactions`` inside the same transaction, so the dashboard
+can read its totals from a single row.
+
+Interaction counts are lifetime figures: they include interactions the
+retention job has moved to ``interactions_archive``, so archiving leaves the
+rollup unchanged.
+
+Bulk ``Query.update()``/``Query.delete()`` calls bypass the session events; code
+paths that use them must call :func:`recompute_manager` for the affected
+managers, or :func:`apply_pending_reminder_deltas` when they only move
+reminders out of ``pending``. ``python -m app.services.stats --check`` reports
+drift between the rollup and the source tables, and without ``--check``
+rebuilds it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, select, union_all, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, attributes
+from sqlalchemy.orm.util import identity_key
+
+from app.models.archive import InteractionArchive
+from app.models.crm import Client, Interaction, Invoice, Reminder
+from app.models.stats import ManagerDailyInteractions, ManagerStats
+
+logger = logging.getLogger(__name__)
+
+TOTAL_FIELDS = ("clients", "interactions", "pending_reminders", "revenue")
+
+_stats_table = ManagerStats.__table__
+_daily_table = ManagerDailyInteractions.__table__
+
+# Attributes whose changes affect the rollup, per tracked model.
+_TRACKED_ATTRIBUTES: Dict[type, tuple[str, ...]] = {
+    Client: ("manager_id",),
+    Interaction: ("client_id", "created_at"),
+    Reminder: ("client_id", "status"),
+    Invoice: ("client_id", "total_sum"),
+}
+
+
+class _UnknownValue(Exception):
+    """The previous value of an attribute was not loaded before it changed."""
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"clients": 0, "interactions": 0, "pending_reminders": 0, "revenue": Decimal(0)}
+
+
+def _as_day(value: date | str) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _dialect_insert(connection: Connection):
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif connection.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:  # pragma: no cover - only PostgreSQL and SQLite are supported
+        raise NotImplementedError(f"Unsupported dialect '{connection.dialect.name}'")
+    return insert
+
+
+def _all_interactions():
+    """Live and archived interactions, joined to their client."""
+
+    rows = union_all(
+        select(Interaction.client_id, Interaction.created_at),
+        select(InteractionArchive.client_id, InteractionArchive.created_at),
+    ).subquery()
+    return rows, Client.id == rows.c.client_id
+
+
+def compute_totals(
+    connection: Connection, manager_ids: Optional[Iterable[int]] = None
+) -> Dict[int, Dict[str, Any]]:
+    """Aggregate the rollup totals from the source tables."""
+
+    ids = list(manager_ids) if manager_ids is not None else None
+
+    def scoped(statement):
+        if ids is not None:
+            statement = statement.where(Client.manager_id.in_(ids))
+        return statement.group_by(Client.manager_id)
+
+    totals: Dict[int, Dict[str, Any]] = defaultdict(
+        _empty_totals, {manager_id: _empty_totals() for manager_id in ids or []}
+    )
+    interactions, on_client = _all_interactions()
+    queries = {
+        "clients": scoped(select(Client.manager_id, func.count(Client.id))),
+        "interactions": scoped(
+            select(Client.manager_id, func.count()).select_from(interactions).join(Client, on_client)
+        ),
+        "pending_reminders": scoped(
+            select(Client.manager_id, func.count(Reminder.id))
+            .join(Reminder.client)
+            .where(Reminder.status == "pending")
+        ),
+        "revenue": scoped(
+            select(Client.manager_id, func.coalesce(func.sum(Invoice.total_sum), 0)).join(
+                Invoice.client
+            )
+        ),
+    }
+    for field, statement in queries.items():
+        for manager_id, value in connection.execute(statement):
+            totals[manager_id][field] = Decimal(str(value)) if field == "revenue" else value
+    return dict(totals)
+
+
+def compute_daily_interactions(
+    connection: Connection, manager_ids: Optional[Iterable[int]] = None
+) -> Dict[tuple[int, date], int]:
+    """Aggregate interaction counts per manager and UTC day."""
+
+    interactions, on_client = _all_interactions()
+    day = func.date(interactions.c.created_at)
+    statement = (
+        select(Client.manager_id, day, func.count())
+        .select_from(interactions)
+        .join(Client, on_client)
+        .group_by(Client.manager_id, day)
+    )
+    if manager_ids is not None:
+        statement = statement.where(Client.manager_id.in_(list(manager_ids)))
+    return {
+        (manager_id, _as_day(value)): count
+        for manager_id, value, count in connection.execute(statement)
+    }
+
+
+def _write_manager(
+    connection: Connection,
+    manager_id: int,
+    totals: Dict[str, Any],
+    daily: Dict[date, int],
+) -> None:
+    insert = _dialect_insert(connection)
+    values = {field: totals[field] for field in TOTAL_FIELDS}
+    statement = insert(_stats_table).values(
+        manager_id=manager_id, updated_at=datetime.utcnow(), **values
+    )
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[_stats_table.c.manager_id],
+            set_={**values, "updated_at": statement.excluded.updated_at},
+        )
+    )
+    connection.execute(delete(_daily_table).where(_daily_table.c.manager_id == manager_id))
+    if daily:
+        connection.execute(
+            _daily_table.insert(),
+            [
+                {"manager_id": manager_id, "day": day, "interactions": count}
+                for day, count in daily.items()
+            ],
+        )
+
+
+def seed_manager(
+    connection: Connection,
+    manager_id: int,
+    pending: Optional[Dict[str, Any]] = None,
+    pending_days: Optional[Dict[date, int]] = None,
+) -> bool:
+    """Create the rollup rows of a manager who has none yet.
+
+    The rows are computed from the source tables minus ``pending`` and
+    ``pending_days``, the changes the current transaction has flushed but
+    not yet applied. ``INSERT ... ON CONFLICT DO NOTHING`` makes concurrent
+    first writes safe: one transaction seeds, and every one of them then
+    adds its own deltas with an atomic ``UPDATE``. Returns whether this
+    call created the row.
+    """
+
+    totals = compute_totals(connection, [manager_id])[manager_id]
+    for field, delta in (pending or {}).items():
+        totals[field] -= delta
+    insert = _dialect_insert(connection)
+    result = connection.execute(
+        insert(_stats_table)
+        .values(
+            manager_id=manager_id,
+            updated_at=datetime.utcnow(),
+            **{field: totals[field] for field in TOTAL_FIELDS},
+        )
+        .on_conflict_do_nothing(index_elements=[_stats_table.c.manager_id])
+    )
+    if result.rowcount == 0:
+        return False
+    daily = {
+        day: count - (pending_days or {}).get(day, 0)
+        for (_, day), count in compute_daily_interactions(connection, [manager_id]).items()
+    }
+    rows = [
+        {"manager_id": manager_id, "day": day, "interactions": count}
+        for day, count in daily.items()
+        if count > 0
+    ]
+    if rows:
+        connection.execute(
+            insert(_daily_table)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[_daily_table.c.manager_id, _daily_table.c.day])
+        )
+    return True
+
+
+def _lock_manager(connection: Connection, manager_id: int) -> bool:
+    """Lock the manager's stats row until commit; returns whether it exists."""
+
+    return (
+        connection.execute(
+            select(_stats_table.c.manager_id)
+            .where(_stats_table.c.manager_id == manager_id)
+            .with_for_update()
+        ).first()
+        is not None
+    )
+
+
+def recompute_manager(connection: Connection, manager_id: int) -> None:
+    """Rebuild the rollup rows of one manager from the source tables.
+
+    The stats row is locked before the totals are computed. A concurrent
+    ``x = x + delta`` update either committed before the lock, and is in the
+    totals, or waits for this transaction and applies on top of them.
+    """
+
+    if not _lock_manager(connection, manager_id):
+        if seed_manager(connection, manager_id):
+            return
+        # Another transaction seeded the row meanwhile.
+        _lock_manager(connection, manager_id)
+    totals = compute_totals(connection, [manager_id])[manager_id]
+    daily = {
+        day: count
+        for (_, day), count in compute_daily_interactions(connection, [manager_id]).items()
+    }
+    _write_manager(connection, manager_id, totals, daily)
+
+
+def apply_pending_reminder_deltas(connection: Connection, deltas: Dict[int, int]) -> None:
+    """Adjust ``pending_reminders`` after a bulk reminder status change."""
+
+    changes = _Deltas(connection)
+    for manager_id, delta in deltas.items():
+        changes.totals[manager_id]["pending_reminders"] += delta
+    changes.flush()
+
+
+def rebuild_manager_stats(session: Session, *, check_only: bool = False) -> List[Dict[str, Any]]:
+    """Recompute the rollup for every manager and return the drift found.
+
+    Each drift entry names the manager, the field and the stored/expected
+    values. Unless ``check_only`` is set, the rollup is rewritten and the
+    session committed.
+    """
+
+    connection = session.connection()
+    expected = compute_totals(connection)
+    expected_daily: Dict[int, Dict[date, int]] = defaultdict(dict)
+    for (manager_id, day), count in compute_daily_interactions(connection).items():
+        expected_daily[manager_id][day] = count
+
+    stored = {row.manager_id: row for row in connection.execute(select(_stats_table))}
+    stored_daily: Dict[int, Dict[date, int]] = defaultdict(dict)
+    for row in connection.execute(select(_daily_table)):
+        stored_daily[row.manager_id][_as_day(row.day)] = row.interactions
+
+    drift: List[Dict[str, Any]] = []
+    for manager_id in sorted(set(expected) | set(stored) | set(stored_daily)):
+        totals = expected.get(manager_id, _empty_totals())
+        row = stored.get(manager_id)
+        for field in TOTAL_FIELDS:
+            actual = getattr(row, field) if row is not None else None
+            if field == "revenue" and actual is not None:
+                actual = Decimal(str(actual))
+            if actual != totals[field]:
+                drift.append(
+                    {"manager_id": manager_id, "field": field, "stored": actual, "expected": totals[field]}
+                )
+        if stored_daily.get(manager_id, {}) != expected_daily.get(manager_id, {}):
+            drift.append(
+                {
+                    "manager_id": manager_id,
+                    "field": "daily_interactions",
+                    "stored": stored_daily.get(manager_id, {}),
+                    "expected": expected_daily.get(manager_id, {}),
+                }
+            )
+        if not check_only:
+            _write_manager(connection, manager_id, totals, expected_daily.get(manager_id, {}))
+
+    if not check_only:
+        session.commit()
+    return drift
+
+
+class _Deltas:
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self.totals: Dict[int, Dict[str, Any]] = defaultdict(_empty_totals)
+        self.days: Dict[tuple[int, date], int] = defaultdict(int)
+        self.recompute: set[int] = set()
+        self._managers: Dict[int, Optional[int]] = {}
+
+    def manager_for_client(self, session: Session, client_id: Optional[int]) -> Optional[int]:
+        if client_id is None:
+            return None
+        if client_id not in self._managers:
+            client = session.identity_map.get(identity_key(Client, client_id))
+            if client is not None and "manager_id" in attributes.instance_state(client).dict:
+                manager_id = client.manager_id
+            else:
+                manager_id = self.connection.execute(
+                    select(Client.manager_id).where(Client.id == client_id)
+                ).scalar()
+            self._managers[client_id] = manager_id
+        return self._managers[client_id]
+
+    def apply(self, session: Session, obj: Any, values: Dict[str, Any], sign: int) -> None:
+        if isinstance(obj, Client):
+            self.totals[values["manager_id"]]["clients"] += sign
+            return
+        manager_id = self.manager_for_client(session, values["client_id"])
+        if manager_id is None:
+            return
+        if isinstance(obj, Interaction):
+            self.totals[manager_id]["interactions"] += sign
+            created_at = values["created_at"] or datetime.utcnow()
+            self.days[(manager_id, created_at.date())] += sign
+        elif isinstance(obj, Reminder):
+            if values["status"] == "pending":
+                self.totals[manager_id]["pending_reminders"] += sign
+        elif isinstance(obj, Invoice):
+            self.totals[manager_id]["revenue"] += sign * Decimal(str(values["total_sum"] or 0))
+
+    def flush(self) -> None:
+        insert = _dialect_insert(self.connection)
+        # A fixed order keeps two transactions moving clients between the
+        # same managers from locking their rows in opposite orders.
+        for manager_id in sorted(self.recompute):
+            recompute_manager(self.connection, manager_id)
+        for manager_id, totals in self.totals.items():
+            if manager_id in self.recompute:
+                continue
+            increment = (
+                update(_stats_table)
+                .where(_stats_table.c.manager_id == manager_id)
+                .values({field: _stats_table.c[field] + totals[field] for field in TOTAL_FIELDS})
+            )
+            if self.connection.execute(increment).rowcount == 0:
+                # First change for this manager: seed the row, then apply
+                # this flush's deltas on top like any other change.
+                pending_days = {
+                    day: delta for (owner, day), delta in self.days.items() if owner == manager_id
+                }
+                seed_manager(self.connection, manager_id, totals, pending_days)
+                self.connection.execute(increment)
+        for (manager_id, day), delta in self.days.items():
+            if manager_id in self.recompute or delta == 0:
+                continue
+            statement = insert(_daily_table).values(
+                manager_id=manager_id, day=day, interactions=delta
+            )
+            self.connection.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[_daily_table.c.manager_id, _daily_table.c.day],
+                    set_={"interactions": _daily_table.c.interactions + statement.excluded.interactions},
+                )
+            )
+
+
+def _current_values(obj: Any) -> Dict[str, Any]:
+    return {name: getattr(obj, name) for name in _TRACKED_ATTRIBUTES[type(obj)]}
+
+
+def _previous_values(obj: Any) -> Dict[str, Any]:
+    values = {}
+    for name in _TRACKED_ATTRIBUTES[type(obj)]:
+        history = attributes.get_history(obj, name, passive=attributes.PASSIVE_NO_INITIALIZE)
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        elif history.added:
+            raise _UnknownValue(name)
+        else:
+            values[name] = getattr(obj, name)
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _update_manager_stats(session: Session, _flush_context: Any) -> None:
+    tracked = tuple(_TRACKED_ATTRIBUTES)
+    new = [obj for obj in session.new if isinstance(obj, tracked)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, tracked)]
+    dirty = [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, tracked) and session.is_modified(obj, include_collections=False)
+    ]
+    if not (new or deleted or dirty):
+        return
+
+    deltas = _Deltas(session.connection())
+    for obj in new:
+        deltas.apply(session, obj, _current_values(obj), 1)
+    for obj in deleted:
+        deltas.apply(session, obj, _previous_values(obj), -1)
+    for obj in dirty:
+        current = _current_values(obj)
+        try:
+            previous = _previous_values(obj)
+        except _UnknownValue:
+            previous = None
+        if previous == current:
+            continue
+        if previous is None or isinstance(obj, Client):
+            # A client moving between managers takes its interactions,
+            # reminders and invoices with it; rebuild both sides.
+            for values in filter(None, (previous, current)):
+                manager_id = (
+                    values["manager_id"]
+                    if isinstance(obj, Client)
+                    else deltas.manager_for_client(session, values["client_id"])
+                )
+                if manager_id is not None:
+                    deltas.recompute.add(manager_id)
+            continue
+        deltas.apply(session, obj, previous, -1)
+        deltas.apply(session, obj, current, 1)
+    deltas.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the per-manager dashboard rollup.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report drift between the rollup and the source tables",
+    )
+    args = parser.parse_args(argv)
+
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        drift = rebuild_manager_stats(session, check_only=args.check)
+    finally:
+        session.close()
+
+    for entry in drift:
+        print(
+            f"manager {entry['manager_id']}: {entry['field']} "
+            f"stored={entry['stored']} expected={entry['expected']}"
+        )
+    if args.check:
+        print(f"{len(drift)} drifted value(s)")
+        return 1 if drift else 0
+    print(f"Rebuilt manager stats, corrected {len(drift)} drifted value(s)")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - command line entry point
+    sys.exit(main())
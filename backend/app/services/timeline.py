@@ -0,0 +1,95 @@
+"""Client timeline: interactions, reminders, invoices and funnel progress.
+
+The timeline is one ``UNION ALL`` query, newest first. Each branch filters
+one table by ``client_id``, applies the keyset condition and its own
+``LIMIT``, so it reads a bounded range of that table's (client_id, time)
+index. The outer query merges the branches and applies the final order and
+limit. Rows are ordered by (at, kind, id) descending; ``kind`` breaks ties
+between tables that share a timestamp.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import Numeric, String, and_, cast, literal, null, or_, select, union_all
+from sqlalchemy.sql import Select
+
+from app.models.crm import ClientProgress, Interaction, Invoice, Reminder
+
+# kind -> (model, time column, title, detail, status, amount)
+_SOURCES: dict[str, Tuple[Any, ...]] = {
+    "interaction": (
+        Interaction,
+        Interaction.created_at,
+        Interaction.type,
+        Interaction.result,
+        None,
+        None,
+    ),
+    "invoice": (
+        Invoice,
+        Invoice.created_at,
+        Invoice.file_name,
+        Invoice.error,
+        Invoice.status,
+        Invoice.total_sum,
+    ),
+    "progress": (
+        ClientProgress,
+        ClientProgress.updated_at,
+        ClientProgress.stage,
+        None,
+        None,
+        None,
+    ),
+    "reminder": (Reminder, Reminder.remind_at, Reminder.reason, None, Reminder.status, None),
+}
+
+KINDS = tuple(_SOURCES)
+
+
+def _after(kind: str, at: Any, row_id: Any, cursor: Tuple[datetime, str, int]) -> Any:
+    """Keyset condition for rows of ``kind`` that sort after ``cursor``."""
+
+    cursor_at, cursor_kind, cursor_id = cursor
+    if kind < cursor_kind:
+        return at <= cursor_at
+    if kind > cursor_kind:
+        return at < cursor_at
+    return or_(at < cursor_at, and_(at == cursor_at, row_id < cursor_id))
+
+
+def timeline_query(
+    client_id: int, *, limit: int, after: Optional[Tuple[datetime, str, int]] = None
+) -> Select:
+    """Select up to ``limit`` timeline rows of a client, newest first.
+
+    Rows have the columns ``kind``, ``id``, ``at``, ``title``, ``detail``,
+    ``status`` and ``amount``; columns a table does not have are NULL.
+    """
+
+    branches = []
+    for kind, (model, at, title, detail, status, amount) in _SOURCES.items():
+        branch = select(
+            literal(kind, String).label("kind"),
+            model.id.label("id"),
+            at.label("at"),
+            title.label("title"),
+            (detail if detail is not None else cast(null(), String)).label("detail"),
+            (status if status is not None else cast(null(), String)).label("status"),
+            (amount if amount is not None else cast(null(), Numeric)).label("amount"),
+        ).where(model.client_id == client_id)
+        if after is not None:
+            branch = branch.where(_after(kind, at, model.id, after))
+        branches.append(
+            select(branch.order_by(at.desc(), model.id.desc()).limit(limit).subquery())
+        )
+
+    merged = union_all(*branches).subquery("timeline")
+    return (
+        select(merged)
+        .order_by(merged.c.at.desc(), merged.c.kind.desc(), merged.c.id.desc())
+        .limit(limit)
+    )
@@ -1,8 +1,13 @@
+import logging
+from decimal import Decimal
+
 from celery import Celery
 
 from app.core.config import get_settings
+from app.services import stats  # noqa: F401  # Keep the dashboard rollup in sync from tasks
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 celery_app = Celery(
     "salesupport",
@@ -17,3 +22,114 @@ def send_push_task(subscription_info: dict, payload: str) -> None:
 
     push_service = get_push_service()
     push_service.send_notification(subscription_info, payload)
+
+
+@celery_app.task(bind=True, max_retries=settings.push_max_retries)
+def send_push_batch_task(self, messages: list[dict]) -> dict:
+    """Deliver one chunk of ``{"subscription", "payload"}`` push messages.
+
+    Subscriptions reported gone (404/410) are deleted; transient failures are
+    retried with exponential backoff, resending only the messages that failed.
+    """
+
+    from app.db.session import SessionLocal
+    from app.services.push import get_push_service
+    from app.services.push_subscriptions import endpoint_hash, remove_subscriptions
+
+    result = get_push_service().send_batch(messages)
+    if result.expired:
+        session = SessionLocal()
+        try:
+            remove_subscriptions(session, [endpoint_hash(endpoint) for endpoint in result.expired])
+        finally:
+            session.close()
+    if result.retry:
+        if self.request.retries >= self.max_retries:
+            logger.warning("Giving up on %s push deliveries", len(result.retry))
+        else:
+            countdown = settings.push_retry_backoff_seconds * 2**self.request.retries
+            raise self.retry(args=(result.retry,), countdown=countdown)
+    return {
+        "delivered": result.delivered,
+        "expired": len(result.expired),
+        "failed": len(result.retry) + result.rejected,
+    }
+
+
+@celery_app.task
+def dispatch_due_reminders_task() -> int:
+    from app.db.session import SessionLocal
+    from app.services.reminder_dispatch import drain_due_reminders
+
+    session = SessionLocal()
+    try:
+        return drain_due_reminders(
+            session,
+            batch_size=settings.reminder_dispatch_batch_size,
+            time_budget=settings.reminder_dispatch_interval_seconds,
+        )
+    finally:
+        session.close()
+
+
+@celery_app.task
+def archive_expired_rows_task() -> dict:
+    """Archive rows older than ``retention_days``; returns counts per table."""
+
+    from app.db.session import SessionLocal
+    from app.services.retention import run_retention
+
+    session = SessionLocal()
+    try:
+        return run_retention(
+            session,
+            retention_days=settings.retention_days,
+            batch_size=settings.retention_batch_size,
+            time_budget=settings.retention_interval_seconds / 2,
+            pause=settings.retention_batch_pause_seconds,
+        )
+    finally:
+        session.close()
+
+
+celery_app.conf.beat_schedule = {
+    "dispatch-due-reminders": {
+        "task": dispatch_due_reminders_task.name,
+        "schedule": settings.reminder_dispatch_interval_seconds,
+        # A run that is still queued when the next one is due adds nothing.
+        "options": {"expires": settings.reminder_dispatch_interval_seconds},
+    },
+    "archive-expired-rows": {
+        "task": archive_expired_rows_task.name,
+        "schedule": settings.retention_interval_seconds,
+        "options": {"expires": settings.retention_interval_seconds},
+    },
+}
+
+
+@celery_app.task
+def parse_invoice_task(invoice_id: int) -> None:
+    from app.db.session import SessionLocal
+    from app.models.crm import Invoice
+    from app.services.invoice_parser import parse_invoice_file
+
+    session = SessionLocal()
+    try:
+        invoice = session.get(Invoice, invoice_id)
+        if invoice is None:
+            logger.warning("Invoice %s disappeared before parsing", invoice_id)
+            return
+        try:
+            result = parse_invoice_file(invoice.file_path)
+        except Exception as exc:  # noqa: BLE001 - the failure is recorded on the invoice
+            logger.exception("Failed to parse invoice %s", invoice_id)
+            invoice.status = "failed"
+            invoice.error = str(exc)[:500]
+        else:
+            invoice.parsed_data = result
+            invoice.total_sum = Decimal(str(result["total"]))
+            invoice.status = "parsed"
+            invoice.error = None
+        session.commit()
+    finally:
+        session.close()
@@ -0,0 +1,127 @@
+"""Compare the streaming invoice parser with the original implementation.
+
+Run from ``backend/``::
+
+    python benchmarks/bench_invoice_parser.py --lines 200000 --files 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.invoice_parser import (  # noqa: E402
+    parse_invoice_file,
+    parse_invoice_text,
+    parse_invoices_batch,
+)
+
+
+def legacy_parse_invoice(invoice_text: str | None) -> Dict[str, Any]:
+    """The list-based parser that ``AIEngine.parse_invoice`` used to run."""
+
+    if not invoice_text:
+        return {"total": 0.0, "items": [], "context": "Не удалось распознать содержимое счёта."}
+
+    lines = [line.strip() for line in invoice_text.splitlines() if line.strip()]
+    number_pattern = re.compile(r"(?<!\d)(\d+[\d\s]*(?:[\.,]\d{1,2})?)")
+    totals: List[float] = []
+    items: List[dict[str, Any]] = []
+
+    for line in lines:
+        matches = number_pattern.findall(line)
+        if not matches:
+            continue
+        values = []
+        for match in matches:
+            normalized = match.replace(" ", "").replace(",", ".")
+            try:
+                values.append(float(normalized))
+            except ValueError:
+                continue
+        if not values:
+            continue
+        totals.extend(values)
+        if len(values) >= 2:
+            items.append({
+                "description": line[:80],
+                "quantity": values[0],
+                "price": values[1],
+            })
+
+    total_sum = totals[-1] if totals else 0.0
+    return {
+        "total": round(total_sum, 2),
+        "items": items[:10],
+        "context": "Извлечены числовые значения из счёта и рассчитана примерная сумма.",
+    }
+
+
+def generate_invoice(lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["Кабель", "Розетка", "Автомат", "Щиток", "Лампа", "Провод", "Датчик"]
+    rows = ["Счёт на оплату № 1045 от 12.03.2024", "Поставщик: ООО «Электро»", ""]
+    for index in range(lines):
+        if index % 7 == 0:
+            rows.append(f"Раздел {index // 7}: комплектующие")
+        rows.append(
+            f"{rng.choice(words)} арт.{rng.randint(100, 999)}  {rng.randint(1, 50)} шт.  "
+            f"{rng.randint(10, 99999)},{rng.randint(0, 99):02d}"
+        )
+    rows.append(f"Итого к оплате: {rng.randint(1000, 999999)},00")
+    return "\n".join(rows)
+
+
+def measure(label: str, func: Callable[[], Any]) -> Any:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed * 1000:10.1f} ms   peak {peak / 1024 / 1024:8.2f} MiB")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000, help="lines in the large invoice")
+    parser.add_argument("--files", type=int, default=16, help="invoices in the batch run")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size for the batch run")
+    args = parser.parse_args()
+
+    text = generate_invoice(args.lines)
+    print(f"Single invoice: {args.lines} lines, {len(text.encode('utf-8')) / 1024 / 1024:.1f} MiB")
+    legacy = measure("legacy (list based)", lambda: legacy_parse_invoice(text))
+    streamed = measure("streaming (text)", lambda: parse_invoice_text(text))
+    assert legacy == streamed, "parsers disagree"
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(args.files):
+            path = Path(directory) / f"invoice-{index}.txt"
+            path.write_text(generate_invoice(args.lines // 4, seed=index), encoding="utf-8")
+            paths.append(path)
+
+        measure("streaming (mmap file)", lambda: parse_invoice_file(paths[0]))
+        print(f"\nBatch: {args.files} invoices of {args.lines // 4} lines")
+        sequential = measure(
+            "legacy, sequential",
+            lambda: [legacy_parse_invoice(path.read_text(encoding="utf-8")) for path in paths],
+        )
+        batched = measure("streaming, process pool", lambda: parse_invoices_batch(paths, args.workers))
+        assert sequential == batched, "batch results disagree"
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
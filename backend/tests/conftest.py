@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from collections.abc import Callable, Generator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import get_settings
+from app.core.principal_cache import get_principal_cache
+from app.services.ai_cache import get_ai_cache
+from app.services.push_subscriptions import get_subscription_cache
+
+
+@pytest.fixture
+def client(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> Generator[TestClient, None, None]:
+    db_file = tmp_path_factory.mktemp("data", numbered=True) / "test.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_file}")
+    monkeypatch.setenv("DEFAULT_ADMIN_CREDENTIALS", "admin:StrongPass123")
+    monkeypatch.setenv("AUDIT_SPILL_DIR", str(db_file.parent / "audit-spill"))
+    get_settings.cache_clear()
+    get_principal_cache.cache_clear()
+    get_ai_cache.cache_clear()
+    get_subscription_cache.cache_clear()
+
+    db_session = importlib.import_module("app.db.session")
+    db_utils = importlib.import_module("app.db.utils")
+    admin_service = importlib.import_module("app.services.admin")
+    importlib.reload(db_session)
+    importlib.reload(db_utils)
+    importlib.reload(admin_service)
+    module = importlib.import_module("app.main")
+    importlib.reload(module)
+
+    with TestClient(module.app) as test_client:
+        yield test_client
+
+    get_settings.cache_clear()
+    get_principal_cache.cache_clear()
+    get_ai_cache.cache_clear()
+    get_subscription_cache.cache_clear()
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.delenv("DEFAULT_ADMIN_CREDENTIALS", raising=False)
+
+
+@pytest.fixture
+def register_manager(client: TestClient) -> Callable[[str], dict[str, str]]:
+    """Register a manager account and return its authorization headers."""
+
+    def _register(name: str = "Manager") -> dict[str, str]:
+        password = "MyStrongPass!234"
+        response = client.post(
+            "/auth/register",
+            json={
+                "name": name,
+                "email": f"{name.lower()}@example.com",
+                "password": password,
+                "role": "manager",
+            },
+        )
+        assert response.status_code == 201
+        login_response = client.post(
+            "/auth/login", data={"username": name, "password": password}
+        )
+        assert login_response.status_code == 200
+        token = login_response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return _register
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+from app.schemas.ai import AIBatchJob
+from app.services.ai_batch import JOB_HANDLERS, run_batch
+from app.services.ai_cache import AIResponseCache
+
+JOBS = [
+    {"id": "a", "type": "recommend", "payload": {"stage": "offer"}},
+    {"id": "b", "type": "reminder_text", "payload": {"client_id": 1, "client_name": "Иван"}},
+    {"id": "c", "type": "suggest_message", "payload": {"text": "Привет"}},
+    {"id": "d", "type": "idle_prompt", "payload": {"clients": [{"id": 3, "name": "Пётр"}]}},
+    {"id": "e", "type": "reminder_text", "payload": {}},
+]
+
+
+def test_batch_returns_results_in_job_order(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    response = client.post("/ai/batch", json={"jobs": JOBS}, headers=headers)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["id"] for result in results] == ["a", "b", "c", "d", "e"]
+    assert [result["status"] for result in results] == ["ok", "ok", "ok", "ok", "error"]
+    assert results[3]["result"]["client_ids"] == [3]
+
+
+def test_batch_streams_ndjson(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    response = client.post("/ai/batch", json={"jobs": JOBS, "stream": True}, headers=headers)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(result["id"] for result in results) == ["a", "b", "c", "d", "e"]
+
+
+def test_run_batch_bounds_concurrency_and_times_out(monkeypatch) -> None:
+    running = 0
+    peak = 0
+
+    async def slow(engine, cache, payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(payload["delay"])
+        finally:
+            running -= 1
+        return {}
+
+    monkeypatch.setitem(JOB_HANDLERS, "recommend", slow)
+    jobs = [AIBatchJob(type="recommend", payload={"delay": 0.01}) for _ in range(6)]
+    jobs.append(AIBatchJob(type="recommend", payload={"delay": 5}))
+
+    async def collect():
+        cache = AIResponseCache(maxsize=10, ttl=60)
+        return [result async for result in run_batch(None, cache, jobs, concurrency=2, timeout=0.2)]
+
+    results = asyncio.run(collect())
+    assert peak == 2
+    assert [result.status for result in results].count("timeout") == 1
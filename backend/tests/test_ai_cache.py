@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import ai as ai_service
+from app.services.ai_cache import cache_key
+
+
+def test_cache_key_ignores_formatting_differences() -> None:
+    first = cache_key("suggest_message", {"text": "Когда  доставка? ", "stage": None}, "gpt-4o")
+    second = cache_key("suggest_message", {"text": "Когда доставка?"}, "gpt-4o")
+    assert first == second
+    assert cache_key("suggest_message", {"text": "Другое"}, "gpt-4o") != first
+    assert cache_key("reminder_text", {"text": "Когда доставка?"}, "gpt-4o") != first
+
+
+def test_suggest_message_is_cached_until_bypassed(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    body = {"text": "Когда доставка?", "client_name": "Иван", "stage": "оплата"}
+
+    first = client.post("/ai/suggest_message", json=body, headers=headers)
+    second = client.post("/ai/suggest_message", json=body, headers=headers)
+    forced = client.post(
+        "/ai/suggest_message", json=body, headers={**headers, "Cache-Control": "no-cache"}
+    )
+
+    assert [r.headers["X-AI-Cache"] for r in (first, second, forced)] == ["miss", "hit", "bypass"]
+    assert first.json() == second.json()
+
+    stats = client.get("/ai/cache/stats", headers=headers).json()
+    assert stats["local_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bypasses"] == 1
+
+
+def test_cached_reminder_text_gets_a_fresh_due_date(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    headers = register_manager("Manager")
+    body = {"client_id": 1, "client_name": "Иван", "priority": "high"}
+    first = client.post("/ai/reminder_text", json=body, headers=headers)
+
+    later = datetime.utcnow() + timedelta(days=3)
+    frozen = type("frozen", (datetime,), {"utcnow": classmethod(lambda cls: later)})
+    monkeypatch.setattr(ai_service, "datetime", frozen)
+    second = client.post("/ai/reminder_text", json=body, headers=headers)
+
+    assert [r.headers["X-AI-Cache"] for r in (first, second)] == ["miss", "hit"]
+    assert second.json()["text"] == first.json()["text"]
+    assert datetime.fromisoformat(second.json()["due_at"]) == later + timedelta(hours=6)
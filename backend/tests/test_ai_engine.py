@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+from collections.abc import Callable
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+
+def _stub_model_server(requests: list[dict]) -> FastAPI:
+    """Minimal OpenAI-compatible chat completions server."""
+
+    stub = FastAPI()
+
+    @stub.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> dict:
+        body = await request.json()
+        requests.append({"body": body, "authorization": request.headers.get("authorization")})
+        return {"choices": [{"message": {"role": "assistant", "content": f" Ответ на: {body['messages'][-1]['content']} "}}]}
+
+    return stub
+
+
+def test_engine_is_shared_across_requests(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    ai_service = importlib.import_module("app.services.ai")
+    main = importlib.import_module("app.main")
+    assert ai_service.get_ai_engine() is main.app.state.ai_engine
+
+    headers = register_manager("Manager")
+    for _ in range(2):
+        response = client.post("/ai/suggest_message", json={"text": "Здравствуйте"}, headers=headers)
+        assert response.status_code == 200
+    assert ai_service.get_ai_engine() is main.app.state.ai_engine
+
+
+def test_suggestions_use_stub_model_server(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    ai_service = importlib.import_module("app.services.ai")
+    requests: list[dict] = []
+    engine = ai_service.AIEngine(
+        api_key="test-key",
+        base_url="http://stub-model/v1",
+        transport=httpx.ASGITransport(app=_stub_model_server(requests)),
+    )
+    monkeypatch.setattr(ai_service, "_engine", engine)
+
+    headers = register_manager("Manager")
+    response = client.post(
+        "/ai/suggest_message",
+        json={"text": "Когда доставка?", "client_name": "Иван", "history": [{"sender": "manager", "content": "Добрый день"}]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["suggestion"] == "Ответ на: Когда доставка?"
+    assert requests[0]["authorization"] == "Bearer test-key"
+    assert [message["role"] for message in requests[0]["body"]["messages"]] == ["system", "assistant", "user"]
+
+
+def _parse_sse(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_suggestion_stream_emits_chunks_then_result(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    response = client.post(
+        "/ai/suggest_message/stream",
+        json={"text": "Когда доставка?", "client_name": "Иван", "stage": "оплата"},
+        headers=headers,
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    chunks = [data["text"] for name, data in events if name == "chunk"]
+    assert len(chunks) > 1
+    name, result = events[-1]
+    assert name == "done"
+    assert result["suggestion"] == "".join(chunks).strip()
+
+
+def test_stream_suggestion_relays_model_deltas_and_closes_upstream() -> None:
+    ai_service = importlib.import_module("app.services.ai")
+    closed: list[bool] = []
+
+    class Upstream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for delta in ["Добрый ", "день", "!"]:
+                payload = {"choices": [{"delta": {"content": delta}}]}
+                yield f"data: {json.dumps(payload)}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+
+        async def aclose(self) -> None:
+            closed.append(True)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, stream=Upstream())
+
+    async def consume(limit: int | None) -> list[str]:
+        engine = ai_service.AIEngine(api_key="k", base_url="http://stub/v1", transport=httpx.MockTransport(handler))
+        chunks = []
+        stream = engine.stream_suggestion({"text": "Привет"})
+        async for chunk in stream:
+            chunks.append(chunk)
+            if limit and len(chunks) == limit:
+                break
+        await stream.aclose()
+        await engine.aclose()
+        return chunks
+
+    assert asyncio.run(consume(None)) == ["Добрый ", "день", "!"]
+    closed.clear()
+    assert asyncio.run(consume(1)) == ["Добрый "]
+    assert closed
+
+
+def test_suggestion_stream_reports_upstream_failure_as_error_event(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    ai_service = importlib.import_module("app.services.ai")
+
+    class Upstream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            payload = {"choices": [{"delta": {"content": "Добрый "}}]}
+            yield f"data: {json.dumps(payload)}\n\n".encode()
+            raise httpx.ReadError("connection reset")
+
+    engine = ai_service.AIEngine(
+        api_key="k",
+        base_url="http://stub/v1",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, stream=Upstream())),
+    )
+    monkeypatch.setattr(ai_service, "_engine", engine)
+
+    response = client.post(
+        "/ai/suggest_message/stream", json={"text": "Привет"}, headers=register_manager("Manager")
+    )
+
+    assert response.status_code == 200
+    events = _parse_sse(response.text)
+    assert events[0] == ("chunk", {"text": "Добрый "})
+    name, data = events[-1]
+    assert name == "error"
+    assert data["detail"]
+
+
+def test_suggestion_falls_back_to_placeholder_when_model_api_fails(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    ai_service = importlib.import_module("app.services.ai")
+    engine = ai_service.AIEngine(
+        api_key="sk-...",
+        base_url="http://stub/v1",
+        transport=httpx.MockTransport(lambda request: httpx.Response(401, json={"error": "invalid key"})),
+    )
+    monkeypatch.setattr(ai_service, "_engine", engine)
+    headers = register_manager("Manager")
+    body = {"text": "Когда доставка?", "client_name": "Иван"}
+
+    response = client.post("/ai/suggest_message", json=body, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["suggestion"].startswith("Предлагаю ответить Иван")
+
+    events = _parse_sse(client.post("/ai/suggest_message/stream", json=body, headers=headers).text)
+    name, result = events[-1]
+    assert name == "done"
+    assert result["suggestion"].startswith("Предлагаю ответить Иван")
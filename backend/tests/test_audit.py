@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import importlib
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+
+from app.db.base_class import Base
+from app.models.crm import AuditLog
+from app.services.audit import AuditWriter, get_audit_writer
+
+
+def test_mutations_are_audited(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    client_id = client.post(
+        "/clients",
+        json={"name": "Client", "phone": "+77001112233", "email": "client@example.com"},
+        headers=headers,
+    ).json()["id"]
+    client.patch(f"/clients/{client_id}", json={"city": "Almaty"}, headers=headers)
+    interaction_id = client.post(
+        "/interactions", json={"client_id": client_id, "type": "call", "result": "ok"}, headers=headers
+    ).json()["id"]
+    client.get("/clients", headers=headers)
+
+    get_audit_writer().flush()
+    session = importlib.import_module("app.db.session").SessionLocal()
+    try:
+        events = session.execute(
+            select(AuditLog.action, AuditLog.entity, AuditLog.entity_id).order_by(AuditLog.id)
+        ).all()
+    finally:
+        session.close()
+
+    assert [tuple(row) for row in events] == [
+        ("create", "client", client_id),
+        ("update", "client", client_id),
+        ("create", "interaction", interaction_id),
+    ]
+
+
+def test_events_spill_to_disk_while_the_database_is_down(tmp_path: Path) -> None:
+    spill_dir = tmp_path / "spill"
+    writer = AuditWriter(
+        flush_size=100,
+        flush_interval=60,
+        spill_dir=spill_dir,
+        engine=create_engine(f"sqlite:///{tmp_path / 'missing' / 'audit.db'}"),
+    )
+    writer.record(1, "create", "client", 1)
+    writer.record(1, "update", "client", 1)
+    assert writer.flush() == 0
+    assert len(list(spill_dir.glob("audit-*.ndjson"))) == 1
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine, tables=[AuditLog.__table__])
+    inserts: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_inserts(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.startswith("INSERT"):
+            inserts.append(statement)
+
+    writer.engine = engine
+    writer.record(1, "create", "interaction", 7)
+    writer.record(1, "create", "reminder", 8)
+    assert writer.flush() == 4
+
+    # One multi-row INSERT for the spilled events, one for the new ones.
+    assert len(inserts) == 2
+    assert list(spill_dir.glob("audit-*.ndjson")) == []
+    with engine.connect() as connection:
+        rows = connection.execute(select(AuditLog.action, AuditLog.entity).order_by(AuditLog.id)).all()
+    assert [tuple(row) for row in rows] == [
+        ("create", "client"),
+        ("update", "client"),
+        ("create", "interaction"),
+        ("create", "reminder"),
+    ]
+
+
+def test_unreplayable_spill_files_are_moved_aside(tmp_path: Path) -> None:
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    (spill_dir / "audit-1.ndjson").write_text('{"user_id": 1, "action": "cre', encoding="utf-8")
+    (spill_dir / "audit-2.ndjson").write_text(
+        '{"user_id": 1, "action": "login", "entity": "user", "entity_id": 1, '
+        '"timestamp": "2026-01-01T00:00:00"}\n'
+        '{"user_id": 1, "action": null, "entity": "client", "entity_id": 1, '
+        '"timestamp": "2026-01-01T00:00:01"}\n',
+        encoding="utf-8",
+    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine, tables=[AuditLog.__table__])
+    writer = AuditWriter(flush_size=100, flush_interval=0.01, spill_dir=spill_dir, engine=engine)
+
+    writer.record(1, "create", "client", 1)
+    # The valid row of the second file is replayed; only the NULL one is set aside.
+    assert writer.flush() == 2
+    assert (writer.rejected, writer.spilled) == (2, 0)
+    rejected = sorted(path.name for path in spill_dir.iterdir())
+    assert len(rejected) == 2 and all(name.endswith(".ndjson.rejected") for name in rejected)
+    assert rejected[0] == "audit-1.ndjson.rejected"
+    assert '"action": null' in (spill_dir / rejected[1]).read_text(encoding="utf-8")
+    assert len((spill_dir / rejected[1]).read_text(encoding="utf-8").splitlines()) == 1
+
+    # A flush that fails unexpectedly keeps its events and the thread alive.
+    original_insert = writer._insert
+    failures = iter([RuntimeError("boom")])
+
+    def flaky_insert(events):
+        for error in failures:
+            raise error
+        original_insert(events)
+
+    writer._insert = flaky_insert
+    writer.start()
+    try:
+        writer.record(1, "update", "client", 1)
+        writer._wake.set()
+        deadline = time.monotonic() + 5
+        while writer.written < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert writer._thread is not None and writer._thread.is_alive()
+    finally:
+        writer.close()
+    assert (writer.written, writer.spilled) == (3, 1)
+    with engine.connect() as connection:
+        actions = connection.scalars(select(AuditLog.action).order_by(AuditLog.id)).all()
+    assert actions == ["login", "create", "update"]
+
+
+def test_a_rejected_row_does_not_take_its_batch_with_it(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine, tables=[AuditLog.__table__])
+    writer = AuditWriter(flush_size=100, flush_interval=60, spill_dir=tmp_path / "spill", engine=engine)
+
+    writer.record(1, "create", "client", 1)
+    writer.record(1, None, "client", 2)  # type: ignore[arg-type]
+    writer.record(1, "update", "client", 1)
+    assert writer.flush() == 2
+
+    assert (writer.rejected, writer.spilled) == (1, 0)
+    assert len(list((tmp_path / "spill").glob("audit-*.ndjson.rejected"))) == 1
+    with engine.connect() as connection:
+        entity_ids = connection.scalars(select(AuditLog.entity_id).order_by(AuditLog.id)).all()
+    assert entity_ids == [1, 1]
+
+
+def test_a_full_buffer_spills_to_disk(tmp_path: Path) -> None:
+    writer = AuditWriter(flush_size=2, flush_interval=60, spill_dir=tmp_path, max_buffer=3)
+    for entity_id in range(7):
+        writer.record(1, "create", "client", entity_id)
+    assert writer.spilled == 6
+    assert len(writer._buffer) == 1
+    assert len(list(tmp_path.glob("audit-*.ndjson"))) == 2
+
+
+def test_deleting_an_audited_user_keeps_the_trail(tmp_path: Path) -> None:
+    from app.models.user import User
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            User.__table__.insert().values(id=7, name="admin", email="a@example.com", role="admin", password_hash="x")
+        )
+        connection.execute(
+            AuditLog.__table__.insert().values(user_id=7, action="delete", entity="user", entity_id=8)
+        )
+        connection.execute(User.__table__.delete().where(User.__table__.c.id == 7))
+        assert connection.scalar(select(AuditLog.user_id)) == 7
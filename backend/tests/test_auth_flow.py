@@ -1,40 +1,11 @@
 from __future__ import annotations
 
 import importlib
-import sys
-from collections.abc import Generator
-from pathlib import Path
+from collections.abc import Callable
 
 import pytest
 from fastapi.testclient import TestClient
-
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
-from app.core.config import get_settings
-
-
-@pytest.fixture
-def client(
-    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
-) -> Generator[TestClient, None, None]:
-    db_file = tmp_path_factory.mktemp("data", numbered=True) / "test.db"
-    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_file}")
-    monkeypatch.setenv("DEFAULT_ADMIN_CREDENTIALS", "admin:StrongPass123")
-    get_settings.cache_clear()
-
-    db_session = importlib.import_module("app.db.session")
-    db_utils = importlib.import_module("app.db.utils")
-    importlib.reload(db_session)
-    importlib.reload(db_utils)
-    module = importlib.import_module("app.main")
-    importlib.reload(module)
-
-    with TestClient(module.app) as test_client:
-        yield test_client
-
-    get_settings.cache_clear()
-    monkeypatch.delenv("DATABASE_URL", raising=False)
-    monkeypatch.delenv("DEFAULT_ADMIN_CREDENTIALS", raising=False)
+from sqlalchemy import event
 
 
 def test_default_admin_can_login(client: TestClient) -> None:
@@ -70,3 +41,48 @@ def test_register_and_access_protected_route(client: TestClient) -> None:
     assert me_response.status_code == 200
     payload = me_response.json()
     assert payload["user"]["email"] == "manager@example.com"
+
+
+def test_password_hashing_does_not_hold_a_connection(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    auth = importlib.import_module("app.api.routes.auth")
+    pool = importlib.import_module("app.db.session").async_engine.sync_engine.pool
+    checked_out: list[int] = []
+    held: list[int] = []
+    event.listen(pool, "checkout", lambda *args: checked_out.append(1))
+    event.listen(pool, "checkin", lambda *args: checked_out.pop())
+
+    def holding(original):
+        async def wrapper(*args):
+            held.append(len(checked_out))
+            return await original(*args)
+
+        return wrapper
+
+    monkeypatch.setattr(auth, "get_password_hash_async", holding(auth.get_password_hash_async))
+    monkeypatch.setattr(auth, "verify_password_async", holding(auth.verify_password_async))
+    register = client.post(
+        "/auth/register",
+        json={"name": "Manager", "email": "manager@example.com", "password": "MyStrongPass!234"},
+    )
+    assert register.status_code == 201
+    login = client.post("/auth/login", data={"username": "Manager", "password": "MyStrongPass!234"})
+    assert login.status_code == 200
+    assert held == [0, 0]
+
+
+def test_sync_routes_authenticate_on_their_own_session(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    importlib.import_module("app.core.principal_cache").get_principal_cache().clear()
+    session = importlib.import_module("app.db.session")
+    checkouts: list[str] = []
+    event.listen(session.engine.pool, "checkout", lambda *args: checkouts.append("sync"))
+    event.listen(
+        session.async_engine.sync_engine.pool, "checkout", lambda *args: checkouts.append("async")
+    )
+
+    assert client.get("/invoices", params={"client_id": 1}, headers=headers).status_code == 404
+    assert checkouts == ["sync"]
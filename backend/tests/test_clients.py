@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import importlib
+import json
+from collections.abc import Callable
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.models.crm import ClientProgress, Funnel, Interaction, Invoice
+
+
+def _create_clients(client: TestClient, headers: dict[str, str], count: int) -> list[int]:
+    ids = []
+    for index in range(count):
+        response = client.post(
+            "/clients",
+            json={
+                "name": f"Client {index}",
+                "phone": f"+7 700 000 {index:04d}",
+                "email": f"client{index}@example.com",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_list_clients_keyset_pagination(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    created = _create_clients(client, headers, 5)
+
+    seen: list[int] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/clients", params=params, headers=headers)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert seen == sorted(created, reverse=True)
+
+
+def test_list_clients_rejects_invalid_cursor(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    response = client.get("/clients", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_list_clients_ndjson_stream(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    created = _create_clients(client, headers, 3)
+    _create_clients(client, register_manager("Other"), 2)
+
+    response = client.get("/clients", params={"stream": True}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [row["id"] for row in rows] == sorted(created, reverse=True)
+
+
+def test_list_clients_by_phone_suffix(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    ids = _create_clients(client, headers, 3)
+
+    response = client.get("/clients", params={"phone_ends": "0001"}, headers=headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [ids[1]]
+
+    update = client.patch(f"/clients/{ids[0]}", json={"phone": "8 (700) 123-45-67"}, headers=headers)
+    assert update.status_code == 200
+    response = client.get("/clients", params={"phone_ends": "45-67"}, headers=headers)
+    assert [item["id"] for item in response.json()] == [ids[0]]
+
+
+def test_client_timeline_merges_sources_with_keyset_pages(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    other = register_manager("Other")
+    (client_id,) = _create_clients(client, headers, 1)
+    client.post(
+        "/reminders",
+        json={"client_id": client_id, "remind_at": "2024-01-05T09:00:00", "reason": "call back"},
+        headers=headers,
+    )
+
+    session = importlib.import_module("app.db.session").SessionLocal()
+    try:
+        funnel = Funnel(name="Sales", stages=["lead", "deal"])
+        session.add(funnel)
+        session.flush()
+        tie = datetime(2024, 1, 3, 12, 0)
+        session.add_all(
+            [
+                Interaction(client_id=client_id, type="call", result="first", created_at=datetime(2024, 1, 1)),
+                Interaction(client_id=client_id, type="email", result="second", created_at=tie),
+                Invoice(client_id=client_id, file_path="/tmp/a.pdf", file_name="a.pdf", total_sum=100, created_at=tie),
+                ClientProgress(client_id=client_id, funnel_id=funnel.id, stage="deal", updated_at=datetime(2024, 1, 4)),
+            ]
+        )
+        session.commit()
+    finally:
+        session.close()
+
+    events: list[dict] = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/clients/{client_id}/timeline", params=params, headers=headers)
+        assert response.status_code == 200
+        events.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert [(event["kind"], event["title"]) for event in events] == [
+        ("reminder", "call back"),
+        ("progress", "deal"),
+        ("invoice", "a.pdf"),
+        ("interaction", "email"),
+        ("interaction", "call"),
+    ]
+    assert events[2]["amount"] == 100
+    assert events[0]["status"] == "pending"
+
+    assert client.get(f"/clients/{client_id}/timeline", headers=other).status_code == 404
+    response = client.get(f"/clients/{client_id}/timeline", params={"cursor": "bad"}, headers=headers)
+    assert response.status_code == 400
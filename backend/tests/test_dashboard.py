@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+@contextmanager
+def _count_statements() -> Iterator[list[str]]:
+    engine = importlib.import_module("app.db.session").engine
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _seed(client: TestClient, headers: dict[str, str], count: int) -> None:
+    remind_at = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    for index in range(count):
+        response = client.post(
+            "/clients",
+            json={"name": f"Client {index}", "phone": f"+7700{index:04d}", "email": f"c{index}@example.com"},
+            headers=headers,
+        )
+        client_id = response.json()["id"]
+        client.post(
+            "/interactions",
+            json={"client_id": client_id, "type": "call", "result": "ok"},
+            headers=headers,
+        )
+        client.post(
+            "/reminders",
+            json={"client_id": client_id, "remind_at": remind_at, "reason": "follow up"},
+            headers=headers,
+        )
+
+
+def test_dashboard_stats_totals(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    _seed(client, headers, 3)
+    _seed(client, register_manager("Other"), 2)
+
+    response = client.get("/dashboard/stats", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["totals"] == {"clients": 3, "interactions": 3, "reminders": 3, "revenue": 0.0}
+    assert len(data["aiRecommendations"]) == 3
+    assert {item["client"] for item in data["recentInteractions"]} == {"Client 0", "Client 1", "Client 2"}
+
+
+def test_dashboard_stats_statement_count_is_bounded(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    _seed(client, headers, 8)
+
+    with _count_statements() as statements:
+        response = client.get("/dashboard/stats", headers=headers)
+
+    assert response.status_code == 200
+    # principal lookup + totals + recent reminders + recent interactions
+    assert len(statements) <= 4, statements
+
+
+def test_dashboard_last_week_covers_seven_days(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    from app.models.stats import ManagerDailyInteractions
+
+    headers = register_manager("Manager")
+    _seed(client, headers, 1)
+    manager_id = client.get("/auth/me", headers=headers).json()["user"]["id"]
+    today = datetime.utcnow().date()
+    with importlib.import_module("app.db.session").SessionLocal() as db:
+        db.add_all(
+            [
+                ManagerDailyInteractions(manager_id=manager_id, day=today - timedelta(days=6), interactions=2),
+                ManagerDailyInteractions(manager_id=manager_id, day=today - timedelta(days=7), interactions=5),
+            ]
+        )
+        db.commit()
+
+    response = client.get("/dashboard/stats", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["trends"]["interactions"] == "3 за 7 дней"
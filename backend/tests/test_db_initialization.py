@@ -24,6 +24,7 @@ def test_init_database_retries_until_success(monkeypatch: pytest.MonkeyPatch) ->
     metadata_mock = MagicMock()
     metadata_mock.create_all.side_effect = fake_create_all
     monkeypatch.setattr(utils, "Base", MagicMock(metadata=metadata_mock))
+    monkeypatch.setattr(utils, "run_migrations", MagicMock())
 
     utils.init_database(max_retries=3, retry_interval=0)
 
@@ -35,6 +36,7 @@ def test_init_database_raises_after_max_retries(monkeypatch: pytest.MonkeyPatch)
     metadata_mock = MagicMock()
     metadata_mock.create_all.side_effect = OperationalError("stmt", {}, Exception("down"))
     monkeypatch.setattr(utils, "Base", MagicMock(metadata=metadata_mock))
+    monkeypatch.setattr(utils, "run_migrations", MagicMock())
 
     with pytest.raises(OperationalError):
         utils.init_database(max_retries=2, retry_interval=0)
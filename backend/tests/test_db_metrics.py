@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.db import instrumentation
+from app.db.instrumentation import EngineMetrics, instrument_engine, timed_pool
+
+
+def test_pool_records_waits_overflow_and_timeouts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(instrumentation, "_registry", {})
+    metrics = EngineMetrics("test-pool", slow_statement_ms=10_000)
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=timed_pool(QueuePool, metrics),
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+    instrument_engine(engine, metrics)
+
+    first = engine.connect()
+    second = engine.connect()
+    first.execute(text("SELECT 1"))
+    first.execute(text("SELECT 1"))
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["pool"]["checked_out"] == 2
+    assert snapshot["pool"]["overflow"] == 1
+    assert snapshot["checkouts"]["count"] == 2
+    assert snapshot["checkouts"]["overflow"] == 1
+    assert snapshot["checkouts"]["timeouts"] == 1
+    assert snapshot["connections"]["opened"] == 2
+    assert snapshot["statements"]["top"][0]["statement"] == "SELECT 1"
+    assert snapshot["statements"]["top"][0]["count"] == 2
+
+    first.close()
+    second.close()
+    engine.dispose()
+    # ``dispose`` recreates the pool from its class, which keeps the metrics.
+    with engine.connect():
+        pass
+    assert metrics.snapshot()["checkouts"]["count"] == 3
+
+
+def test_metrics_endpoint_is_admin_only(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    manager = register_manager("Manager")
+    client.get("/clients", headers=manager)
+    assert client.get("/metrics/db", headers=manager).status_code == 403
+
+    token = client.post(
+        "/auth/login", data={"username": "admin", "password": "StrongPass123"}
+    ).json()["access_token"]
+    admin = {"Authorization": f"Bearer {token}"}
+
+    engines = client.get("/metrics/db", headers=admin).json()["engines"]
+    assert set(engines) == {"sync", "async"}
+    assert engines["sync"]["pool"]["class"] == "TimedQueuePool"
+    assert engines["sync"]["checkouts"]["count"] > 0
+    assert engines["async"]["statements"]["count"] > 0
+
+    assert client.delete("/metrics/db", headers=admin).status_code == 204
+    engines = client.get("/metrics/db", headers=admin).json()["engines"]
+    assert engines["sync"]["statements"]["count"] == 0
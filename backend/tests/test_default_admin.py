@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def _stamp() -> str | None:
+    session = importlib.import_module("app.db.session").SessionLocal()
+    try:
+        admin_service = importlib.import_module("app.services.admin")
+        state = session.get(admin_service.SystemState, admin_service.ADMIN_PASSWORD_STAMP_KEY)
+        return state.value if state is not None else None
+    finally:
+        session.close()
+
+
+def test_startup_skips_password_check_when_hash_unchanged(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config = importlib.import_module("app.core.config")
+    admin_service = importlib.import_module("app.services.admin")
+    calls: list[str] = []
+    original = admin_service.verify_password
+
+    def counting_verify(password: str, password_hash: str) -> bool:
+        calls.append(password)
+        return original(password, password_hash)
+
+    monkeypatch.setattr(admin_service, "verify_password", counting_verify)
+
+    # Without a stamp key nothing derived from the password is stored.
+    assert _stamp() is None
+    admin_service.ensure_default_admin()
+    assert calls == ["StrongPass123"]
+    assert _stamp() is None
+
+    monkeypatch.setenv("ADMIN_PASSWORD_STAMP_KEY", "stamp-secret")
+    config.get_settings.cache_clear()
+    admin_service.ensure_default_admin()
+    admin_service.ensure_default_admin()
+    assert calls == ["StrongPass123"] * 2
+
+    monkeypatch.setenv("DEFAULT_ADMIN_CREDENTIALS", "admin:RotatedPass456")
+    config.get_settings.cache_clear()
+    admin_service.ensure_default_admin()
+    admin_service.ensure_default_admin()
+    assert calls == ["StrongPass123"] * 2 + ["RotatedPass456"]
+
+    response = client.post("/auth/login", data={"username": "admin", "password": "RotatedPass456"})
+    assert response.status_code == 200
+
+    # Dropping the key removes the stamp left by earlier starts.
+    monkeypatch.delenv("ADMIN_PASSWORD_STAMP_KEY")
+    config.get_settings.cache_clear()
+    admin_service.ensure_default_admin()
+    assert _stamp() is None
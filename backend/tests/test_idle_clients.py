@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.models.crm import Interaction
+
+
+def test_idle_prompt_finds_idle_clients_server_side(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    specs = [
+        ("Active", "high", 900),
+        ("Stale", "medium", 100),
+        ("Silent VIP", "high", 500),
+        ("Silent big", "medium", 800),
+        ("Silent low", "low", 10000),
+    ]
+    ids = {}
+    for name, priority, total in specs:
+        response = client.post(
+            "/clients",
+            json={
+                "name": name,
+                "phone": "+77000000000",
+                "email": f"{name.split()[-1].lower()}@example.com",
+                "priority": priority,
+                "total_sum": total,
+            },
+            headers=headers,
+        )
+        ids[name] = response.json()["id"]
+    for name in ("Active", "Stale"):
+        client.post("/interactions", json={"client_id": ids[name], "type": "call", "result": "ok"}, headers=headers)
+
+    session = importlib.import_module("app.db.session").SessionLocal()
+    try:
+        stale = session.query(Interaction).filter(Interaction.client_id == ids["Stale"]).one()
+        stale.created_at = datetime.utcnow() - timedelta(days=30)
+        session.commit()
+    finally:
+        session.close()
+
+    response = client.post("/ai/idle_prompt", json={"idle_days": 7, "limit": 3}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["client_ids"] == [ids["Silent VIP"], ids["Silent big"], ids["Stale"]]
+
+
+def test_idle_prompt_keeps_client_supplied_list(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    response = client.post(
+        "/ai/idle_prompt", json={"clients": [{"id": 42, "name": "Пётр"}]}, headers=headers
+    )
+    assert response.json()["client_ids"] == [42]
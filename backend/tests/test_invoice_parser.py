@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.services.invoice_parser import (
+    MAX_ITEMS,
+    iter_lines,
+    parse_invoice_file,
+    parse_invoice_text,
+    parse_invoices_batch,
+)
+
+SAMPLE = "Счёт № 17\n\n  Стол 2 шт. 1500,00 \nДоставка\nСтул 4 шт. 250.5\nИтого 1 002,00\n"
+
+
+def test_parse_invoice_text_extracts_items_and_total() -> None:
+    result = parse_invoice_text(SAMPLE)
+    assert result["total"] == 1002.0
+    assert result["items"] == [
+        {"description": "Стол 2 шт. 1500,00", "quantity": 2.0, "price": 1500.0},
+        {"description": "Стул 4 шт. 250.5", "quantity": 4.0, "price": 250.5},
+    ]
+    assert parse_invoice_text("")["total"] == 0.0
+
+
+def test_parse_invoice_file_matches_text_parser(tmp_path: Path) -> None:
+    lines = [f"Позиция {index} шт. {index + 1},50" for index in range(MAX_ITEMS * 3)]
+    text = SAMPLE + "\n".join(lines)
+    path = tmp_path / "invoice.txt"
+    path.write_text(text, encoding="utf-8")
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+
+    result = parse_invoice_file(path)
+    assert result == parse_invoice_text(text)
+    assert len(result["items"]) == MAX_ITEMS
+    assert parse_invoice_file(empty)["items"] == []
+    assert parse_invoices_batch([path, empty, path], max_workers=2) == [result, parse_invoice_file(empty), result]
+
+
+def test_lines_split_like_str_splitlines(tmp_path: Path) -> None:
+    separators = ["\n", "\r\n", "\r", "\v", "\f", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029"]
+    text = "".join(f"Позиция {index} шт. 1{index}0{separator}" for index, separator in enumerate(separators))
+    text += "Итого 9"
+    assert list(iter_lines(text)) == text.splitlines()
+
+    # Splitting on "\n" alone would merge lines: NUMBER_PATTERN's \s matches
+    # \v, \f and the other separators, running numbers together.
+    result = parse_invoice_text(text)
+    assert len(result["items"]) == MAX_ITEMS
+    assert result["items"][3]["quantity"] == 3.0
+    assert result["total"] == 9.0
+
+    path = tmp_path / "invoice.txt"
+    path.write_text(text, encoding="utf-8", newline="")
+    assert parse_invoice_file(path) == result
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import importlib
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+INVOICE = "Счёт № 17\nСтол 2 шт. 1500,00\nСтул 4 шт. 250,50\nИтого 4002,00\n".encode("utf-8")
+
+
+@pytest.fixture
+def invoice_env(client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    storage = tmp_path / "invoices"
+    monkeypatch.setenv("INVOICE_STORAGE_DIR", str(storage))
+    importlib.import_module("app.core.config").get_settings.cache_clear()
+    workers = importlib.import_module("app.workers.celery_app")
+
+    def run_now(invoice_id: int) -> None:
+        # Run the task as a worker would: synchronously, outside the event loop.
+        thread = threading.Thread(target=workers.parse_invoice_task, args=(invoice_id,))
+        thread.start()
+        thread.join()
+
+    monkeypatch.setattr(workers.parse_invoice_task, "delay", run_now)
+    return storage
+
+
+def test_upload_parses_and_deduplicates_invoice(
+    client: TestClient, invoice_env: Path, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    client_id = client.post(
+        "/clients", json={"name": "Client", "phone": "+77000001", "email": "c@example.com"}, headers=headers
+    ).json()["id"]
+
+    upload = client.post(
+        "/invoices",
+        data={"client_id": client_id},
+        files={"file": ("invoice.txt", INVOICE, "text/plain")},
+        headers=headers,
+    )
+    assert upload.status_code == 201
+    invoice_id = upload.json()["invoice"]["id"]
+
+    invoice = client.get(f"/invoices/{invoice_id}", headers=headers).json()
+    assert invoice["status"] == "parsed"
+    assert invoice["total_sum"] == 4002.0
+    assert invoice["parsed_data"]["items"][0]["quantity"] == 2.0
+    assert len([path for path in invoice_env.rglob("*") if path.is_file()]) == 1
+
+    again = client.post(
+        "/invoices",
+        data={"client_id": client_id},
+        files={"file": ("copy.txt", INVOICE, "text/plain")},
+        headers=headers,
+    )
+    assert again.status_code == 200
+    assert again.json() == {"invoice": invoice, "duplicate": True}
+    assert len(client.get("/invoices", params={"client_id": client_id}, headers=headers).json()) == 1
+
+    totals = client.get("/dashboard/stats", headers=headers).json()["totals"]
+    assert totals["revenue"] == 4002.0
+
+
+def test_upload_rejects_foreign_client(
+    client: TestClient, invoice_env: Path, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    owner = register_manager("Owner")
+    client_id = client.post(
+        "/clients", json={"name": "Client", "phone": "+77000001", "email": "c@example.com"}, headers=owner
+    ).json()["id"]
+
+    response = client.post(
+        "/invoices",
+        data={"client_id": client_id},
+        files={"file": ("invoice.txt", INVOICE, "text/plain")},
+        headers=register_manager("Intruder"),
+    )
+    assert response.status_code == 404
+
+
+def test_upload_survives_a_broker_outage(
+    client: TestClient,
+    invoice_env: Path,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    headers = register_manager("Manager")
+    client_id = client.post(
+        "/clients", json={"name": "Client", "phone": "+77000001", "email": "c@example.com"}, headers=headers
+    ).json()["id"]
+    workers = importlib.import_module("app.workers.celery_app")
+    run_now = workers.parse_invoice_task.delay
+
+    def broker_down(invoice_id: int) -> None:
+        raise ConnectionError("broker unavailable")
+
+    monkeypatch.setattr(workers.parse_invoice_task, "delay", broker_down)
+    upload = client.post(
+        "/invoices",
+        data={"client_id": client_id},
+        files={"file": ("invoice.txt", INVOICE, "text/plain")},
+        headers=headers,
+    )
+    assert upload.status_code == 201
+    assert upload.json()["invoice"]["status"] == "failed"
+    assert "broker unavailable" in upload.json()["invoice"]["error"]
+
+    # Uploading the file again retries the failed invoice.
+    monkeypatch.setattr(workers.parse_invoice_task, "delay", run_now)
+    retry = client.post(
+        "/invoices",
+        data={"client_id": client_id},
+        files={"file": ("invoice.txt", INVOICE, "text/plain")},
+        headers=headers,
+    )
+    assert retry.status_code == 200
+    assert retry.json()["duplicate"] is True
+    invoice = client.get(f"/invoices/{upload.json()['invoice']['id']}", headers=headers).json()
+    assert (invoice["status"], invoice["error"]) == ("parsed", None)
+
+
+def test_concurrent_duplicate_upload_returns_the_stored_invoice(
+    client: TestClient,
+    invoice_env: Path,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    headers = register_manager("Manager")
+    client_id = client.post(
+        "/clients", json={"name": "Client", "phone": "+77000001", "email": "c@example.com"}, headers=headers
+    ).json()["id"]
+    first = client.post(
+        "/invoices",
+        data={"client_id": client_id},
+        files={"file": ("invoice.txt", INVOICE, "text/plain")},
+        headers=headers,
+    ).json()["invoice"]
+
+    # The second upload checks for a duplicate before the first one commits.
+    routes = importlib.import_module("app.api.routes.invoices")
+    find_duplicate = routes._find_duplicate
+    lookups: list[int] = []
+
+    def racing_lookup(db, client_id, content_hash):
+        lookups.append(client_id)
+        return None if len(lookups) == 1 else find_duplicate(db, client_id, content_hash)
+
+    monkeypatch.setattr(routes, "_find_duplicate", racing_lookup)
+    second = client.post(
+        "/invoices",
+        data={"client_id": client_id},
+        files={"file": ("copy.txt", INVOICE, "text/plain")},
+        headers=headers,
+    )
+    assert second.status_code == 200
+    assert second.json()["duplicate"] is True
+    assert second.json()["invoice"]["id"] == first["id"]
+    assert len(client.get("/invoices", params={"client_id": client_id}, headers=headers).json()) == 1
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert, update
+
+from app.models.crm import Client, Interaction, Invoice, Reminder
+from app.models.stats import ManagerDailyInteractions, ManagerStats
+from app.services import stats
+from app.services.stats import main as stats_main
+from app.services.stats import rebuild_manager_stats
+
+
+def _session():
+    return importlib.import_module("app.db.session").SessionLocal()
+
+
+def test_rollup_tracks_changes_without_drift(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    other_headers = register_manager("Other")
+    client_ids = [
+        client.post(
+            "/clients",
+            json={"name": f"Client {index}", "phone": f"+7700{index:04d}", "email": f"c{index}@example.com"},
+            headers=headers,
+        ).json()["id"]
+        for index in range(3)
+    ]
+    for client_id in client_ids:
+        client.post("/interactions", json={"client_id": client_id, "type": "call", "result": "ok"}, headers=headers)
+        client.post(
+            "/reminders",
+            json={
+                "client_id": client_id,
+                "remind_at": (datetime.utcnow() + timedelta(days=1)).isoformat(),
+                "reason": "follow up",
+            },
+            headers=headers,
+        )
+
+    session = _session()
+    try:
+        session.add(Invoice(client_id=client_ids[0], file_path="a.pdf", total_sum=1500))
+        session.commit()
+        session.query(Reminder).filter(Reminder.client_id == client_ids[0]).one().status = "done"
+        session.delete(session.query(Interaction).filter(Interaction.client_id == client_ids[1]).one())
+        session.query(Invoice).one().total_sum = 2500
+        session.commit()
+
+        stats = session.get(ManagerStats, session.get(Client, client_ids[0]).manager_id)
+        assert (stats.clients, stats.interactions, stats.pending_reminders) == (3, 2, 2)
+        assert float(stats.revenue) == 2500
+
+        other_manager_id = client.get("/auth/me", headers=other_headers).json()["user"]["id"]
+        session.get(Client, client_ids[2]).manager_id = other_manager_id
+        session.commit()
+
+        assert rebuild_manager_stats(session, check_only=True) == []
+    finally:
+        session.close()
+
+    response = client.get("/dashboard/stats", headers=headers)
+    assert response.json()["totals"] == {"clients": 2, "interactions": 1, "reminders": 1, "revenue": 2500.0}
+    response = client.get("/dashboard/stats", headers=other_headers)
+    assert response.json()["totals"] == {"clients": 1, "interactions": 1, "reminders": 1, "revenue": 0.0}
+
+
+def test_rebuild_detects_and_repairs_drift(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]], capsys
+) -> None:
+    headers = register_manager("Manager")
+    client.post(
+        "/clients",
+        json={"name": "Client", "phone": "+77000001", "email": "c@example.com"},
+        headers=headers,
+    )
+
+    session = _session()
+    try:
+        session.execute(update(ManagerStats).values(clients=42))
+        session.commit()
+    finally:
+        session.close()
+
+    assert stats_main(["--check"]) == 1
+    assert "clients stored=42 expected=1" in capsys.readouterr().out
+    assert stats_main([]) == 0
+    assert stats_main(["--check"]) == 0
+
+
+def test_first_write_applies_deltas_on_a_concurrently_seeded_row(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    headers = register_manager("Manager")
+    client_id = client.post(
+        "/clients",
+        json={"name": "Client", "phone": "+77000001", "email": "c@example.com"},
+        headers=headers,
+    ).json()["id"]
+    client.post("/interactions", json={"client_id": client_id, "type": "call", "result": "ok"}, headers=headers)
+
+    session = _session()
+    try:
+        manager_id = session.get(Client, client_id).manager_id
+        session.execute(delete(ManagerDailyInteractions))
+        session.execute(delete(ManagerStats))
+        session.commit()
+
+        # Another transaction seeds the row from committed data while this
+        # one is between its UPDATE (no row yet) and its own seed INSERT.
+        original = stats.compute_totals
+
+        def seeded_concurrently(connection, manager_ids=None):
+            monkeypatch.setattr(stats, "compute_totals", original)
+            connection.execute(
+                insert(ManagerStats).values(
+                    manager_id=manager_id, clients=1, interactions=1, pending_reminders=0, revenue=0
+                )
+            )
+            connection.execute(
+                insert(ManagerDailyInteractions).values(
+                    manager_id=manager_id, day=datetime.utcnow().date(), interactions=1
+                )
+            )
+            return original(connection, manager_ids)
+
+        monkeypatch.setattr(stats, "compute_totals", seeded_concurrently)
+        session.add(Interaction(client_id=client_id, type="email", result="sent"))
+        session.commit()
+
+        assert stats.seed_manager(session.connection(), manager_id) is False
+        assert rebuild_manager_stats(session, check_only=True) == []
+    finally:
+        session.close()
+    assert client.get("/dashboard/stats", headers=headers).json()["totals"]["interactions"] == 2
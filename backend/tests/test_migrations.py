@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.db import migrations
+
+
+def test_run_migrations_adds_and_backfills_phone_reversed(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE clients (id INTEGER PRIMARY KEY, manager_id INTEGER, phone VARCHAR, created_at DATETIME)")
+        )
+        connection.execute(
+            text("INSERT INTO clients (id, manager_id, phone) VALUES (:id, 1, :phone)"),
+            [{"id": index, "phone": f"+7 (700) 00-{index:03d}"} for index in range(1, 6)],
+        )
+
+    migrations.run_migrations(engine)
+    assert migrations.backfill_client_phone_reversed(engine, batch_size=2) == 0
+    index_names = {index["name"] for index in inspect(engine).get_indexes("clients")}
+    assert "ix_clients_manager_phone_reversed" not in index_names
+    assert "ix_clients_manager_phone_reversed" in migrations.create_indexes(engine)
+    assert migrations.create_indexes(engine) == []
+
+    with engine.connect() as connection:
+        values = connection.execute(text("SELECT phone_reversed FROM clients ORDER BY id")).scalars().all()
+    assert values[0] == "100000077"
+    assert all(values)
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes("clients")}
+    assert "ix_clients_manager_phone_reversed" in index_names
+
+
+def test_create_indexes_makes_invoice_hashes_unique(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE clients (id INTEGER PRIMARY KEY, manager_id INTEGER, phone VARCHAR, created_at DATETIME)"))
+        connection.execute(
+            text(
+                "CREATE TABLE invoices (id INTEGER PRIMARY KEY, client_id INTEGER NOT NULL, "
+                "file_path VARCHAR NOT NULL, total_sum NUMERIC NOT NULL DEFAULT 0, parsed_data JSON, "
+                "content_hash VARCHAR(64))"
+            )
+        )
+        connection.execute(text("CREATE INDEX ix_invoices_client_hash ON invoices (client_id, content_hash)"))
+        connection.execute(
+            text("INSERT INTO invoices (id, client_id, file_path, content_hash) VALUES (:id, :client, 'f', :hash)"),
+            [
+                {"id": 1, "client": 1, "hash": "a"},
+                {"id": 2, "client": 1, "hash": "a"},
+                {"id": 3, "client": 2, "hash": "a"},
+                {"id": 4, "client": 1, "hash": None},
+            ],
+        )
+
+    migrations.run_migrations(engine)
+    migrations.create_indexes(engine)
+
+    with engine.connect() as connection:
+        hashes = connection.execute(text("SELECT content_hash FROM invoices ORDER BY id")).scalars().all()
+    assert hashes == ["a", None, "a", None]
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("invoices")}
+    assert "ix_invoices_client_hash" not in indexes
+    assert indexes["uq_invoices_client_hash"]["unique"]
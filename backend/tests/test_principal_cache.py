@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_expires_and_evicts() -> None:
+    now = [0.0]
+    cache: TTLCache[str] = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def _admin_headers(client: TestClient) -> dict[str, str]:
+    response = client.post("/auth/login", data={"username": "admin", "password": "StrongPass123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_role_change_invalidates_cached_principal(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    me = client.get("/auth/me", headers=headers).json()["user"]
+    assert me["role"] == "manager"
+    assert client.get("/admin/users", headers=headers).status_code == 403
+
+    admin_headers = _admin_headers(client)
+    response = client.patch(f"/admin/users/{me['id']}", json={"role": "admin"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/admin/users", headers=headers).status_code == 200
+
+    assert client.delete(f"/admin/users/{me['id']}", headers=admin_headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
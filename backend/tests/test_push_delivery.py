@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import base64
+import importlib
+import os
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.services.push import get_push_service
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _browser_keys() -> dict[str, str]:
+    public_key = ec.generate_private_key(ec.SECP256R1()).public_key()
+    point = public_key.public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    return {"p256dh": _b64(point), "auth": _b64(os.urandom(16))}
+
+
+class FakePushService:
+    """Push endpoint: ``/ok/*`` accepts, ``/gone`` is 410, ``/flaky`` fails once."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict[str, object]] = []
+        self.flaky_failures = 1
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                service.requests.append(
+                    {
+                        "path": self.path,
+                        "port": self.client_address[1],
+                        "authorization": self.headers.get("Authorization"),
+                    }
+                )
+                status = 201
+                if self.path == "/gone":
+                    status = 410
+                elif self.path == "/flaky" and service.flaky_failures > 0:
+                    service.flaky_failures -= 1
+                    status = 503
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def subscription(self, path: str) -> dict:
+        return {"endpoint": f"{self.base_url}{path}", "keys": _browser_keys()}
+
+    def hits(self, path: str) -> int:
+        return sum(1 for request in self.requests if request["path"] == path)
+
+
+@pytest.fixture
+def push_service(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakePushService]:
+    private_value = ec.generate_private_key(ec.SECP256R1()).private_numbers().private_value
+    monkeypatch.setenv("VAPID_PRIVATE_KEY", _b64(private_value.to_bytes(32, "big")))
+    monkeypatch.setenv("VAPID_PUBLIC_KEY", "public-key")
+    monkeypatch.setenv("PUSH_RETRY_BACKOFF", "0")
+    get_settings.cache_clear()
+    get_push_service.cache_clear()
+
+    fake = FakePushService()
+    thread = threading.Thread(target=fake.server.serve_forever, daemon=True)
+    thread.start()
+    yield fake
+    fake.server.shutdown()
+    fake.server.server_close()
+    get_push_service.cache_clear()
+
+
+def test_batch_reuses_connection_and_vapid_token(push_service: FakePushService) -> None:
+    subscriptions = [push_service.subscription(f"/ok/{index}") for index in range(3)]
+    subscriptions += [push_service.subscription("/gone"), push_service.subscription("/flaky")]
+
+    messages = [{"subscription": subscription, "payload": "hello"} for subscription in subscriptions]
+    result = get_push_service().send_batch(messages)
+
+    assert result.delivered == 3
+    assert result.expired == [subscriptions[3]["endpoint"]]
+    assert result.retry == [messages[4]]
+    assert len({request["port"] for request in push_service.requests}) == 1
+    assert len({request["authorization"] for request in push_service.requests}) == 1
+
+
+def test_batch_task_prunes_gone_subscriptions_and_retries(
+    client: TestClient, register_manager, push_service: FakePushService
+) -> None:
+    headers = register_manager("Pusher")
+    endpoints = ["/ok/1", "/gone", "/flaky"]
+    for path in endpoints:
+        response = client.post("/push/register", json=push_service.subscription(path), headers=headers)
+        assert response.status_code == 204
+
+    session = importlib.import_module("app.db.session").SessionLocal()
+    subscriptions_service = importlib.import_module("app.services.push_subscriptions")
+    celery_app = importlib.import_module("app.workers.celery_app")
+    manager_id = client.get("/auth/me", headers=headers).json()["user"]["id"]
+    try:
+        subscriptions = subscriptions_service.get_user_subscriptions(session, manager_id)
+        messages = [{"subscription": subscription, "payload": "hello"} for subscription in subscriptions]
+        celery_app.send_push_batch_task.apply(args=(messages,))
+        remaining = subscriptions_service.get_user_subscriptions(session, manager_id)
+    finally:
+        session.close()
+
+    assert push_service.hits("/flaky") == 2
+    assert push_service.hits("/ok/1") == 1
+    assert push_service.hits("/gone") == 1
+    assert sorted(item["endpoint"] for item in remaining) == [
+        f"{push_service.base_url}/flaky",
+        f"{push_service.base_url}/ok/1",
+    ]
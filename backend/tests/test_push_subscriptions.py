@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.push_subscriptions import SubscriptionCache
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+        self.gets = 0
+
+    def get(self, key: str):
+        self.gets += 1
+        return self.data.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.data[key] = value
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def _subscription(endpoint: str, auth: str = "auth") -> dict:
+    return {"endpoint": endpoint, "keys": {"p256dh": "p256dh-key", "auth": auth}}
+
+
+def test_subscriptions_are_persisted_deduplicated_and_cached(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = importlib.import_module("app.services.push_subscriptions")
+    redis = FakeRedis()
+    monkeypatch.setattr(service, "get_subscription_cache", lambda: SubscriptionCache(redis, ttl=60))
+    celery_app = importlib.import_module("app.workers.celery_app")
+    sent: list[dict] = []
+    monkeypatch.setattr(
+        celery_app.send_push_batch_task,
+        "delay",
+        lambda batch: sent.extend(message["subscription"] for message in batch),
+    )
+
+    headers = register_manager("Manager")
+    other = register_manager("Other")
+    for body in (_subscription("https://push.example/a"), _subscription("https://push.example/a", "rotated")):
+        assert client.post("/push/register", json=body, headers=headers).status_code == 204
+    client.post("/push/register", json=_subscription("https://push.example/b"), headers=headers)
+
+    assert client.post("/push/send", json={"message": "hi"}, headers=headers).json() == {"scheduled": 2}
+    assert sent[0]["keys"]["auth"] == "rotated"
+
+    # The second send resolves the devices from the cache.
+    session = importlib.import_module("app.db.session").SessionLocal()
+    try:
+        manager_id = client.get("/auth/me", headers=headers).json()["user"]["id"]
+        assert service.get_user_subscriptions(session, manager_id) == sent[:2]
+    finally:
+        session.close()
+
+    # The same browser registering for another user moves the device.
+    client.post("/push/register", json=_subscription("https://push.example/b"), headers=other)
+    assert client.post("/push/send", json={"message": "hi"}, headers=headers).json() == {"scheduled": 1}
+    assert client.post("/push/send", json={"message": "hi"}, headers=other).json() == {"scheduled": 1}
+
+    client.post("/push/unregister", json={"endpoint": "https://push.example/a"}, headers=headers)
+    assert client.post("/push/send", json={"message": "hi"}, headers=headers).status_code == 404
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.routing import Replica, ReplicaSet
+
+STICKINESS_SECONDS = 0.3
+
+
+@pytest.fixture
+def replica_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "replica.db"
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", f"sqlite:///{path}")
+    monkeypatch.setenv("DB_REPLICA_STICKINESS_SECONDS", str(STICKINESS_SECONDS))
+    return path
+
+
+def _replicate(replica_file: Path) -> None:
+    """Bring the replica up to date by copying the primary's file."""
+
+    shutil.copyfile(make_url(os.environ["DATABASE_URL"]).database, replica_file)
+
+
+def _client_names(client: TestClient, headers: dict[str, str]) -> list[str]:
+    response = client.get("/clients", headers=headers)
+    assert response.status_code == 200
+    return sorted(item["name"] for item in response.json())
+
+
+def test_reads_go_to_the_replica_unless_the_caller_just_wrote(
+    replica_file: Path, client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    manager = register_manager("Manager")
+    body = {"phone": "+77001112233", "email": "client@example.com"}
+    client.post("/clients", json={"name": "Replicated", **body}, headers=manager)
+    _replicate(replica_file)
+    client.post("/clients", json={"name": "Fresh", **body}, headers=manager)
+
+    # The write pins the caller to the primary, so it reads its own write.
+    assert _client_names(client, manager) == ["Fresh", "Replicated"]
+
+    time.sleep(STICKINESS_SECONDS + 0.1)
+    # Unpinned reads come from the replica, which has not seen "Fresh" yet.
+    assert _client_names(client, manager) == ["Replicated"]
+    assert client.get("/dashboard/stats", headers=manager).status_code == 200
+
+    # An account newer than the replica falls back to the primary.
+    newcomer = register_manager("Newcomer")
+    time.sleep(STICKINESS_SECONDS + 0.1)
+    assert _client_names(client, newcomer) == []
+
+
+def test_replica_set_skips_replicas_that_fail_the_health_check(tmp_path: Path) -> None:
+    def replica(name: str, url: str) -> Replica:
+        return Replica(
+            name,
+            create_engine(url),
+            create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://", 1)),
+        )
+
+    first = replica("first", f"sqlite:///{tmp_path / 'first.db'}")
+    second = replica("second", f"sqlite:///{tmp_path / 'second.db'}")
+    replicas = ReplicaSet([first, second], stickiness_seconds=5)
+
+    assert [replicas.choose() for _ in range(4)] == [first, second, first, second]
+    assert replicas.read_bind("POST", None, asynchronous=False) is None
+
+    replicas.pin("caller")
+    assert replicas.read_bind("GET", "caller", asynchronous=False) is None
+    assert replicas.read_bind("GET", "other", asynchronous=True) is not None
+
+    second.engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'second.db'}")
+    replicas.check()
+    assert not second.healthy
+    assert {replicas.choose() for _ in range(4)} == {first}
+
+    second.engine = create_engine(f"sqlite:///{tmp_path / 'second.db'}")
+    replicas.check()
+    assert second.healthy
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.keys: dict[str, float] = {}
+        self.down = False
+
+    def set(self, key: str, value: object, px: int) -> None:
+        if self.down:
+            raise ConnectionError("redis is down")
+        self.keys[key] = time.monotonic() + px / 1000
+
+    def exists(self, key: str) -> int:
+        if self.down:
+            raise ConnectionError("redis is down")
+        return int(self.keys.get(key, 0) > time.monotonic())
+
+
+def test_replica_pins_are_shared_between_workers_through_redis(tmp_path: Path) -> None:
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+
+    def worker(redis_client: _FakeRedis) -> ReplicaSet:
+        replica = Replica(
+            "replica",
+            create_engine(url),
+            create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://", 1)),
+        )
+        return ReplicaSet([replica], stickiness_seconds=STICKINESS_SECONDS, redis_client=redis_client)
+
+    redis_client = _FakeRedis()
+    writer, reader = worker(redis_client), worker(redis_client)
+
+    writer.pin("caller")
+    assert reader.read_bind("GET", "caller", asynchronous=False) is None
+    assert reader.read_bind("GET", "other", asynchronous=False) is not None
+
+    time.sleep(STICKINESS_SECONDS + 0.1)
+    assert reader.read_bind("GET", "caller", asynchronous=False) is not None
+
+    # Without Redis a worker cannot know about other workers' pins.
+    redis_client.down = True
+    assert reader.read_bind("GET", "caller", asynchronous=False) is None
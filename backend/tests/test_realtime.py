@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+import httpx
+import pytest
+import socketio
+import uvicorn
+from fastapi.testclient import TestClient
+
+from app.services.realtime import BoundedAsyncServer
+
+
+@pytest.fixture
+def server_url(client: TestClient) -> Iterator[str]:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    app = importlib.import_module("app.main").app
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off", log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "uvicorn did not start"
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+def _token(headers: dict[str, str]) -> str:
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+async def _connect(url: str, token: str | None) -> tuple[socketio.AsyncClient, list]:
+    sio = socketio.AsyncClient()
+    received: list = []
+    sio.on("message", received.append)
+    await sio.connect(
+        url,
+        socketio_path="/ws/socket.io",
+        transports=["websocket"],
+        auth={"token": token} if token else None,
+        wait_timeout=5,
+    )
+    return sio, received
+
+
+def test_messages_stay_in_the_sender_rooms(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]], server_url: str
+) -> None:
+    alice = register_manager("Alice")
+    bob = register_manager("Bob")
+    alice_client = client.post(
+        "/clients",
+        json={"name": "Client", "phone": "+77001112233", "email": "client@example.com"},
+        headers=alice,
+    ).json()["id"]
+
+    async def scenario() -> None:
+        with pytest.raises(socketio.exceptions.ConnectionError):
+            await _connect(server_url, None)
+        with pytest.raises(socketio.exceptions.ConnectionError):
+            await _connect(server_url, "not-a-token")
+
+        alice_sio, alice_received = await _connect(server_url, _token(alice))
+        bob_sio, bob_received = await _connect(server_url, _token(bob))
+        try:
+            assert await bob_sio.call("subscribe_client", {"client_id": alice_client}) == {
+                "ok": False,
+                "error": "Client not found",
+            }
+            assert await alice_sio.call("subscribe_client", {"client_id": alice_client}) == {"ok": True}
+
+            await alice_sio.emit("message", {"text": "hello"})
+            await alice_sio.emit("message", {"text": "about client", "client_id": alice_client})
+            await bob_sio.emit("message", {"text": "sneaky", "client_id": alice_client})
+            await asyncio.sleep(0.5)
+        finally:
+            await alice_sio.disconnect()
+            await bob_sio.disconnect()
+
+        assert [message["text"] for message in alice_received] == ["hello", "about client"]
+        assert bob_received == []
+
+    asyncio.run(scenario())
+
+
+def test_writes_publish_dashboard_deltas_to_the_manager_room(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]], server_url: str
+) -> None:
+    alice = register_manager("Alice")
+    bob = register_manager("Bob")
+
+    async def scenario() -> tuple[list, list]:
+        alice_sio, _ = await _connect(server_url, _token(alice))
+        bob_sio, _ = await _connect(server_url, _token(bob))
+        alice_deltas: list = []
+        bob_deltas: list = []
+        alice_sio.on("dashboard:delta", alice_deltas.append)
+        bob_sio.on("dashboard:delta", bob_deltas.append)
+        try:
+            async with httpx.AsyncClient(base_url=server_url, headers=alice) as http:
+                client_id = (
+                    await http.post(
+                        "/clients",
+                        json={"name": "Client", "phone": "+77001112233", "email": "client@example.com"},
+                    )
+                ).json()["id"]
+                await http.post(
+                    "/interactions", json={"client_id": client_id, "type": "call", "result": "ok"}
+                )
+                await http.post(
+                    "/reminders",
+                    json={"client_id": client_id, "remind_at": "2030-01-01T09:00:00", "reason": "call"},
+                )
+            await asyncio.sleep(0.5)
+        finally:
+            await alice_sio.disconnect()
+            await bob_sio.disconnect()
+        return alice_deltas, bob_deltas
+
+    alice_deltas, bob_deltas = asyncio.run(scenario())
+
+    assert bob_deltas == []
+    assert [delta["counters"] for delta in alice_deltas] == [
+        {"clients": 1},
+        {"interactions": 1},
+        {"reminders": 1},
+    ]
+    assert alice_deltas[0]["client"]["name"] == "Client"
+    assert alice_deltas[1]["interaction"]["client"] == "Client"
+    assert alice_deltas[2]["reminder"]["reason"] == "call"
+
+
+def test_backlogged_socket_is_disconnected_instead_of_buffering() -> None:
+    from engineio.async_socket import AsyncSocket
+
+    async def scenario() -> tuple[BoundedAsyncServer, AsyncSocket, str]:
+        server = BoundedAsyncServer(async_mode="asgi", max_queue_size=3)
+        socket = AsyncSocket(server.eio, "slow")
+        socket.connected = True
+        server.eio.sockets["slow"] = socket
+        sid = await server.manager.connect("slow", "/")
+        await server.emit("first", {}, to=sid)
+        await server.emit("second", {}, to=sid)
+        await server.emit("third", {}, to=sid)
+        # The client reads nothing; the fourth packet finds the queue full.
+        await asyncio.wait_for(server.emit("fourth", {}, to=sid), timeout=1)
+        return server, socket, sid
+
+    # Goes through the public ``emit`` API, so it fails if a python-socketio
+    # upgrade stops routing packets through the overridden hooks.
+    server, socket, sid = asyncio.run(scenario())
+
+    assert server.dropped_packets == 1
+    assert socket.closed
+    assert not server.manager.is_connected(sid, "/")
+    assert socket.queue.get_nowait() is None
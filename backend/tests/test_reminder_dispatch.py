@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import importlib
+import json
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.models.crm import Reminder
+from app.services.reminder_dispatch import dispatch_due_reminders, drain_due_reminders
+from app.services.stats import rebuild_manager_stats
+
+
+def _session():
+    return importlib.import_module("app.db.session").SessionLocal()
+
+
+def test_due_reminders_are_pushed_once_and_marked_sent(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    celery_app = importlib.import_module("app.workers.celery_app")
+    batches: list[list[dict]] = []
+    monkeypatch.setattr(celery_app.send_push_batch_task, "delay", batches.append)
+
+    headers = register_manager("Manager")
+    for endpoint in ("https://push.example/phone", "https://push.example/laptop"):
+        client.post(
+            "/push/register",
+            json={"endpoint": endpoint, "keys": {"p256dh": "key", "auth": "auth"}},
+            headers=headers,
+        )
+    client_id = client.post(
+        "/clients",
+        json={"name": "Иван", "phone": "+77001234567", "email": "ivan@example.com"},
+        headers=headers,
+    ).json()["id"]
+    now = datetime.utcnow()
+    for offset, reason in ((-120, "call back"), (-60, "send offer"), (3600, "later")):
+        client.post(
+            "/reminders",
+            json={
+                "client_id": client_id,
+                "remind_at": (now + timedelta(seconds=offset)).isoformat(),
+                "reason": reason,
+            },
+            headers=headers,
+        )
+
+    session = _session()
+    try:
+        assert dispatch_due_reminders(session, batch_size=1) == 1
+        assert drain_due_reminders(session, batch_size=10, time_budget=5) == 1
+        assert drain_due_reminders(session, batch_size=10, time_budget=5) == 0
+        statuses = dict(session.execute(select(Reminder.reason, Reminder.status)).all())
+        drift = rebuild_manager_stats(session, check_only=True)
+    finally:
+        session.close()
+
+    assert statuses == {"call back": "sent", "send offer": "sent", "later": "pending"}
+    assert drift == []
+    messages = [message for batch in batches for message in batch]
+    assert len(messages) == 4
+    payloads = [json.loads(message["payload"]) for message in messages]
+    assert [payload["body"] for payload in payloads[::2]] == [
+        "Свяжитесь с Иван: call back",
+        "Свяжитесь с Иван: send offer",
+    ]
+    assert {message["subscription"]["endpoint"] for message in messages[:2]} == {
+        "https://push.example/phone",
+        "https://push.example/laptop",
+    }
+    dashboard = client.get("/dashboard/stats", headers=headers).json()
+    assert dashboard["totals"]["reminders"] == 1
+
+
+def test_pushes_are_queued_after_the_claim_commits_and_retried_after_a_broker_outage(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    celery_app = importlib.import_module("app.workers.celery_app")
+    dispatch = importlib.import_module("app.services.reminder_dispatch")
+    headers = register_manager("Manager")
+    client.post(
+        "/push/register",
+        json={"endpoint": "https://push.example/phone", "keys": {"p256dh": "key", "auth": "auth"}},
+        headers=headers,
+    )
+    client_id = client.post(
+        "/clients",
+        json={"name": "Иван", "phone": "+77001234567", "email": "ivan@example.com"},
+        headers=headers,
+    ).json()["id"]
+    now = datetime.utcnow()
+    client.post(
+        "/reminders",
+        json={"client_id": client_id, "remind_at": (now - timedelta(minutes=1)).isoformat(), "reason": "call back"},
+        headers=headers,
+    )
+
+    session = _session()
+    batches: list[list[dict]] = []
+    in_transaction: list[bool] = []
+
+    def broker_down(messages: list[dict]) -> None:
+        in_transaction.append(session.in_transaction())
+        raise ConnectionError("broker unavailable")
+
+    try:
+        monkeypatch.setattr(celery_app.send_push_batch_task, "delay", broker_down)
+        assert dispatch_due_reminders(session, batch_size=10, now=now) == 1
+        # The claim committed first, so no row locks (the manager's stats row
+        # included) were held while the broker was contacted.
+        assert in_transaction == [False]
+        assert session.scalar(select(Reminder.status)) == "queued"
+        assert client.get("/dashboard/stats", headers=headers).json()["totals"]["reminders"] == 0
+
+        monkeypatch.setattr(celery_app.send_push_batch_task, "delay", batches.append)
+        # Not retried while another dispatcher may still be queueing it.
+        assert dispatch_due_reminders(session, batch_size=10, now=now) == 0
+        later = now + dispatch.QUEUED_RETRY_AFTER
+        assert dispatch_due_reminders(session, batch_size=10, now=later) == 1
+        assert session.scalar(select(Reminder.status)) == "sent"
+        drift = rebuild_manager_stats(session, check_only=True)
+    finally:
+        session.close()
+
+    assert drift == []
+    assert [json.loads(message["payload"])["body"] for batch in batches for message in batch] == [
+        "Свяжитесь с Иван: call back"
+    ]
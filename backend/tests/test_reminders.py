@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import reminders as reminders_route
+
+
+def _create_client(client: TestClient, headers: dict[str, str]) -> int:
+    return client.post(
+        "/clients",
+        json={"name": "Client", "phone": "+77001112233", "email": "client@example.com"},
+        headers=headers,
+    ).json()["id"]
+
+
+def _create_reminder(
+    client: TestClient, headers: dict[str, str], client_id: int, remind_at: datetime, **extra
+) -> dict:
+    response = client.post(
+        "/reminders",
+        json={"client_id": client_id, "remind_at": remind_at.isoformat(), "reason": "call", **extra},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_reminders_filters_and_keyset_pages(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    client_id = _create_client(client, headers)
+    base = datetime(2030, 1, 1, 9, 0)
+    created = [
+        _create_reminder(client, headers, client_id, base + timedelta(hours=index // 2))
+        for index in range(6)
+    ]
+    _create_reminder(client, headers, client_id, base, status="done")
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 4, "status": "pending"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/reminders", params=params, headers=headers)
+        seen += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [item["id"] for item in created]
+
+    ranged = client.get(
+        "/reminders",
+        params={"from": "2030-01-01T10:00:00", "to": "2030-01-01T16:00:00+05:00"},
+        headers=headers,
+    ).json()
+    assert [item["id"] for item in ranged] == [item["id"] for item in created[2:4]]
+
+    assert client.get("/reminders", params={"cursor": "nope"}, headers=headers).status_code == 400
+
+
+def test_due_today_uses_requested_timezone(
+    client: TestClient,
+    register_manager: Callable[[str], dict[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # 21:00 UTC on Jan 1st is already 02:00 on Jan 2nd in UTC+5.
+    now = datetime(2030, 1, 1, 21, 0, tzinfo=timezone.utc)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now.astimezone(tz) if tz else now.replace(tzinfo=None)
+
+    monkeypatch.setattr(reminders_route, "datetime", FrozenDatetime)
+    headers = register_manager("Manager")
+    client_id = _create_client(client, headers)
+    evening = _create_reminder(client, headers, client_id, datetime(2030, 1, 1, 15, 0))
+    tomorrow = _create_reminder(client, headers, client_id, datetime(2030, 1, 2, 10, 0))
+
+    def due_today(**params) -> list[int]:
+        response = client.get("/reminders", params={"due_today": True, **params}, headers=headers)
+        return [item["id"] for item in response.json()]
+
+    assert due_today() == [evening["id"]]
+    assert due_today(tz="Asia/Almaty") == [tomorrow["id"]]
+    response = client.get("/reminders", params={"due_today": True, "tz": "Mars/Base"}, headers=headers)
+    assert response.status_code == 400
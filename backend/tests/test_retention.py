@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+
+from app.models.archive import AuditLogArchive, InteractionArchive, ReminderArchive
+from app.models.crm import AuditLog, Interaction, Reminder
+from app.services.retention import run_retention
+from app.services.stats import rebuild_manager_stats
+
+
+def _session():
+    return importlib.import_module("app.db.session").SessionLocal()
+
+
+def test_expired_rows_move_to_the_archive_in_batches(
+    client: TestClient, register_manager: Callable[[str], dict[str, str]]
+) -> None:
+    headers = register_manager("Manager")
+    client_id = client.post(
+        "/clients",
+        json={"name": "Client", "phone": "+77001112233", "email": "client@example.com"},
+        headers=headers,
+    ).json()["id"]
+    for index in range(5):
+        client.post(
+            "/interactions",
+            json={"client_id": client_id, "type": "call", "result": f"call {index}"},
+            headers=headers,
+        )
+    now = datetime.utcnow()
+    old = now - timedelta(days=120)
+    for remind_at, reason in ((old, "old pending"), (old, "old sent"), (now, "recent")):
+        client.post(
+            "/reminders",
+            json={"client_id": client_id, "remind_at": remind_at.isoformat(), "reason": reason},
+            headers=headers,
+        )
+
+    session = _session()
+    try:
+        # Age three interactions and one sent reminder past the retention period.
+        session.execute(
+            update(Interaction)
+            .where(Interaction.result.in_(["call 0", "call 1", "call 2"]))
+            .values(created_at=old)
+        )
+        session.execute(update(Reminder).where(Reminder.reason == "old sent").values(status="sent"))
+        session.add_all(
+            [
+                AuditLog(user_id=1, action="update", entity="client", entity_id=client_id, timestamp=old),
+                AuditLog(user_id=1, action="update", entity="client", entity_id=client_id, timestamp=now),
+            ]
+        )
+        session.commit()
+        # The bulk update moved interactions between days; bring the rollup in line.
+        rebuild_manager_stats(session)
+
+        archived = run_retention(session, retention_days=90, batch_size=2, time_budget=10, now=now)
+        assert archived == {"interactions": 3, "reminders": 1, "audit_log": 1}
+        assert run_retention(session, retention_days=90, batch_size=2, time_budget=10, now=now) == {
+            "interactions": 0,
+            "reminders": 0,
+            "audit_log": 0,
+        }
+
+        def count(model) -> int:
+            return session.scalar(select(func.count()).select_from(model))
+
+        assert (count(Interaction), count(InteractionArchive)) == (2, 3)
+        assert (count(Reminder), count(ReminderArchive)) == (2, 1)
+        assert (count(AuditLog), count(AuditLogArchive)) == (1, 1)
+        assert session.scalar(select(ReminderArchive.reason)) == "old sent"
+        assert session.scalar(select(func.min(InteractionArchive.archived_at))) is not None
+        assert rebuild_manager_stats(session, check_only=True) == []
+    finally:
+        session.close()
+
+    totals = client.get("/dashboard/stats", headers=headers).json()["totals"]
+    # Archived interactions still count towards the lifetime total.
+    assert totals["interactions"] == 5
+    assert totals["reminders"] == 2
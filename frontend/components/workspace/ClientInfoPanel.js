@@ -1,3 +1,10 @@
+const TIMELINE_LABELS = {
+  interaction: 'Взаимодействие',
+  reminder: 'Напоминание',
+  invoice: 'Счёт',
+  progress: 'Этап воронки'
+};
+
 function InfoRow({ label, value }) {
   if (!value) return null;
   return (
@@ -17,7 +24,7 @@ function Section({ title, children }) {
   );
 }
 
-export default function ClientInfoPanel({ client, interactions, reminders }) {
+export default function ClientInfoPanel({ client, timeline, reminders }) {
   return (
     <aside className="flex h-full w-full max-w-sm flex-col gap-6 rounded-3xl border border-slate-200 bg-white/80 p-6 shadow-sm transition dark:border-slate-800 dark:bg-slate-900/60">
       <header>
@@ -46,18 +53,25 @@ export default function ClientInfoPanel({ client, interactions, reminders }) {
             <InfoRow label="Сумма сделок" value={client.total_sum ? `${client.total_sum} ₽` : null} />
           </Section>
 
-          <Section title="Последние взаимодействия">
-            {interactions?.length ? (
+          <Section title="История клиента">
+            {timeline?.length ? (
               <ul className="space-y-2 text-xs text-slate-500 dark:text-slate-300">
-                {interactions.map((interaction) => (
-                  <li key={interaction.id} className="rounded-2xl border border-slate-200 p-3 dark:border-slate-700">
-                    <p className="font-medium capitalize text-slate-600 dark:text-slate-200">{interaction.type}</p>
-                    <p className="mt-1 text-sm text-slate-700 dark:text-slate-100">{interaction.result}</p>
-                    {interaction.created_at ? (
-                      <p className="mt-2 text-[0.65rem] uppercase tracking-wide text-slate-400">
-                        {new Date(interaction.created_at).toLocaleString('ru-RU')}
-                      </p>
+                {timeline.map((event) => (
+                  <li key={`${event.kind}-${event.id}`} className="rounded-2xl border border-slate-200 p-3 dark:border-slate-700">
+                    <p className="font-medium text-slate-600 dark:text-slate-200">
+                      {TIMELINE_LABELS[event.kind] || event.kind}
+                      {event.title ? `: ${event.title}` : ''}
+                    </p>
+                    {event.detail ? (
+                      <p className="mt-1 text-sm text-slate-700 dark:text-slate-100">{event.detail}</p>
+                    ) : null}
+                    {event.amount ? (
+                      <p className="mt-1 text-sm text-slate-700 dark:text-slate-100">{event.amount} ₽</p>
                     ) : null}
+                    <p className="mt-2 text-[0.65rem] uppercase tracking-wide text-slate-400">
+                      {new Date(event.at).toLocaleString('ru-RU')}
+                      {event.status ? ` · ${event.status}` : ''}
+                    </p>
                   </li>
                 ))}
               </ul>
@@ -0,0 +1,73 @@
+import { useEffect, useState } from 'react';
+import { io } from 'socket.io-client';
+import getApiUrl from '@/utils/getApiUrl';
+
+export const DASHBOARD_DELTA_EVENT = 'dashboard:delta';
+const RECENT_LIMIT = 5;
+
+function applyCounters(totals, counters) {
+  if (!totals || !counters) return totals;
+  const next = { ...totals };
+  Object.entries(counters).forEach(([key, delta]) => {
+    next[key] = Number(next[key] ?? 0) + Number(delta ?? 0);
+  });
+  return next;
+}
+
+export function applyDashboardDelta(stats, delta) {
+  if (!stats) return stats;
+  const next = { ...stats, totals: applyCounters(stats.totals, delta.counters) };
+  if (delta.interaction && Array.isArray(stats.recentInteractions)) {
+    next.recentInteractions = [delta.interaction, ...stats.recentInteractions].slice(0, RECENT_LIMIT);
+  }
+  return next;
+}
+
+// Keeps the dashboard queries current from the manager's Socket.IO room.
+// Deltas are applied to the cached data in place; a full refetch happens
+// only after a reconnect, when deltas may have been missed.
+export default function useDashboardSocket(token, queryClient) {
+  const [isLive, setIsLive] = useState(false);
+
+  useEffect(() => {
+    if (!token || !queryClient) return undefined;
+
+    const socket = io(getApiUrl(), {
+      path: '/ws/socket.io',
+      transports: ['websocket'],
+      auth: { token }
+    });
+    let hasConnected = false;
+
+    socket.on('connect', () => {
+      if (hasConnected) {
+        queryClient.invalidateQueries(['dashboard']);
+      }
+      hasConnected = true;
+      setIsLive(true);
+    });
+
+    socket.on('disconnect', () => {
+      setIsLive(false);
+    });
+
+    socket.on(DASHBOARD_DELTA_EVENT, (delta) => {
+      queryClient.setQueryData(['dashboard', 'stats'], (stats) => applyDashboardDelta(stats, delta));
+      if (delta.interaction) {
+        queryClient.setQueryData(['dashboard', 'interactions'], (items) =>
+          Array.isArray(items) ? [delta.interaction, ...items].slice(0, RECENT_LIMIT) : items
+        );
+      }
+      if (delta.reminder) {
+        queryClient.invalidateQueries(['dashboard', 'reminders']);
+      }
+    });
+
+    return () => {
+      socket.disconnect();
+      setIsLive(false);
+    };
+  }, [queryClient, token]);
+
+  return isLive;
+}
@@ -6,6 +6,7 @@ import useTranslations from '@/hooks/useTranslations';
 import useStore from '@/state/useStore';
 import useApiClient from '@/hooks/useApiClient';
 import useThemeMode from '@/hooks/useThemeMode';
+import useDashboardSocket from '@/hooks/useDashboardSocket';
 import DashboardHeader from '@/components/dashboard/DashboardHeader';
 import StatsCards from '@/components/dashboard/StatsCards';
 import ActivityChart from '@/components/dashboard/ActivityChart';
@@ -55,6 +56,10 @@ export default function Dashboard() {
   const router = useRouter();
   const { isDark, toggleTheme } = useThemeMode();
   const [searchValue, setSearchValue] = useState('');
+  // While the socket is connected the dashboard is updated from deltas, so
+  // polling only runs as a fallback when it is down.
+  const isLive = useDashboardSocket(token, queryClient);
+  const pollInterval = isLive ? false : REFRESH_INTERVAL;
 
   const handleRequestError = useCallback(
     (error) => {
@@ -90,7 +95,7 @@ export default function Dashboard() {
     },
     {
       enabled: Boolean(apiClient),
-      refetchInterval: REFRESH_INTERVAL,
+      refetchInterval: pollInterval,
       onError: handleRequestError
     }
   );
@@ -105,7 +110,7 @@ export default function Dashboard() {
     },
     {
       enabled: Boolean(apiClient),
-      refetchInterval: REFRESH_INTERVAL,
+      refetchInterval: pollInterval,
       onError: handleRequestError
     }
   );
@@ -120,7 +125,7 @@ export default function Dashboard() {
     },
     {
       enabled: Boolean(apiClient),
-      refetchInterval: REFRESH_INTERVAL,
+      refetchInterval: pollInterval,
       onError: handleRequestError
     }
   );
@@ -8,9 +8,13 @@ import DashboardMenu from '@/components/workspace/DashboardMenu';
 import SmartInput from '@/components/workspace/SmartInput';
 import useApiClient from '@/hooks/useApiClient';
 import useAuthGuard from '@/hooks/useAuthGuard';
+import { applyDashboardDelta, DASHBOARD_DELTA_EVENT } from '@/hooks/useDashboardSocket';
 import useStore from '@/state/useStore';
 import getApiUrl from '@/utils/getApiUrl';
 
+const TIMELINE_LIMIT = 20;
+const CLIENTS_PAGE_SIZE = 1000;
+
 const COMMANDS = [
   {
     id: 'клиент',
@@ -431,7 +435,7 @@ export default function WorkspacePage() {
   const toggleDashboard = useStore((state) => state.toggleDashboard);
   const setAiSuggestions = useStore((state) => state.setAiSuggestions);
 
-  const [interactions, setInteractions] = useState([]);
+  const [timeline, setTimeline] = useState([]);
   const [isSyncing, setIsSyncing] = useState(false);
   const [isSending, setIsSending] = useState(false);
   const [pendingAction, setPendingAction] = useState(null);
@@ -462,8 +466,15 @@ export default function WorkspacePage() {
 
   const loadClients = useCallback(async () => {
     if (!api) return;
-    const response = await api.get('/clients');
-    setClients(response.data);
+    // The list is paginated; follow X-Next-Cursor until every client is loaded.
+    const loaded = [];
+    let cursor;
+    do {
+      const response = await api.get('/clients', { params: { limit: CLIENTS_PAGE_SIZE, cursor } });
+      loaded.push(...response.data);
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    setClients(loaded);
   }, [api, setClients]);
 
   const loadDashboard = useCallback(async () => {
@@ -477,25 +488,31 @@ export default function WorkspacePage() {
 
   const loadReminders = useCallback(async () => {
     if (!api) return;
-    const response = await api.get('/reminders', { params: { due_today: true } });
+    const response = await api.get('/reminders', {
+      params: {
+        due_today: true,
+        status: 'pending',
+        tz: Intl.DateTimeFormat().resolvedOptions().timeZone
+      }
+    });
     setReminders(response.data);
   }, [api, setReminders]);
 
-  const loadInteractions = useCallback(async (clientId) => {
+  const loadTimeline = useCallback(async (clientId) => {
     if (!api || !clientId) return;
-    const response = await api.get('/interactions', { params: { client_id: clientId } });
-    setInteractions(response.data);
+    const response = await api.get(`/clients/${clientId}/timeline`, { params: { limit: TIMELINE_LIMIT } });
+    setTimeline(response.data);
   }, [api]);
 
   const refreshClient = useCallback(async (clientId) => {
     if (!api || !clientId) return;
     const [clientResponse] = await Promise.all([
       api.get(`/clients/${clientId}`),
-      loadInteractions(clientId),
+      loadTimeline(clientId),
       loadReminders()
     ]);
     setCurrentClient(clientResponse.data);
-  }, [api, loadInteractions, loadReminders, setCurrentClient]);
+  }, [api, loadTimeline, loadReminders, setCurrentClient]);
 
   const bootstrap = useCallback(async () => {
     if (!api) return;
@@ -524,13 +541,20 @@ export default function WorkspacePage() {
   useEffect(() => {
     if (!token) return;
     const socket = io(getApiUrl(), {
+      path: '/ws/socket.io',
       transports: ['websocket'],
       auth: { token }
     });
 
     socketRef.current = socket;
+    let hasConnected = false;
 
     socket.on('connect', () => {
+      // Deltas sent while disconnected are lost; reload the stats in full.
+      if (hasConnected) {
+        loadDashboard();
+      }
+      hasConnected = true;
       appendMessage({
         sender: 'system',
         type: 'notification',
@@ -568,6 +592,10 @@ export default function WorkspacePage() {
       }
     });
 
+    socket.on(DASHBOARD_DELTA_EVENT, (delta) => {
+      setDashboardStats(applyDashboardDelta(useStore.getState().dashboardStats, delta));
+    });
+
     socket.on('disconnect', () => {
       appendMessage({
         sender: 'system',
@@ -581,12 +609,11 @@ export default function WorkspacePage() {
       socket.disconnect();
       socketRef.current = null;
     };
-  }, [appendMessage, loadReminders, token]);
+  }, [appendMessage, loadDashboard, loadReminders, setDashboardStats, token]);
 
   useEffect(() => {
     if (!api) return;
     const interval = setInterval(() => {
-      loadDashboard();
       loadReminders();
       if (currentClient?.id) {
         refreshClient(currentClient.id);
@@ -594,7 +621,7 @@ export default function WorkspacePage() {
     }, 60000);
 
     return () => clearInterval(interval);
-  }, [api, currentClient?.id, loadDashboard, loadReminders, refreshClient]);
+  }, [api, currentClient?.id, loadReminders, refreshClient]);
 
   const handleCommand = useCallback((command) => {
     if (!command) return;
@@ -622,7 +649,7 @@ export default function WorkspacePage() {
         const client = clients.find((item) => String(item.id) === id);
         if (client) {
           setCurrentClient(client);
-          loadInteractions(client.id);
+          loadTimeline(client.id);
           setFlowState(null);
           appendMessage({
             sender: 'system',
@@ -647,7 +674,7 @@ export default function WorkspacePage() {
         toggleDashboard();
       }
     },
-    [appendMessage, clients, loadInteractions, setCurrentClient, setFlowState, toggleDashboard]
+    [appendMessage, clients, loadTimeline, setCurrentClient, setFlowState, toggleDashboard]
   );
 
   const handleSend = useCallback(async ({ text, attachment }) => {
@@ -674,7 +701,7 @@ export default function WorkspacePage() {
 
         if (matches.length === 1) {
           setCurrentClient(matches[0]);
-          loadInteractions(matches[0].id);
+          loadTimeline(matches[0].id);
           appendMessage({
             sender: 'system',
             type: 'notification',
@@ -776,7 +803,7 @@ export default function WorkspacePage() {
     } finally {
       setIsSending(false);
     }
-  }, [api, appendMessage, currentClient?.id, flowState, loadInteractions, messages, setCurrentClient]);
+  }, [api, appendMessage, currentClient?.id, flowState, loadTimeline, messages, setCurrentClient]);
 
   const handleCloseAction = useCallback(() => {
     setPendingAction(null);
@@ -880,7 +907,7 @@ export default function WorkspacePage() {
         timestamp: formatTimestamp()
       });
       if (payload.client_id === currentClient?.id) {
-        await loadInteractions(payload.client_id);
+        await loadTimeline(payload.client_id);
       }
       setPendingAction(null);
       await loadDashboard();
@@ -895,7 +922,7 @@ export default function WorkspacePage() {
     } finally {
       setIsSending(false);
     }
-  }, [api, appendMessage, currentClient?.id, loadDashboard, loadInteractions]);
+  }, [api, appendMessage, currentClient?.id, loadDashboard, loadTimeline]);
 
   const handleAttachInvoice = useCallback(async (form) => {
     if (!api || !form.file) return;
@@ -994,7 +1021,7 @@ export default function WorkspacePage() {
               <ChatWindow messages={messages} onAction={handleMessageAction} isLoading={isSyncing} />
               <SmartInput commands={COMMANDS} onCommandSelect={handleCommand} onSend={handleSend} isBusy={isSending} />
             </div>
-            <ClientInfoPanel client={currentClient} interactions={interactions} reminders={reminders.filter((item) => item.client_id === currentClient?.id)} />
+            <ClientInfoPanel client={currentClient} timeline={timeline} reminders={reminders.filter((item) => item.client_id === currentClient?.id)} />
           </div>
         </div>
 